@@ -46,16 +46,15 @@ def _initialize_sub_devices(self, sub_ports: list[str]) -> bool:
     try:
         # logger.debug(f"サブ端末 {len(sub_ports)}台の初期化を開始...")
 
-        from monst.adb.files import remove_data10_bin_from_nox
+        from monst.adb.files import remove_data10_bin_from_nox_many
 
+        # 端末ごとの削除は独立しているため並列に実行する
         success_count = 0
-        for i, port in enumerate(sub_ports, 1):
-            try:
-                # logger.debug(f"サブ端末{i} ({port}) を初期化中...")
-                remove_data10_bin_from_nox(port)
+        errors = remove_data10_bin_from_nox_many(sub_ports)
+        for i, (port, port_error) in enumerate(zip(sub_ports, errors), 1):
+            if port_error is None:
                 success_count += 1
-                # logger.debug(f"サブ端末{i} の初期化完了")
-            except Exception as port_error:
+            else:
                 logger.error(f"サブ端末{i} ({port}) の初期化失敗: {port_error}")
 
         if success_count == len(sub_ports):
@@ -11,7 +11,7 @@ import json
 import os
 import sys
 from dataclasses import dataclass, field, asdict
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 
 # ---------------------------------------------------------------------------
 # 外部依存を排除したヘルパー関数
@@ -378,9 +378,22 @@ def get_config_value(key: str, default: Any = None) -> Any:
     cfg = get_config()
     return getattr(cfg, key, cfg.extra.get(key, default))
 
+_RELOAD_HOOKS: List[Callable[[], None]] = []
+
+def register_reload_hook(hook: Callable[[], None]) -> None:
+    """再読み込み時に呼ばれるフックを登録（設定値をキャッシュするモジュール用）"""
+    if hook not in _RELOAD_HOOKS:
+        _RELOAD_HOOKS.append(hook)
+
 def reload_config() -> _Config:
     """設定を再読み込み"""
-    return _ConfigLoader.reload()
+    cfg = _ConfigLoader.reload()
+    for hook in list(_RELOAD_HOOKS):
+        try:
+            hook()
+        except Exception as e:
+            _safe_print("WARN", f"設定再読み込みフックでエラー: {e}")
+    return cfg
 
 # ---------------------------------------------------------------------------
 # モジュール初期化（安全な初期化）
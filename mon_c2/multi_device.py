@@ -13,7 +13,7 @@ import sys
 from collections import defaultdict, deque
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
 from logging_util import logger, MultiDeviceLogger
 from adb_utils import (
@@ -25,6 +25,7 @@ from adb_utils import (
     reset_adb_server,
 )
 from monst.adb.core import run_adb_command_detailed
+from monst.device.gacha import wait_gacha_completion_data
 from monst.image import force_restart_nox_device
 from monst.image.device_management import (
     record_device_progress,
@@ -64,6 +65,7 @@ _RETRY_BACKOFF_SECONDS = 12.0
 _MAX_REQUEUE_ATTEMPTS = 3
 _BIN_PUSH_DIRNAME = "bin_push"
 _INFLIGHT_MONITOR_INTERVAL = 30.0
+_IDLE_MONITOR_MAX_INTERVAL = 120.0
 _OPERATION_STALL_TIMEOUT = 300.0
 _HARD_INFLIGHT_TIMEOUT = 900.0
 _MONITOR_HEARTBEAT_SECONDS = 300.0
@@ -681,6 +683,12 @@ def run_loop_enhanced(
         base_kwargs = _snapshot_custom_args(custom_args)
 
         multi_logger = MultiDeviceLogger(ports)
+        # Per-run strings: built once instead of on every folder/retry.
+        def watchdog_label(stage: str, folder_name: str) -> str:
+            return f"{operation_name}:{stage}:{folder_name}"
+        status_preparing = f"{operation_name}準備中"
+        status_running = f"{operation_name}実行中"
+        status_done = f"{operation_name}完了"
 
         def fetch_next_folder(port: str) -> Optional[int]:
             nonlocal global_recovery_until
@@ -788,7 +796,7 @@ def run_loop_enhanced(
             with assignment_cv:
                 return inflight_folders.get(port) == folder_value
 
-        def worker(port: str) -> None:
+        def _run_worker(port: str) -> None:
             nonlocal last_completion_time
 
             while True:
@@ -802,12 +810,12 @@ def run_loop_enhanced(
                     return
 
                 folder_name = f"{folder_value:03d}"
-                touch_watchdog(f"{operation_name}:assign:{folder_name}")
+                touch_watchdog(watchdog_label("assign", folder_name))
                 record_device_progress(port)
-                multi_logger.update_task_status(port, folder_name, f"{operation_name}準備中")
+                multi_logger.update_task_status(port, folder_name, status_preparing)
 
                 def _requeue_and_request_new_assignment(reason: str, *, keep_reservation: bool = False) -> bool:
-                    touch_watchdog(f"{operation_name}:requeue:{folder_name}")
+                    touch_watchdog(watchdog_label("requeue", folder_name))
                     should_retry_elsewhere = _requeue_folder(
                         port, folder_value, reason, keep_reservation=keep_reservation
                     )
@@ -817,7 +825,7 @@ def run_loop_enhanced(
                     multi_logger.log_error(port, f"{operation_name}失敗({folder_name})")
                     logger.error(f"[NG] フォルダ_{folder_name}: {operation_name}断念 ({reason})")
                     _mark_folder_complete(port, folder_value, success=False)
-                    touch_watchdog(f"{operation_name}:skip:{folder_name}")
+                    touch_watchdog(watchdog_label("skip", folder_name))
                     return False
 
                 request_new_assignment = False
@@ -842,7 +850,7 @@ def run_loop_enhanced(
 
                         logger.warning(f"[WAIT] フォルダ_{folder_name}: {operation_name}で端末待機中")
                         _request_device_restart(port, f"{operation_name} wait timeout ({folder_name})", folder_name)
-                        touch_watchdog(f"{operation_name}:wait_retry:{folder_name}")
+                        touch_watchdog(watchdog_label("wait_retry", folder_name))
                         request_new_assignment = True
                         _requeue_and_request_new_assignment("device_not_ready", keep_reservation=True)
                         break
@@ -859,13 +867,13 @@ def run_loop_enhanced(
                         multi_logger.log_error(port, f"push失敗({folder_name})")
                         logger.error(f"[NG] フォルダ_{folder_name}: push失敗")
                         _request_device_restart(port, f"{operation_name} push failed ({folder_name})", folder_name)
-                        touch_watchdog(f"{operation_name}:push_failed:{folder_name}")
+                        touch_watchdog(watchdog_label("push_failed", folder_name))
                         request_new_assignment = True
                         _requeue_and_request_new_assignment("push_failed")
                         break
 
-                    touch_watchdog(f"{operation_name}:push_ok:{folder_name}")
-                    multi_logger.update_task_status(port, folder_name, f"{operation_name}実行中")
+                    touch_watchdog(watchdog_label("push_ok", folder_name))
+                    multi_logger.update_task_status(port, folder_name, status_running)
 
                     if not _assignment_active(port, folder_value):
                         logger.info(
@@ -882,7 +890,7 @@ def run_loop_enhanced(
                             logger.warning(f"[NG] フォルダ_{folder_name}: {error_message}")
                             multi_logger.update_task_status(port, folder_name, "エラー終了")
                             _mark_folder_complete(port, folder_value, success=False)
-                            touch_watchdog(f"{operation_name}:error:{folder_name}")
+                            touch_watchdog(watchdog_label("error", folder_name))
                             request_new_assignment = True
                             break
                         multi_logger.log_success(port)
@@ -891,8 +899,8 @@ def run_loop_enhanced(
                         last_completion_time = time.time()
                         with processed_lock:
                             processed_success.append(folder_value)
-                        touch_watchdog(f"{operation_name}:success:{folder_name}")
-                        multi_logger.update_task_status(port, folder_name, f"{operation_name}完了")
+                        touch_watchdog(watchdog_label("success", folder_name))
+                        multi_logger.update_task_status(port, folder_name, status_done)
                         _mark_folder_complete(port, folder_value, success=True)
                         request_new_assignment = True
                         if additional_operation:
@@ -905,7 +913,7 @@ def run_loop_enhanced(
                         multi_logger.log_error(port, str(exc))
                         logger.error(f"[NG] フォルダ_{folder_name}: {operation_name}失敗 ({exc})")
                         _request_device_restart(port, f"{operation_name} exception ({folder_name})", folder_name)
-                        touch_watchdog(f"{operation_name}:exception:{folder_name}")
+                        touch_watchdog(watchdog_label("exception", folder_name))
                         request_new_assignment = True
                         _requeue_and_request_new_assignment("operation_exception")
                         break
@@ -913,6 +921,13 @@ def run_loop_enhanced(
                 if request_new_assignment:
                     continue
 
+        def worker(port: str) -> None:
+            try:
+                _run_worker(port)
+            finally:
+                # 最後のフォルダのガチャ結果保存（バックグラウンド）を待ち、失敗を報告する
+                wait_gacha_completion_data(port)
+
         stop_inflight_monitor = threading.Event()
 
         def _monitor_inflight() -> None:
@@ -923,10 +938,32 @@ def run_loop_enhanced(
             nonlocal last_resume_kick_time
             nonlocal last_health_check_time
             heartbeat_last_log = 0.0
-            while not stop_inflight_monitor.wait(_INFLIGHT_MONITOR_INTERVAL):
+            monitor_interval = _INFLIGHT_MONITOR_INTERVAL
+            tick_ready: Dict[str, bool] = {}
+
+            def _ports_ready_this_tick() -> bool:
+                # ADB probes are the costliest part of a tick; evaluate at most once.
+                if "ready" not in tick_ready:
+                    tick_ready["ready"] = _all_ports_ready()
+                return tick_ready["ready"]
+
+            while not stop_inflight_monitor.wait(monitor_interval):
+                tick_ready.clear()
                 try:
-                    stalled: List[Tuple[str, int]] = []
                     now = time.time()
+                    with assignment_cv:
+                        idle = not inflight_folders and not folder_queue and not global_recovery_until
+                    if idle:
+                        # Nothing assigned or queued: skip stall/health work and back off.
+                        if now - heartbeat_last_log >= _MONITOR_HEARTBEAT_SECONDS:
+                            logger.info("[MONITOR] idle (inflight=0 queue=0)")
+                            heartbeat_last_log = now
+                        monitor_interval = min(monitor_interval * 2, _IDLE_MONITOR_MAX_INTERVAL)
+                        continue
+                    monitor_interval = _INFLIGHT_MONITOR_INTERVAL
+
+                    stalled: List[Tuple[str, int]] = []
+                    stalled_ports: Set[str] = set()
                     with assignment_cv:
                         inflight_snapshot = dict(inflight_folders)
                         for port, folder_value in list(inflight_folders.items()):
@@ -936,6 +973,7 @@ def run_loop_enhanced(
                             idle_time = get_device_idle_time(port)
                             if idle_time >= _OPERATION_STALL_TIMEOUT:
                                 stalled.append((port, folder_value))
+                                stalled_ports.add(port)
                                 inflight_start_times[port] = now
                             start_time = inflight_start_times.get(port)
                             if start_time and now - start_time >= _HARD_INFLIGHT_TIMEOUT:
@@ -949,11 +987,9 @@ def run_loop_enhanced(
                                 _requeue_folder(port, folder_value, "hard_timeout", keep_reservation=True)
                                 inflight_start_times[port] = now
                                 continue
-                        stalled_ports = [port for port, _ in stalled]
                         all_inflight_stalled = bool(stalled_ports) and len(stalled_ports) == len(ports)
                         if _STALL_ESCALATION_SECONDS:
-                            active_ports = list(inflight_snapshot.keys())
-                            for port in active_ports:
+                            for port in inflight_snapshot:
                                 if port not in stalled_ports:
                                     stall_alarm_deadlines.pop(port, None)
                             for port in stalled_ports:
@@ -1029,7 +1065,7 @@ def run_loop_enhanced(
                         )
                         _request_device_restart(port, f"{operation_name} stalled ({folder_name})", folder_name)
                         stall_counts.pop(port, None)
-                        touch_watchdog(f"{operation_name}:stall:{folder_name}")
+                        touch_watchdog(watchdog_label("stall", folder_name))
                         _requeue_folder(port, folder_value, "stall_requeue", keep_reservation=True)
                     if consecutive_full_stall_cycles >= 2:
                         _begin_global_recovery("???STALL????")
@@ -1044,7 +1080,7 @@ def run_loop_enhanced(
                                     port,
                                 )
                                 _request_device_restart(port, f"{operation_name} stall timeout", f"{folder_value:03d}" if folder_value is not None else None)
-                                touch_watchdog(f"{operation_name}:stall_escalation:{folder_value:03d}")
+                                touch_watchdog(watchdog_label("stall_escalation", f"{folder_value:03d}"))
                                 stall_counts.pop(port, None)
                                 _requeue_folder(port, folder_value, "stall_escalation", keep_reservation=True)
                     if (
@@ -1056,7 +1092,7 @@ def run_loop_enhanced(
                     if (
                         _GLOBAL_STALL_TIMEOUT
                         and have_devices_been_idle(ports, _GLOBAL_STALL_TIMEOUT)
-                        and _all_ports_ready()
+                        and _ports_ready_this_tick()
                         and now - last_soft_resync_time >= _SOFT_RESYNC_COOLDOWN
                     ):
                         _soft_resync_all(ports)
@@ -1093,11 +1129,12 @@ def run_loop_enhanced(
                                     "health_check",
                                     folder_label,
                                 )
+                            tick_ready.clear()
                             with assignment_cv:
                                 assignment_cv.notify_all()
                     if (
                         now - last_completion_time >= _RESUME_KICK_SECONDS
-                        and _all_ports_ready()
+                        and _ports_ready_this_tick()
                         and now - last_resume_kick_time >= _RESUME_KICK_SECONDS
                     ):
                         with assignment_cv:
@@ -1109,7 +1146,7 @@ def run_loop_enhanced(
                                 last_resume_kick_time = now
                     if global_recovery_until:
                         remaining = global_recovery_until - now
-                        if remaining > 0 and _all_ports_ready():
+                        if remaining > 0 and _ports_ready_this_tick():
                             logger.info("[RECOVERY] ????????????????????")
                             global_recovery_until = 0.0
                             with assignment_cv:
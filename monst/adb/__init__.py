@@ -10,14 +10,16 @@ from .core import (
     run_adb_command,
     perform_action,
     perform_action_enhanced,
+    perform_actions_batch,
     reset_adb_server,
     is_device_available,
     reconnect_device,
     check_adb_server,
+    get_last_input_time,
 )
 from .shell import run_adb_shell_command
 from .input import send_key_event, press_home_button, press_back_button  
-from .files import remove_data10_bin_from_nox, pull_file_from_nox
+from .files import remove_data10_bin_from_nox, remove_data10_bin_from_nox_many, pull_file_from_nox
 from .app import (
     close_monster_strike_app,
     start_monster_strike_app, 
@@ -30,15 +32,18 @@ __all__ = [
     "run_adb_command",
     "perform_action", 
     "perform_action_enhanced",
+    "perform_actions_batch",
     "reset_adb_server",
     "is_device_available",
     "reconnect_device",
     "check_adb_server",
+    "get_last_input_time",
     "run_adb_shell_command",
     "send_key_event",
     "press_home_button",
     "press_back_button",
     "remove_data10_bin_from_nox",
+    "remove_data10_bin_from_nox_many",
     "pull_file_from_nox",
     "close_monster_strike_app",
     "start_monster_strike_app",
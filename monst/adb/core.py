@@ -7,34 +7,56 @@ monst.adb.core - Core ADB command execution and device management.
 
 from __future__ import annotations
 
+import re
 import subprocess
+import sys
 import threading
 import time
 from collections import defaultdict, deque
+from concurrent.futures import Future
 from dataclasses import dataclass, field
-from typing import Deque, Dict, List, Optional, Set, Tuple
+from typing import Deque, Dict, List, Optional, Sequence, Set, Tuple
 
-from config import get_config
+from config import get_config, get_config_value, register_reload_hook
 from logging_util import logger
 
-try:
-    from monst.image.device_management import record_device_progress as _record_device_progress_fn
-except Exception:  # ImportError or circular load during PyInstaller bootstrap
-    _record_device_progress_fn = None
+from .session import close_shell_sessions, run_in_shell_session, send_in_shell_session
+
+try:  # pragma: no cover - optional dependency
+    from fastrlock.rlock import FastRLock as _FastLock  # type: ignore
+except Exception:  # pragma: no cover - stdlib fallback
+    _FastLock = threading.Lock  # type: ignore[assignment,misc]
+
+_device_management = None
+
+
+def _get_device_management():
+    """monst.image.device_management を遅延解決し、成功後はキャッシュして返す。
+
+    PyInstaller起動時の循環importなどで失敗した場合はNoneを返し、次回再試行する。
+    """
+    global _device_management
+    if _device_management is None:
+        try:
+            from monst.image import device_management as module
+        except Exception:
+            return None
+        _device_management = module
+    return _device_management
+
+
+_get_device_management()
 
 
 def _mark_progress(device_port: str) -> None:
     """更新イベントを監視し、端末ごとの進行状況を最新化する。"""
-    global _record_device_progress_fn
     if not device_port:
         return
-    if _record_device_progress_fn is None:
-        try:
-            from monst.image.device_management import record_device_progress as _record_device_progress_fn  # type: ignore
-        except Exception:
-            return
+    device_management = _get_device_management()
+    if device_management is None:
+        return
     try:
-        _record_device_progress_fn(device_port)  # type: ignore[misc]
+        device_management.record_device_progress(device_port)
     except Exception:
         pass
 
@@ -42,6 +64,9 @@ def _mark_progress(device_port: str) -> None:
 # Internal state management (thread-safe)
 # ---------------------------------------------------------------------------
 
+_RECENT_ERROR_CAPACITY = 256  # 直近エラー時刻の保持上限（リングバッファ）
+
+
 @dataclass(slots=True)
 class _State:
     """ADB操作の内部状態を管理するデータクラス。
@@ -49,21 +74,35 @@ class _State:
     スレッドセーフなエラートラッキングと並行制御を提供します。
     """
     # エラートラッキング
-    cmd_error: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
-    last_error_time: Dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    cmd_error: Dict[Tuple[str, str], int] = field(default_factory=lambda: defaultdict(int))
+    last_error_time: Dict[Tuple[str, str], float] = field(default_factory=lambda: defaultdict(float))
     device_errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
     # 直近エラー・再接続状態
-    error_lock: threading.Lock = field(default_factory=threading.Lock)
-    recent_adb_errors: Deque[float] = field(default_factory=deque)
-    reconnect_lock: threading.Lock = field(default_factory=threading.Lock)
+    error_lock: threading.Lock = field(default_factory=_FastLock)
+    recent_adb_errors: Deque[float] = field(
+        default_factory=lambda: deque(maxlen=_RECENT_ERROR_CAPACITY)
+    )
+    reconnect_lock: threading.Lock = field(default_factory=_FastLock)
     reconnect_failures: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
     reconnect_restart_inflight: Set[str] = field(default_factory=set)
 
     # 並行制御セマフォ
     sem: threading.Semaphore | None = None
     init_lock: threading.Lock = field(default_factory=threading.Lock)
-    adb_reset_lock: threading.Lock = field(default_factory=threading.Lock)
     last_adb_reset: float = 0.0
+    # リセットの実行状態（完了ごとに世代を進め、待機側は世代の変化で完了を検知して結果を共有）
+    reset_cond: threading.Condition = field(default_factory=threading.Condition)
+    reset_running: bool = False
+    reset_generation: int = 0
+    reset_result: bool = True
+    # `adb devices` の短期キャッシュ（同時に走る可用性チェックを1回に集約）
+    devices_lock: threading.Lock = field(default_factory=threading.Lock)
+    devices_cache: Dict[str, str] = field(default_factory=dict)
+    devices_cache_time: float = 0.0
+    # 実行中の `adb devices`（ロックはコマンド実行中に保持せず、結果はFutureで共有する）
+    devices_inflight: Optional[Future] = None
+    # 端末ごとの最終入力送信時刻（これより前に取得開始した画面は操作前のもの）
+    last_input_time: Dict[str, float] = field(default_factory=dict)
 
     def ensure_semaphore(self) -> threading.Semaphore:
         """セマフォの遅延初期化（ダブルチェックロッキング）。
@@ -79,6 +118,80 @@ class _State:
         return self.sem
 
 _state = _State()
+_tls = threading.local()
+
+
+def _local_error_counts() -> Tuple[Dict[Tuple[str, str], int], Dict[str, int]]:
+    """このスレッド専用のエラー集計 (cmd_error, device_errors) を返す。"""
+    cmd_error = getattr(_tls, "cmd_error", None)
+    if cmd_error is None:
+        cmd_error = _tls.cmd_error = defaultdict(int)
+        _tls.device_errors = defaultdict(int)
+    return cmd_error, _tls.device_errors
+
+
+def _flush_error_counts() -> None:
+    """スレッドローカルの集計を _state へ合算する（スロットル済みのログ出力時のみ）。
+
+    _state.cmd_error は成功するまでの連続エラー数の合計で、成功時にキーごと削除される。
+    """
+    cmd_error, device_errors = _local_error_counts()
+    with _state.error_lock:
+        for key, count in cmd_error.items():
+            _state.cmd_error[key] += count
+        for port, count in device_errors.items():
+            _state.device_errors[port] += count
+    cmd_error.clear()
+    device_errors.clear()
+
+_adb_path_cache: Optional[str] = None
+
+
+def _adb_path() -> str:
+    """NOX_ADB_PATHを初回のみ解決して返す（設定再読み込みで破棄）。"""
+    global _adb_path_cache
+    path = _adb_path_cache
+    if path is None:
+        with _state.init_lock:
+            if _adb_path_cache is None:
+                _adb_path_cache = get_config().NOX_ADB_PATH
+            path = _adb_path_cache
+    return path
+
+
+_tap_double: Optional[bool] = None
+
+
+def _tap_double_enabled() -> bool:
+    """設定 tap_double（強化タップを2回送る旧挙動）を初回のみ読み込んで返す。"""
+    global _tap_double
+    if _tap_double is None:
+        _tap_double = bool(get_config_value("tap_double", False))
+    return _tap_double
+
+
+_ADB_TOOLS_VERSION_RE = re.compile(r"^Version (\d+)", re.MULTILINE)
+_adb_tools_version: Optional[int] = None
+
+
+def _adb_platform_tools_version() -> int:
+    """``adb version`` の platform-tools メジャー番号を初回のみ取得して返す（不明時は0）。"""
+    global _adb_tools_version
+    if _adb_tools_version is None:
+        out = run_adb_command(["version"], timeout=10) or ""
+        match = _ADB_TOOLS_VERSION_RE.search(out)
+        _adb_tools_version = int(match.group(1)) if match else 0
+    return _adb_tools_version
+
+
+def _on_config_reload() -> None:
+    global _adb_path_cache, _tap_double, _adb_tools_version
+    _adb_path_cache = None
+    _tap_double = None
+    _adb_tools_version = None
+
+
+register_reload_hook(_on_config_reload)
 
 
 def _register_reconnect_failure(device_port: str) -> int:
@@ -104,9 +217,10 @@ def _schedule_force_restart(device_port: str, failure_count: int) -> None:
 
     def _restart_worker() -> None:
         try:
-            from monst.image.device_management import force_restart_nox_device
-
-            if force_restart_nox_device(device_port, emergency=True):
+            device_management = _get_device_management()
+            if device_management is None:
+                raise ImportError("monst.image.device_management unavailable")
+            if device_management.force_restart_nox_device(device_port, emergency=True):
                 logger.warning(
                     "Device %s force-restarted after %d reconnect failures",
                     device_port,
@@ -137,11 +251,30 @@ _FATAL_EXIT_CODES = {
 }
 _ADB_RESET_BACKOFF = 8.0  # seconds
 _ADB_RESET_VERIFY_ATTEMPTS = 5
+_ADB_RESET_WAIT_TIMEOUT = 30.0  # 他スレッドのリセット完了を待つ上限（秒）
 _RECENT_ERROR_WINDOW = 30.0  # seconds
+_DEVICES_CACHE_TTL = 1.0  # seconds
+_DEVICES_WAIT_TIMEOUT = 5.0  # seconds: 他スレッドの `adb devices` 結果を待つ上限
 _ADB_RESET_ERROR_THRESHOLD = 5
 _MAX_RECONNECT_ATTEMPTS = 3
 _RECONNECT_FAILURE_RESTART_THRESHOLD = 3
 
+# エラー文言の判定はプリコンパイル済みの正規表現で1回だけ走査する
+_FATAL_ERROR_RE = re.compile(
+    r"not responding|daemon not running|daemon still not running|cannot connect to daemon",
+    re.IGNORECASE,
+)
+_CRITICAL_ERROR_RE = re.compile(r"connection reset|protocol fault|device offline")
+_FREEZE_INDICATOR_RE = re.compile(r"device|not found|timeout|connect failed|offline")
+# `adb devices` の "<serial>\t<state>" 行（ヘッダー行は語数が合わず除外される）
+_DEVICES_RE = re.compile(r"^(\S+)[ \t]+(\S+)[ \t]*\r?$", re.MULTILINE)
+
+_IS_WINDOWS = sys.platform.startswith("win")
+_ENCODINGS = ("utf-8", "shift_jis")  # Windows版adbの出力で試行する順
+# Windows: コンソールウィンドウを生成しない（close_fds は既定のTrueのままにし、
+# 他スレッドが生成中の子プロセス用パイプを継承させない）
+_WINDOWS_SPAWN_FLAGS = getattr(subprocess, "CREATE_NO_WINDOW", 0x08000000)
+
 APP_PACKAGE = "jp.co.mixi.monsterstrike"
 APP_ACTIVITY = "jp.co.mixi.monsterstrike.MonsterStrike"
 
@@ -149,8 +282,8 @@ APP_ACTIVITY = "jp.co.mixi.monsterstrike.MonsterStrike"
 # Low-level subprocess wrapper
 # ---------------------------------------------------------------------------
 
-def _run(cmd: List[str], timeout: int) -> Tuple[Optional[str], Optional[str], int]:
-    """subprocess.runの薄いラッパー（PC環境適応版）。
+def _run_windows(cmd: List[str], timeout: int) -> Tuple[Optional[str], Optional[str], int]:
+    """subprocess.runの薄いラッパー（Windows版: 複数エンコーディングを試行）。
     
     Args:
         cmd: 実行するコマンドリスト
@@ -159,69 +292,68 @@ def _run(cmd: List[str], timeout: int) -> Tuple[Optional[str], Optional[str], in
     Returns:
         (stdout, stderr, returncode) のタプル。例外は発生させない。
     """
+    # pushコマンドの場合はプログレスバー出力を抑制
+    is_push_command = "push" in cmd
+    stderr_setting = subprocess.DEVNULL if is_push_command else subprocess.PIPE
     try:
-        # Windows環境での文字エンコーディング適応
-        import platform
-        encoding = "utf-8"
-        if platform.system() == "Windows":
-            # Windows環境では複数のエンコーディングを試行
+        for encoding in _ENCODINGS:
             try:
-                # pushコマンドの場合はプログレスバー出力を抑制
-                is_push_command = len(cmd) >= 2 and "push" in cmd
-                stderr_setting = subprocess.DEVNULL if is_push_command else subprocess.PIPE
-                
                 cp = subprocess.run(
                     cmd,
                     timeout=timeout,
+                    stdin=subprocess.DEVNULL,
                     stdout=subprocess.PIPE,
                     stderr=stderr_setting,
                     text=True,
-                    encoding="utf-8",
+                    encoding=encoding,
                     errors="replace",
+                    creationflags=_WINDOWS_SPAWN_FLAGS,
                 )
-                return cp.stdout, cp.stderr if not is_push_command else None, cp.returncode
             except UnicodeDecodeError:
-                # UTF-8で失敗した場合はShift_JISを試行
-                try:
-                    # pushコマンドの場合はプログレスバー出力を抑制
-                    is_push_command = len(cmd) >= 2 and "push" in cmd
-                    stderr_setting = subprocess.DEVNULL if is_push_command else subprocess.PIPE
-                    
-                    cp = subprocess.run(
-                        cmd,
-                        timeout=timeout,
-                        stdout=subprocess.PIPE,
-                        stderr=stderr_setting,
-                        text=True,
-                        encoding="shift_jis",
-                        errors="replace",
-                    )
-                    return cp.stdout, cp.stderr if not is_push_command else None, cp.returncode
-                except:
-                    # 最後の手段として binary mode で実行
-                    cp = subprocess.run(
-                        cmd,
-                        timeout=timeout,
-                        capture_output=True,
-                    )
-                    stdout = cp.stdout.decode('utf-8', errors='replace') if cp.stdout else None
-                    stderr = cp.stderr.decode('utf-8', errors='replace') if cp.stderr else None
-                    return stdout, stderr, cp.returncode
-        else:
-            cp = subprocess.run(
-                cmd,
-                timeout=timeout,
-                capture_output=True,
-                text=True,
-                encoding="utf-8",
-                errors="replace",
-            )
-            return cp.stdout, cp.stderr, cp.returncode
+                continue
+            return cp.stdout, None if is_push_command else cp.stderr, cp.returncode
+
+        # 最後の手段として binary mode で実行
+        cp = subprocess.run(
+            cmd,
+            timeout=timeout,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            creationflags=_WINDOWS_SPAWN_FLAGS,
+        )
+        stdout = cp.stdout.decode('utf-8', errors='replace') if cp.stdout else None
+        stderr = cp.stderr.decode('utf-8', errors='replace') if cp.stderr else None
+        return stdout, stderr, cp.returncode
+    except subprocess.TimeoutExpired:
+        return None, "<timeout>", 1
+    except Exception as exc:  # pragma: no cover
+        return None, str(exc), 1
+
+def _run_posix(cmd: List[str], timeout: int) -> Tuple[Optional[str], Optional[str], int]:
+    """subprocess.runの薄いラッパー（POSIX版）。戻り値は _run_windows と同じ。"""
+    try:
+        # close_fds=False で fork ではなく posix_spawn 経路を使わせる
+        # （process_group などを指定すると fork に戻るため渡さない）
+        # adb shell が親の標準入力を読み込まないよう stdin は DEVNULL に固定する
+        cp = subprocess.run(
+            cmd,
+            timeout=timeout,
+            stdin=subprocess.DEVNULL,
+            capture_output=True,
+            text=True,
+            encoding="utf-8",
+            errors="replace",
+            close_fds=False,
+        )
+        return cp.stdout, cp.stderr, cp.returncode
     except subprocess.TimeoutExpired:
         return None, "<timeout>", 1
     except Exception as exc:  # pragma: no cover
         return None, str(exc), 1
 
+# OS判定は実行中に変わらないため、読み込み時に実装を選択しておく
+_run = _run_windows if _IS_WINDOWS else _run_posix
+
 # ---------------------------------------------------------------------------
 # Public API
 
@@ -234,10 +366,16 @@ def _is_fatal_adb_failure(rc: int, err: Optional[str], out: Optional[str]) -> bo
     normalized = _normalize_return_code(rc)
     if normalized in _FATAL_EXIT_CODES or (normalized & 0xC0000000) == 0xC0000000:
         return True
-    combined = " ".join(part for part in (err, out) if part).lower()
-    if any(keyword in combined for keyword in ("not responding", "daemon not running", "daemon still not running", "cannot connect to daemon")):
-        return True
-    return False
+    return any(part and _FATAL_ERROR_RE.search(part) for part in (err, out))
+
+def _error_key(device_port: Optional[str], args: List[str]) -> Tuple[str, str]:
+    """エラー集計用のキー。座標などの引数を含めず (端末, コマンド種別) 単位にまとめる。"""
+    verb = args[0] if args else ""
+    if verb == "shell" and len(args) > 1:
+        head = args[1].split(None, 1)
+        if head:
+            verb = f"shell {head[0]}"
+    return device_port or "", verb
 
 def _recover_from_adb_crash(device_port: Optional[str]) -> None:
     """Attempt to recover from an unrecoverable ADB crash."""
@@ -276,26 +414,24 @@ def run_adb_command_detailed(
         >>> if rc != 0:
         ...     print(f"Error: {stderr}")
     """
-    cfg = get_config()
-    base_cmd = [cfg.NOX_ADB_PATH]
+    base_cmd = [_adb_path()]
     if device_port:
         base_cmd += ["-s", device_port]
     cmd = base_cmd + args
 
-    key = f"{device_port or ''}|{' '.join(args)}"
     sem = _state.ensure_semaphore()
 
     with sem:
         out, err, rc = _run(cmd, timeout)
-        
-        # 詳細な診断情報をログ出力
-        if rc != 0:
-            logger.debug(f"ADB command failed: {' '.join(cmd)}")
-            logger.debug(f"Return code: {rc}")
-            logger.debug(f"Stdout: {out}")
-            logger.debug(f"Stderr: {err}")
-        
-        return out, err, rc
+
+    # 詳細な診断情報をログ出力
+    if rc != 0:
+        logger.debug(f"ADB command failed: {' '.join(cmd)}")
+        logger.debug(f"Return code: {rc}")
+        logger.debug(f"Stdout: {out}")
+        logger.debug(f"Stderr: {err}")
+
+    return out, err, rc
 
 def run_adb_command(
     args: List[str], 
@@ -312,90 +448,140 @@ def run_adb_command(
     Returns:
         成功時は標準出力、失敗時はNone
     """
-    cfg = get_config()
-    base_cmd = [cfg.NOX_ADB_PATH]
+    base_cmd = [_adb_path()]
     if device_port:
         base_cmd += ["-s", device_port]
     cmd = base_cmd + args
-    cmd_str = " ".join(cmd)
 
-    key = f"{device_port or ''}|{' '.join(args)}"
+    key: Optional[Tuple[str, str]] = None
     sem = _state.ensure_semaphore()
 
-    with sem:
-        for attempt in range(_RETRY + 1):
+    for attempt in range(_RETRY + 1):
+        # セマフォはサブプロセス実行中のみ保持し、復旧処理・待機中は枠を解放する
+        with sem:
             out, err, rc = _run(cmd, timeout)
-            if rc == 0:
-                # 成功: エラーカウンターをリセットして出力を返す
-                _state.cmd_error.pop(key, None)
-                return out
-
-            fatal_failure = _is_fatal_adb_failure(rc, err, out)
-            if fatal_failure and attempt < _RETRY:
-                _recover_from_adb_crash(device_port)
-                continue
+        if rc == 0:
+            # 成功: エラーカウンターをリセットして出力を返す
+            # 失敗履歴がある場合だけカウンターを掃除する（通常は空で何もしない）
+            local_cmd_error = getattr(_tls, "cmd_error", None)
+            if local_cmd_error or _state.cmd_error:
+                success_key = key or _error_key(device_port, args)
+                if local_cmd_error:
+                    local_cmd_error.pop(success_key, None)
+                if success_key in _state.cmd_error:
+                    with _state.error_lock:
+                        _state.cmd_error.pop(success_key, None)
+            return out
+
+        fatal_failure = _is_fatal_adb_failure(rc, err, out)
+        if fatal_failure and attempt < _RETRY:
+            _recover_from_adb_crash(device_port)
+            continue
+
+        # エラー: 自動復旧機構付きログ出力
+        now = time.time()
+        with _state.error_lock:
+            _state.recent_adb_errors.append(now)
+        if key is None:
+            key = _error_key(device_port, args)
+        local_cmd_error, local_device_errors = _local_error_counts()
+        local_cmd_error[key] += 1
+        raw_error = (err or out or "").strip()
+        if not raw_error:
+            raw_error = "<no output>"
+        error_message = raw_error[:200]
+        error_lower = error_message.lower()
+
+        # 重要な接続エラーは即座に復旧を試行
+        if _CRITICAL_ERROR_RE.search(error_lower):
+            if device_port and attempt == 0:  # 最初の試行時のみ復旧を試行
+                logger.warning("Critical ADB error detected, attempting recovery for %s", device_port)
+                if reconnect_device(device_port):
+                    logger.info("Device %s successfully reconnected, retrying command", device_port)
+                    continue  # 復旧成功時は直ちにリトライ
+
+        if fatal_failure:
+            logger.error(
+                "ADB fatal error (%s): rc=%s msg=%s",
+                " ".join(cmd),
+                rc,
+                error_message,
+            )
 
-            # エラー: 自動復旧機構付きログ出力
-            now = time.time()
-            with _state.error_lock:
-                _state.recent_adb_errors.append(now)
-                while (
-                    _state.recent_adb_errors
-                    and now - _state.recent_adb_errors[0] > _RECENT_ERROR_WINDOW
-                ):
-                    _state.recent_adb_errors.popleft()
-            cnt = _state.cmd_error[key] = _state.cmd_error.get(key, 0) + 1
-            raw_error = (err or out or "").strip()
-            if not raw_error:
-                raw_error = "<no output>"
-            error_message = raw_error[:200]
-            error_lower = error_message.lower()
-
-            # 重要な接続エラーは即座に復旧を試行
-            if any(x in error_lower for x in ("connection reset", "protocol fault", "device offline")):
-                if device_port and attempt == 0:  # 最初の試行時のみ復旧を試行
-                    logger.warning("Critical ADB error detected, attempting recovery for %s", device_port)
-                    if reconnect_device(device_port):
-                        logger.info("Device %s successfully reconnected, retrying command", device_port)
-                        continue  # 復旧成功時は直ちにリトライ
-
-            if fatal_failure:
-                logger.error(
-                    "ADB fatal error (%s): rc=%s msg=%s",
-                    cmd_str,
-                    rc,
-                    error_message,
-                )
+        if now - _state.last_error_time.get(key, 0) > _ERR_INTERVAL:
+            label = f"{device_port or ''}|{' '.join(args)}"
+            # タイムアウトエラーの場合は特別な処理
+            if error_message == "<timeout>":
+                logger.warning("ADB timeout (%s): Command timed out after %d seconds", label, timeout)
+            # デバイス接続エラーの場合はDEBUGレベルでログ出力
+            elif "not found" in error_lower or "connect failed" in error_lower:
+                logger.debug("ADB connection error (%s): %s", label, error_message)
+            else:
+                logger.error("ADB error (%s): %s", label, error_message)
+            _state.last_error_time[key] = now
+            _flush_error_counts()
+
+        # デバイス別エラー統計
+        if device_port:
+            local_device_errors[device_port] += 1
+
+            # NOXフリーズの可能性があるエラーを自動復旧システムに報告
+            if _FREEZE_INDICATOR_RE.search(error_lower):
+                device_management = _get_device_management()
+                if device_management is not None:  # オプション機能のため未ロード時は無視
+                    device_management.mark_device_error(
+                        device_port, f"ADBエラー（フリーズ疑い）: {error_message}"
+                    )
 
-            if now - _state.last_error_time.get(key, 0) > _ERR_INTERVAL:
-                # タイムアウトエラーの場合は特別な処理
-                if error_message == "<timeout>":
-                    logger.warning("ADB timeout (%s): Command timed out after %d seconds", key, timeout)
-                # デバイス接続エラーの場合はDEBUGレベルでログ出力
-                elif "not found" in error_lower or "connect failed" in error_lower:
-                    logger.debug("ADB connection error (%s): %s", key, error_message)
-                else:
-                    logger.error("ADB error (%s): %s", key, error_message)
-                _state.last_error_time[key] = now
-                _state.cmd_error[key] = 1  # ログ出力後にカウンターリセット
+        if attempt < _RETRY:
+            time.sleep(0.5 * (attempt + 1))
+            continue
+        return None  # リトライ回数超過
 
-            # デバイス別エラー統計
-            if device_port:
-                _state.device_errors[device_port] += 1
+def _input_command(
+    action: str,
+    x: int,
+    y: int,
+    x2: Optional[int] = None,
+    y2: Optional[int] = None,
+    duration: int = 150,
+) -> Optional[str]:
+    """tap/swipe操作を ``input swipe`` コマンド文字列に変換する（不正な指定はNone）。"""
+    if action == "tap":
+        return f"input swipe {x} {y} {x} {y} {duration}"
+    if action == "swipe" and x2 is not None and y2 is not None:
+        return f"input swipe {x} {y} {x2} {y2} {duration}"
+    return None
+
+def _run_shell(
+    device_port: str,
+    command: str,
+    timeout: int = _DEFAULT_TIMEOUT,
+) -> Optional[str]:
+    """シェルコマンドを常駐シェルで実行し、送信できない場合のみワンショット実行に切り替える。
 
-                # NOXフリーズの可能性があるエラーを自動復旧システムに報告
-                freeze_indicators = ["device", "not found", "timeout", "connect failed", "offline"]
-                if any(indicator in error_lower for indicator in freeze_indicators):
-                    try:
-                        from monst.image.device_management import mark_device_error
-                        mark_device_error(device_port, f"ADBエラー（フリーズ疑い）: {error_message}")
-                    except ImportError:
-                        pass  # オプション機能のため無視
+    送信後のタイムアウト・非ゼロ終了は端末側で実行済みの可能性があるため、
+    tap/keyeventの二重送信を避けて再実行せずNoneを返す。
+    """
+    sent, out = send_in_shell_session(device_port, command, timeout=timeout)
+    if sent:
+        return out
+    return run_adb_command(["shell", command], device_port, timeout)
 
-            if attempt < _RETRY:
-                time.sleep(0.5 * (attempt + 1))
-                continue
-            return None  # リトライ回数超過
+def _send_input(device_port: str, command: str, timeout: int = _DEFAULT_TIMEOUT) -> bool:
+    """inputコマンドを常駐シェルで送信し、送信できない場合のみワンショット実行に切り替える。
+
+    成否にかかわらず送信後の時刻を記録する（先読み画面の破棄判定に使用）。
+    """
+    try:
+        return _run_shell(device_port, command, timeout) is not None
+    finally:
+        if device_port:
+            _state.last_input_time[device_port] = time.time()
+
+def get_last_input_time(device_port: str) -> float:
+    """端末へ最後にinputコマンドを送信した時刻（未送信なら0.0）を返します。"""
+    return _state.last_input_time.get(device_port, 0.0)
 
 def perform_action_enhanced(
     device_port: str,
@@ -420,43 +606,26 @@ def perform_action_enhanced(
     Returns:
         操作成功時はTrue、失敗時はFalse
     """
-    import time
-    from logging_util import logger
-    
     for attempt in range(retry_count):
         try:
             if action == "tap":
-                # ダブルタップで確実性向上（詳細ログ付き）
                 logger.info(f"[ADB-DEBUG] デバイス{device_port}: タップ実行中 座標=({x},{y}) 試行={attempt+1}/{retry_count}")
                 
-                res1 = run_adb_command(
-                    ["shell", "input", "swipe", str(x), str(y), str(x), str(y), str(duration)],
-                    device_port
-                )
-                logger.info(f"[ADB-DEBUG] 1回目タップ結果: {res1 is not None}")
-                
-                time.sleep(0.1)
-                
-                res2 = run_adb_command(
-                    ["shell", "input", "swipe", str(x), str(y), str(x), str(y), str(duration)],
-                    device_port
-                )
-                logger.info(f"[ADB-DEBUG] 2回目タップ結果: {res2 is not None}")
-                
-                success = (res1 is not None) and (res2 is not None)
+                if _tap_double_enabled():
+                    # 旧挙動: 2回のタップを端末側のsleepで挟み、1回のシェル呼び出しで送信
+                    tap_command = _input_command("tap", x, y, duration=duration)
+                    success = _send_input(device_port, f"{tap_command} && sleep 0.1 && {tap_command}")
+                else:
+                    success = _send_input(device_port, f"input tap {x} {y}")
                 if success:
                     _mark_progress(device_port)
                     logger.info(f"[ADB-DEBUG] 強化クリック成功 デバイス={device_port} 座標=({x}, {y}) 試行={attempt+1}")
                     return True
                 else:
-                    logger.warning(f"[ADB-DEBUG] 強化クリック失敗 デバイス={device_port} res1={res1 is not None} res2={res2 is not None}")
+                    logger.warning(f"[ADB-DEBUG] 強化クリック失敗 デバイス={device_port} 座標=({x}, {y})")
                     
             elif action == "swipe" and x2 is not None and y2 is not None:
-                res = run_adb_command(
-                    ["shell", "input", "swipe", str(x), str(y), str(x2), str(y2), str(duration)],
-                    device_port
-                )
-                if res is not None:
+                if _send_input(device_port, _input_command("swipe", x, y, x2, y2, duration)):
                     _mark_progress(device_port)
                     logger.debug(f"[ULTRATHINK] 強化スワイプ成功 ({x},{y}→{x2},{y2}, 試行: {attempt+1})")
                     return True
@@ -507,90 +676,185 @@ def perform_action(
         True
     """
     try:
-        if action == "tap":
-            res = run_adb_command(
-                ["shell", "input", "swipe", str(x), str(y), str(x), str(y), str(duration)],
-                device_port
-            )
-            if res is not None:
-                _mark_progress(device_port)
-                return True
+        command = _input_command(action, x, y, x2, y2, duration)
+        if command is None:
+            logger.error("perform_action: invalid parameters (%s)", action)
             return False
-        if action == "swipe" and x2 is not None and y2 is not None:
-            res = run_adb_command(
-                ["shell", "input", "swipe", str(x), str(y), str(x2), str(y2), str(duration)],
-                device_port
-            )
-            if res is not None:
-                _mark_progress(device_port)
-                return True
-            return False
-        logger.error("perform_action: invalid parameters (%s)", action)
+        if _send_input(device_port, command):
+            _mark_progress(device_port)
+            return True
         return False
     except Exception as exc:
         logger.error("perform_action exception: %s", exc)
         return False
 
+def perform_actions_batch(device_port: str, ops: Sequence[Tuple]) -> bool:
+    """複数のtap/swipe操作を1回のシェル呼び出しでまとめて実行します。
+
+    Args:
+        device_port: 対象デバイスのポート
+        ops: ``perform_action`` の位置引数と同じ並びのタプル列
+            （例: ``("tap", 100, 200)`` や ``("swipe", 100, 200, 300, 400, 300)``）。
+            ``("sleep", 秒)`` は操作の間に端末側で待機する
+
+    Returns:
+        全操作が成功した場合はTrue（途中で失敗した時点で後続は実行しない）
+
+    Example:
+        >>> perform_actions_batch("127.0.0.1:62001", [("tap", 100, 200), ("sleep", 1), ("tap", 300, 400)])
+        True
+    """
+    commands = []
+    total_sleep = 0.0
+    for op in ops:
+        if op and op[0] == "sleep":
+            total_sleep += float(op[1])
+            commands.append(f"sleep {op[1]}")
+            continue
+        command = _input_command(*op)
+        if command is None:
+            logger.error("perform_actions_batch: invalid parameters (%s)", op)
+            return False
+        commands.append(command)
+    if not commands:
+        return True
+    try:
+        # 端末側の待機分だけタイムアウトを延ばす
+        if _send_input(device_port, " && ".join(commands), _DEFAULT_TIMEOUT + int(total_sleep + 0.999)):
+            _mark_progress(device_port)
+            return True
+        return False
+    except Exception as exc:
+        logger.error("perform_actions_batch exception: %s", exc)
+        return False
+
 def reset_adb_server(force: bool = False) -> bool:
     """ADBサーバーを再起動します。"""
     cfg = get_config()
     if getattr(cfg, "skip_adb_reset", False) and not force:
         logger.info("reset_adb_server: skip_adb_reset=True のためADBリセットを行いません")
         return True
-    if not cfg.NOX_ADB_PATH:
+    adb_path = _adb_path()
+    if not adb_path:
         logger.error("NOX_ADB_PATH not set in config.json")
         return False
 
-    with _state.adb_reset_lock:
-        now = time.time()
-        elapsed = now - _state.last_adb_reset
-        if elapsed < max(2.0, _ADB_RESET_BACKOFF if not force else _ADB_RESET_BACKOFF / 2):
-            with _state.error_lock:
-                recent_error_count = len(_state.recent_adb_errors)
-            if not force:
-                if recent_error_count < _ADB_RESET_ERROR_THRESHOLD:
-                    logger.debug("ADB reset skipped due to throttle (%.2fs since last)", elapsed)
-                    return True
-                logger.warning(
-                    "ADB reset throttle bypassed (%d rapid errors within %.0fs)",
-                    recent_error_count,
-                    _RECENT_ERROR_WINDOW,
-                )
-            else:
-                logger.debug("ADB reset (forced) skipped due to rapid repeat (%.2fs since last)", elapsed)
-                return True
+    # 既に別スレッドがリセット中なら、そのリセットの完了（世代の更新）と結果を待つ
+    with _state.reset_cond:
+        if _state.reset_running:
+            generation = _state.reset_generation
+            if not _state.reset_cond.wait_for(
+                lambda: _state.reset_generation != generation, _ADB_RESET_WAIT_TIMEOUT
+            ):
+                return False
+            return _state.reset_result
+        _state.reset_running = True
 
-        logger.warning("Restarting ADB server%s", " (forced)" if force else "")
-        kill_cmd = [cfg.NOX_ADB_PATH, "kill-server"]
-        start_cmd = [cfg.NOX_ADB_PATH, "start-server"]
-        for cmd in (kill_cmd, start_cmd):
-            _run(cmd, timeout=10)
-
-        for attempt in range(_ADB_RESET_VERIFY_ATTEMPTS):
-            wait_seconds = 1.0 + attempt * 0.5
-            time.sleep(wait_seconds)
-            if check_adb_server():
-                _state.last_adb_reset = time.time()
-                with _state.error_lock:
-                    _state.recent_adb_errors.clear()
-                with _state.reconnect_lock:
-                    _state.reconnect_failures.clear()
-                    _state.reconnect_restart_inflight.clear()
+    result = False
+    try:
+        result = _reset_adb_server_locked(adb_path, force)
+        return result
+    finally:
+        with _state.reset_cond:
+            _state.reset_result = result
+            _state.reset_generation += 1
+            _state.reset_running = False
+            _state.reset_cond.notify_all()
+
+
+def _reset_adb_server_locked(adb_path: str, force: bool) -> bool:
+    """reset_adb_server の本体（reset_running を立てたスレッドのみが呼ぶ）。"""
+    now = time.time()
+    elapsed = now - _state.last_adb_reset
+    if elapsed < max(2.0, _ADB_RESET_BACKOFF if not force else _ADB_RESET_BACKOFF / 2):
+        with _state.error_lock:
+            recent_error_count = sum(
+                1 for stamp in _state.recent_adb_errors if now - stamp <= _RECENT_ERROR_WINDOW
+            )
+        if not force:
+            if recent_error_count < _ADB_RESET_ERROR_THRESHOLD:
+                logger.debug("ADB reset skipped due to throttle (%.2fs since last)", elapsed)
+                return True
+            logger.warning(
+                "ADB reset throttle bypassed (%d rapid errors within %.0fs)",
+                recent_error_count,
+                _RECENT_ERROR_WINDOW,
+            )
+        else:
+            logger.debug("ADB reset (forced) skipped due to rapid repeat (%.2fs since last)", elapsed)
+            return True
+
+    logger.warning("Restarting ADB server%s", " (forced)" if force else "")
+    kill_cmd = [adb_path, "kill-server"]
+    start_cmd = [adb_path, "start-server"]
+    for cmd in (kill_cmd, start_cmd):
+        _run(cmd, timeout=10)
+    # kill-serverで常駐シェルも切断されるため破棄して次回に再生成させる
+    close_shell_sessions()
+    _invalidate_device_states()
+
+    for attempt in range(_ADB_RESET_VERIFY_ATTEMPTS):
+        wait_seconds = 1.0 + attempt * 0.5
+        time.sleep(wait_seconds)
+        if check_adb_server():
+            _state.last_adb_reset = time.time()
+            with _state.error_lock:
+                _state.recent_adb_errors.clear()
+            with _state.reconnect_lock:
+                _state.reconnect_failures.clear()
+                _state.reconnect_restart_inflight.clear()
+            device_management = _get_device_management()
+            if device_management is not None:
                 try:
-                    from monst.image.device_management import notify_adb_reset
-
-                    notify_adb_reset(_state.last_adb_reset)
+                    device_management.notify_adb_reset(_state.last_adb_reset)
                 except Exception:
                     pass
-                logger.debug(
-                    "ADB server restart confirmed after %.1fs",
-                    time.time() - now,
-                )
-                return True
+            logger.debug(
+                "ADB server restart confirmed after %.1fs",
+                time.time() - now,
+            )
+            return True
 
-        _state.last_adb_reset = time.time()
-        logger.error("ADB server restart could not be confirmed")
-        return False
+    _state.last_adb_reset = time.time()
+    logger.error("ADB server restart could not be confirmed")
+    return False
+
+
+def _get_device_states(ttl: float = _DEVICES_CACHE_TTL) -> Dict[str, str]:
+    """`adb devices` の {serial: state} を返す（ttl秒以内の結果は共有する）。"""
+    if time.monotonic() - _state.devices_cache_time < ttl:
+        return _state.devices_cache
+    with _state.devices_lock:
+        # 待っている間に他スレッドが更新していればそれを使う
+        if time.monotonic() - _state.devices_cache_time < ttl:
+            return _state.devices_cache
+        future = _state.devices_inflight
+        leader = future is None
+        if leader:
+            future = _state.devices_inflight = Future()
+
+    if not leader:
+        # 実行中の `adb devices` の結果を待つ（adbサーバーが遅い場合は前回の結果で代用）
+        try:
+            return future.result(timeout=_DEVICES_WAIT_TIMEOUT)
+        except Exception:
+            return _state.devices_cache
+
+    states: Dict[str, str] = {}
+    try:
+        out = run_adb_command(["devices"], None, timeout=3)
+        states = dict(_DEVICES_RE.findall(out)) if out else {}
+    finally:
+        with _state.devices_lock:
+            _state.devices_cache = states
+            _state.devices_cache_time = time.monotonic()
+            _state.devices_inflight = None
+        future.set_result(states)
+    return states
+
+
+def _invalidate_device_states() -> None:
+    _state.devices_cache_time = 0.0
 
 
 def is_device_available(device_port: str) -> bool:
@@ -603,10 +867,12 @@ def is_device_available(device_port: str) -> bool:
         デバイスが利用可能でping応答があればTrue
     """
     try:
-        out = run_adb_command(["devices"], None, timeout=3)
-        if not out or device_port not in out or "device" not in out:
+        if _get_device_states().get(device_port) != "device":
             return False
-        echo = run_adb_command(["shell", "echo", "ping"], device_port, timeout=5)
+        # 応答確認は常駐シェルで行い、使えない場合のみワンショットで送る
+        echo = run_in_shell_session(device_port, "echo ping", timeout=5)
+        if echo is None:
+            echo = run_adb_command(["shell", "echo", "ping"], device_port, timeout=5)
         return bool(echo and "ping" in echo)
     except Exception as e:
         logger.debug(f"Device availability check failed for {device_port}: {e}")
@@ -621,11 +887,11 @@ def reconnect_device(device_port: str) -> bool:
     Returns:
         再接続成功時はTrue
     """
-    cfg = get_config()
+    adb_path = _adb_path()
     last_error = "Unknown error"
 
     for attempt in range(1, _MAX_RECONNECT_ATTEMPTS + 1):
-        _run([cfg.NOX_ADB_PATH, "disconnect", device_port], timeout=5)
+        _run([adb_path, "disconnect", device_port], timeout=5)
         time.sleep(0.5)
 
         if attempt > 1:
@@ -639,7 +905,8 @@ def reconnect_device(device_port: str) -> bool:
             )
             reset_adb_server(force=True)
 
-        out, err, rc = _run([cfg.NOX_ADB_PATH, "connect", device_port], timeout=10)
+        out, err, rc = _run([adb_path, "connect", device_port], timeout=10)
+        _invalidate_device_states()
         response = (out or err or "").strip()
         normalized = response.lower()
 
@@ -648,12 +915,12 @@ def reconnect_device(device_port: str) -> bool:
             if is_device_available(device_port):
                 logger.info("Device %s successfully reconnected and verified", device_port)
                 _reset_reconnect_state(device_port)
-                try:
-                    from monst.image.device_management import mark_device_recovered
-
-                    mark_device_recovered(device_port)
-                except Exception:
-                    pass
+                device_management = _get_device_management()
+                if device_management is not None:
+                    try:
+                        device_management.mark_device_recovered(device_port)
+                    except Exception:
+                        pass
                 return True
 
         last_error = response or "Unknown error"
@@ -692,5 +959,5 @@ def check_adb_server() -> bool:
     Returns:
         ADBサーバーが正常に動作していればTrue
     """
-    _, _, rc = _run([get_config().NOX_ADB_PATH, "devices"], timeout=5)
+    _, _, rc = _run([_adb_path(), "devices"], timeout=5)
     return rc == 0
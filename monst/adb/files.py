@@ -6,10 +6,33 @@ monst.adb.files - File management utilities for device storage.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import os
-from typing import Optional
+import re
+import shlex
+import stat
+import time
+import traceback
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
 
-from .core import run_adb_command, APP_PACKAGE
+from config import get_config_value
+from logging_util import logger
+from monst.async_support import AsyncBatch, async_wrapper
+from .core import (
+    _adb_platform_tools_version,
+    _run_shell,
+    run_adb_command,
+    run_adb_command_detailed,
+    reconnect_device,
+    APP_PACKAGE,
+)
+
+_RM_BATCH_SIZE = 100  # 1回のrmに渡すパス数の上限（ARG_MAX対策）
+_MAIN_TERMINAL_PORT = "127.0.0.1:62025"  # 応答なし時に復旧システムを起動するメイン端末
+_PUSH_COMPRESSION_MIN_TOOLS = 31  # adb push -z に対応する platform-tools のバージョン
+_PULL_BYTES_RE = re.compile(r"(\d+) bytes")
 
 def remove_data10_bin_from_nox(device_port: str) -> None:
     """NOXデバイスからMonster Strikeのデータファイルを完全削除します。
@@ -24,58 +47,61 @@ def remove_data10_bin_from_nox(device_port: str) -> None:
         3. データベースファイル削除 (databases)
         4. キャッシュディレクトリクリア (cache)
     """
-    from logging_util import logger
-    
     logger.info(f"🗑️ Monster Strike完全初期化開始 (ポート: {device_port})")
     
-    # Step 1: 主要データファイル削除
+    app_dir = f"/data/data/{APP_PACKAGE}"
+    # 主要データファイル (data10.bin ほか)
     data_files = [
-        f"/data/data/{APP_PACKAGE}/data10.bin",
-        f"/data/data/{APP_PACKAGE}/data11.bin", 
-        f"/data/data/{APP_PACKAGE}/data13.bin",
-        f"/data/data/{APP_PACKAGE}/data14.bin",
-        f"/data/data/{APP_PACKAGE}/data16.bin",
-        f"/data/data/{APP_PACKAGE}/data18.bin",
+        f"{app_dir}/data10.bin",
+        f"{app_dir}/data11.bin",
+        f"{app_dir}/data13.bin",
+        f"{app_dir}/data14.bin",
+        f"{app_dir}/data16.bin",
+        f"{app_dir}/data18.bin",
     ]
-    
-    # logger.info("  • 主要データファイルを削除中...")
-    for fp in data_files:
-        run_adb_command(["shell", "rm", "-f", fp], device_port)
-    
-    # Step 2: 共有設定ファイル削除 (アカウント設定など)
-    # logger.info("  • 共有設定ファイルを削除中...")
-    run_adb_command([
-        "shell", "rm", "-rf", 
-        f"/data/data/{APP_PACKAGE}/shared_prefs"
-    ], device_port)
-    
-    # Step 3: データベースファイル削除
-    # logger.info("  • データベースファイルを削除中...")
-    run_adb_command([
-        "shell", "rm", "-rf", 
-        f"/data/data/{APP_PACKAGE}/databases"
-    ], device_port)
-    
-    # Step 4: キャッシュクリア
-    # logger.info("  • キャッシュをクリア中...")
-    run_adb_command([
-        "shell", "rm", "-rf", 
-        f"/data/data/{APP_PACKAGE}/cache"
-    ], device_port)
-    
-    # Step 5: アプリ固有ファイル削除 (存在する場合)
-    # logger.info("  • 追加ファイルをクリア中...")
-    additional_files = [
-        f"/data/data/{APP_PACKAGE}/files",
-        f"/data/data/{APP_PACKAGE}/code_cache",
-        f"/data/data/{APP_PACKAGE}/no_backup"
+    # 共有設定・データベース・キャッシュ・アプリ固有ファイル
+    directories = [
+        f"{app_dir}/shared_prefs",
+        f"{app_dir}/databases",
+        f"{app_dir}/cache",
+        f"{app_dir}/files",
+        f"{app_dir}/code_cache",
+        f"{app_dir}/no_backup",
     ]
-    
-    for fp in additional_files:
-        run_adb_command(["shell", "rm", "-rf", fp], device_port)
+    all_paths = data_files + directories
+
+    # 1パスずつadbを起動せず、rm -rf 1回にまとめる（-fなので存在しないパスは無視される）
+    for start in range(0, len(all_paths), _RM_BATCH_SIZE):
+        batch = all_paths[start:start + _RM_BATCH_SIZE]
+        run_adb_command(
+            ["shell", "rm -rf " + " ".join(shlex.quote(p) for p in batch)],
+            device_port,
+        )
     
     logger.info("✅ Monster Strike完全初期化完了")
 
+def remove_data10_bin_from_nox_many(device_ports: Sequence[str]) -> List[Optional[Exception]]:
+    """複数端末のMonster Strikeデータファイルを並列に削除します。
+    
+    Args:
+        device_ports: 対象デバイスのポート一覧
+        
+    Returns:
+        ポートと同じ順序の結果リスト（成功はNone、失敗は発生した例外）
+    """
+    ports = list(device_ports)
+    if not ports:
+        return []
+    return asyncio.run(_remove_data10_bin_many(ports))
+
+async def _remove_data10_bin_many(ports: List[str]) -> List[Optional[Exception]]:
+    remove = async_wrapper(remove_data10_bin_from_nox)
+    batch = AsyncBatch(max_concurrent=min(16, len(ports)))
+    for port in ports:
+        batch.add(remove, port)
+    # remove_data10_bin_from_nox は成功時にNoneを返すため、結果はそのまま成否を表す
+    return await batch.execute(return_exceptions=True)
+
 def pull_file_from_nox(device_port: str, folder_name: str) -> bool:
     """デバイスからdata10.binを指定フォルダにプルします。
     
@@ -98,8 +124,295 @@ def pull_file_from_nox(device_port: str, folder_name: str) -> bool:
     remote = f"/data/data/{APP_PACKAGE}/data10.bin"
     local_path = os.path.join(local_dir, "data10.bin")
 
+    remote_size = _remote_file_size(device_port, remote)
     out = run_adb_command(["pull", remote, local_path], device_port)
-    return bool(out and os.path.exists(local_path) and os.path.getsize(local_path))
+    if out is None:
+        return False
+
+    # adbの転送サマリー（"... (12345 bytes in 0.01s)"）から転送量を取得
+    # （成功しても標準出力が空の場合は、下の保存先サイズでの判定に回す）
+    match = _PULL_BYTES_RE.search(out) if out else None
+    if match:
+        pulled = int(match.group(1))
+    else:
+        # 古いadbはサマリーを標準エラーに出すため、保存先のサイズで代用
+        try:
+            pulled = os.path.getsize(local_path)
+        except OSError:
+            return False
+    if remote_size is not None and pulled != remote_size:
+        logger.warning(f"⚠️ プルサイズ不一致: リモート{remote_size} != 取得{pulled} ({device_port})")
+        return False
+    return pulled > 0
+
+def _remote_file_size(device_port: str, remote: str) -> Optional[int]:
+    """デバイス上のファイルサイズを返します（取得できない場合はNone）。"""
+    out = _run_shell(device_port, f"stat -c %s {remote}")
+    try:
+        return int(out.strip()) if out else None
+    except ValueError:
+        return None
+
+@dataclass(frozen=True)
+class _LocalFileInfo:
+    """プッシュ元ローカルファイルの診断結果（再試行時も使い回す）"""
+    path: str
+    size: int
+    mode: str
+    mtime: float
+
+def _inspect_local_file(local_dir: str, local_path: str) -> Optional[_LocalFileInfo]:
+    """ローカルファイルを診断し、プッシュ可能なら情報を返します（不可ならNone）。"""
+    if not os.path.exists(local_dir):
+        logger.error(f"❌ ディレクトリが存在しません: {local_dir}")
+        return None
+        
+    if not os.path.exists(local_path):
+        logger.error(f"❌ ローカルファイルが見つかりません: {local_path}")
+        # フォルダ内容を確認
+        try:
+            files = os.listdir(local_dir)
+            logger.info(f"📂 フォルダ内容: {files}")
+        except:
+            logger.error("📂 フォルダ内容の取得に失敗")
+        return None
+    
+    # ファイル詳細情報
+    file_stat = os.stat(local_path)
+    info = _LocalFileInfo(
+        path=local_path,
+        size=file_stat.st_size,
+        mode=stat.filemode(file_stat.st_mode),
+        mtime=file_stat.st_mtime,
+    )
+    
+    logger.info(
+        "📊 ファイル情報:\n  - サイズ: %s bytes\n  - 権限: %s\n  - 修正日時: %s",
+        f"{info.size:,}", info.mode, info.mtime,
+    )
+    
+    if info.size == 0:
+        logger.error(f"❌ ローカルファイルが空です: {local_path}")
+        return None
+    
+    if info.size > 100 * 1024 * 1024:  # 100MB制限
+        logger.warning(f"⚠️ ファイルが大きすぎます: {info.size:,} bytes")
+    return info
+
+def _push_options() -> list:
+    """adb push の追加オプション（設定 adb_push_compression 有効かつ対応adbの場合のみ圧縮）"""
+    if not get_config_value("adb_push_compression", False):
+        return []
+    if _adb_platform_tools_version() < _PUSH_COMPRESSION_MIN_TOOLS:
+        return []
+    return ["-z", "brotli"]
+
+_recovery_system = None
+
+def _get_recovery_system():
+    """device_recovery_system（任意導入）を遅延解決し、成功後はキャッシュして返す。"""
+    global _recovery_system
+    if _recovery_system is None:
+        try:
+            import device_recovery_system as module
+        except ImportError:
+            return None
+        _recovery_system = module
+    return _recovery_system
+
+def _file_sha1(path: str) -> str:
+    with open(path, "rb") as f:
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha1").hexdigest()
+        digest = hashlib.sha1()
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+def _remote_matches_local(device_port: str, remote: str, local_path: str) -> bool:
+    """端末上のファイルとローカルファイルのSHA-1が一致するか確認します。
+
+    端末側でハッシュを取得できない場合（ファイルなし・sha1sum非対応）はFalse。
+    その場合はローカルのハッシュ計算も省略します。
+    """
+    remote_out = _run_shell(device_port, f"sha1sum -b {remote} 2>/dev/null")
+    if not remote_out:
+        return False
+    return remote_out.split(maxsplit=1)[0].lower() == _file_sha1(local_path)
+
+def _device_responds(device_port: str) -> bool:
+    device_check = _run_shell(device_port, "echo device_test")
+    return bool(device_check and "device_test" in device_check)
+
+def _recover_main_terminal(device_port: str) -> Optional[str]:
+    """メイン端末復旧システムを起動し、使用すべきポートを返します（失敗時はNone）。"""
+    logger.warning("🤖 メイン端末復旧システムを起動します...")
+    recovery_system = _get_recovery_system()
+    if recovery_system is None:
+        logger.error("復旧システムがインポートできません")
+        return None
+    try:
+        recovered_port = recovery_system.ensure_main_terminal_available(device_port)
+    except Exception as e:
+        logger.error(f"復旧システム実行エラー: {e}")
+        return None
+    if not recovered_port:
+        logger.error("❌ メイン端末復旧システムも失敗しました")
+        return None
+    return recovered_port
+
+@dataclass(frozen=True)
+class _PushJob:
+    """診断・事前準備を終えたプッシュ対象（再試行間で共有）"""
+    device_port: str
+    folder_name: str
+    local: _LocalFileInfo
+    remote_dir: str
+    remote: str
+    push_options: tuple
+
+_PUSH_ATTEMPTS = 3  # 最大試行回数
+
+def _prepare_push(device_port: str, folder_name: str) -> Tuple[Optional[_PushJob], bool]:
+    """ローカル診断・端末確認・事前準備を行います。
+    
+    Returns:
+        (プッシュ対象, 結果)。プッシュ不要・不可の場合は対象がNoneで、結果をそのまま返す
+    """
+    from utils import get_base_path
+    
+    local_dir = os.path.join(get_base_path(), "bin_push", folder_name)
+    local_path = os.path.join(local_dir, "data10.bin")
+    
+    # ステップ1: 詳細なローカルファイル診断（代替端末へ切り替えても再診断しない）
+    logger.info(
+        "🔍 ファイルプッシュ診断開始: %s -> %s\n📁 ローカルディレクトリ: %s\n📄 ローカルファイル: %s",
+        folder_name, device_port, local_dir, local_path,
+    )
+    
+    local_info = _inspect_local_file(local_dir, local_path)
+    if local_info is None:
+        return None, False
+    
+    # ステップ2: デバイス状態確認（復旧システム付き）
+    # メイン端末が応答しない場合のみ復旧を行い、代替端末が返れば1度だけ切り替える
+    for _ in range(2):
+        logger.info(f"📱 デバイス状態確認: {device_port}")
+        if _device_responds(device_port):
+            break
+        logger.error(f"❌ デバイス応答なし: {device_port}")
+        if device_port != _MAIN_TERMINAL_PORT:
+            return None, False
+        recovered_port = _recover_main_terminal(device_port)
+        if recovered_port is None:
+            return None, False
+        if recovered_port == device_port:
+            logger.info(f"🔧 メイン端末復旧成功: {device_port}")
+            if not _device_responds(device_port):
+                logger.error(f"❌ 復旧後も応答なし: {device_port}")
+                return None, False
+            break
+        logger.warning(f"🔄 代替メイン端末を使用: {device_port} -> {recovered_port}")
+        device_port = recovered_port
+    else:
+        return None, False
+    
+    remote_dir = f"/data/data/{APP_PACKAGE}"
+    remote = f"{remote_dir}/data10.bin"
+    
+    # 端末上に同一内容のファイルが既にあればプッシュを省略
+    if _remote_matches_local(device_port, remote, local_path):
+        logger.info(f"✅ 同一内容のため転送を省略: {folder_name} -> {device_port}")
+        return None, True
+    
+    # デバイス容量確認
+    df_check = _run_shell(device_port, "df /data", timeout=10)
+    if df_check:
+        logger.info(f"💾 デバイス容量: {df_check.strip()}")
+    
+    # ステップ3: 対象ディレクトリの権限確認・修正
+    logger.info(f"🔧 デバイス権限設定確認: {remote_dir}")
+    
+    # ディレクトリ作成・権限設定・既存ファイル削除を1回のシェル呼び出しで実行
+    # （各コマンドの成否に関わらず全て実行する）
+    _run_shell(device_port, f"mkdir -p {remote_dir}; chmod 755 {remote_dir}; rm -f {remote}")
+    
+    job = _PushJob(
+        device_port=device_port,
+        folder_name=folder_name,
+        local=local_info,
+        remote_dir=remote_dir,
+        remote=remote,
+        push_options=tuple(_push_options()),
+    )
+    return job, False
+
+def _push_once(job: _PushJob, attempt: int) -> bool:
+    """ファイルプッシュを1回試行し、失敗時は原因を分析・可能なら修正します。"""
+    device_port, remote, file_size = job.device_port, job.remote, job.local.size
+    logger.info(f"📤 ファイルプッシュ試行 {attempt + 1}/{_PUSH_ATTEMPTS}: {job.local.path} -> {remote}")
+    
+    # 詳細診断版のADBコマンドを使用
+    stdout, stderr, returncode = run_adb_command_detailed(
+        ["push", *job.push_options, job.local.path, remote], device_port, timeout=60
+    )
+    
+    # 詳細なエラー診断
+    if returncode == 0 and stdout:
+        logger.info(f"📤 プッシュ出力: {stdout.strip()}")
+        
+        # プッシュ後検証（存在確認とサイズ取得を1回のシェル呼び出しで行う）
+        size_out = _run_shell(device_port, f"stat -c %s {remote} 2>/dev/null || echo MISSING")
+        size_text = (size_out or "").strip()
+        if size_text.isdigit():
+            remote_size = int(size_text)
+            logger.info(f"✅ プッシュ検証: ローカル{file_size} -> リモート{remote_size}")
+            
+            if remote_size == file_size:
+                logger.info(f"✅ ファイルプッシュ成功: {job.folder_name} -> {device_port}")
+                return True
+            else:
+                logger.warning(f"⚠️ サイズ不一致: ローカル{file_size} != リモート{remote_size}")
+        elif size_text == "MISSING":
+            logger.warning(f"⚠️ プッシュ後のリモートファイルを確認できません: {remote}")
+        else:
+            logger.warning(f"⚠️ リモートサイズ取得失敗: {size_out}")
+        
+        logger.info(f"✅ ファイルプッシュ成功（検証スキップ）: {job.folder_name} -> {device_port}")
+        return True
+    
+    # 詳細なエラー情報をログ出力
+    logger.error(
+        "❌ プッシュ失敗（試行 %d/%d）:\n  - リターンコード: %s\n  - 標準出力: %s\n  - 標準エラー: %s",
+        attempt + 1, _PUSH_ATTEMPTS, returncode, stdout, stderr,
+    )
+    
+    # エラー原因を分析
+    if stderr:
+        error_lower = stderr.lower()
+        if "permission denied" in error_lower:
+            logger.error("🔒 権限エラー検出 - デバイス権限を確認してください")
+            # 権限修正を試行
+            run_adb_command(["shell", "su", "-c", f"chmod 777 {job.remote_dir}"], device_port)
+        elif "no space" in error_lower or "space left" in error_lower:
+            logger.error("💾 容量不足エラー検出 - デバイスの空き容量を確認してください")
+        elif "device not found" in error_lower or "device offline" in error_lower:
+            logger.error("📱 デバイス接続エラー検出 - ADB接続を確認してください")
+            # デバイス再接続を試行
+            if reconnect_device(device_port):
+                logger.info("🔗 デバイス再接続成功、次の試行を続行")
+            else:
+                logger.error("🔗 デバイス再接続失敗")
+        elif "read-only" in error_lower:
+            logger.error("📝 読み取り専用エラー検出 - ファイルシステムの状態を確認してください")
+        else:
+            logger.error(f"❓ 不明なエラー: {stderr}")
+    return False
+
+def _push_backoff(attempt: int) -> int:
+    wait_time = 2 ** attempt  # 指数バックオフ（1秒、2秒、4秒）
+    logger.info(f"⏳ {wait_time}秒待機後、再試行します...")
+    return wait_time
 
 def push_file_to_nox(device_port: str, folder_name: str) -> bool:
     """指定フォルダのdata10.binをデバイスにプッシュします（診断機能付き）。
@@ -115,180 +428,48 @@ def push_file_to_nox(device_port: str, folder_name: str) -> bool:
         >>> push_file_to_nox("127.0.0.1:62025", "001")
         True  # bin_push/001/data10.bin をデバイスにプッシュ
     """
-    from utils import get_base_path
-    from logging_util import logger
-    import stat
-    
     try:
-        local_dir = os.path.join(get_base_path(), "bin_push", folder_name)
-        local_path = os.path.join(local_dir, "data10.bin")
-        
-        # ステップ1: 詳細なローカルファイル診断
-        logger.info(f"🔍 ファイルプッシュ診断開始: {folder_name} -> {device_port}")
-        logger.info(f"📁 ローカルディレクトリ: {local_dir}")
-        logger.info(f"📄 ローカルファイル: {local_path}")
-        
-        if not os.path.exists(local_dir):
-            logger.error(f"❌ ディレクトリが存在しません: {local_dir}")
-            return False
-            
-        if not os.path.exists(local_path):
-            logger.error(f"❌ ローカルファイルが見つかりません: {local_path}")
-            # フォルダ内容を確認
-            try:
-                files = os.listdir(local_dir)
-                logger.info(f"📂 フォルダ内容: {files}")
-            except:
-                logger.error("📂 フォルダ内容の取得に失敗")
-            return False
-        
-        # ファイル詳細情報
-        file_size = os.path.getsize(local_path)
-        file_stat = os.stat(local_path)
-        file_mode = stat.filemode(file_stat.st_mode)
-        
-        logger.info(f"📊 ファイル情報:")
-        logger.info(f"  - サイズ: {file_size:,} bytes")
-        logger.info(f"  - 権限: {file_mode}")
-        logger.info(f"  - 修正日時: {file_stat.st_mtime}")
-        
-        if file_size == 0:
-            logger.error(f"❌ ローカルファイルが空です: {local_path}")
-            return False
-        
-        if file_size > 100 * 1024 * 1024:  # 100MB制限
-            logger.warning(f"⚠️ ファイルが大きすぎます: {file_size:,} bytes")
+        job, result = _prepare_push(device_port, folder_name)
+        if job is None:
+            return result
         
-        # ステップ2: デバイス状態確認（復旧システム付き）
-        logger.info(f"📱 デバイス状態確認: {device_port}")
+        # ステップ4: ファイルプッシュ実行（詳細診断付きリトライ）
+        for attempt in range(_PUSH_ATTEMPTS):
+            if _push_once(job, attempt):
+                return True
+            if attempt < _PUSH_ATTEMPTS - 1:  # 最後の試行でなければ待機
+                time.sleep(_push_backoff(attempt))
         
-        # デバイス接続確認
-        device_check = run_adb_command(["shell", "echo", "device_test"], device_port)
-        if not device_check or "device_test" not in device_check:
-            logger.error(f"❌ デバイス応答なし: {device_port}")
+        logger.error(f"❌ ファイルプッシュ失敗: {folder_name} -> {job.device_port} (全試行失敗)")
+        return False
             
-            # メイン端末の場合は復旧システムを起動
-            if device_port == "127.0.0.1:62025":
-                logger.warning("🤖 メイン端末復旧システムを起動します...")
-                try:
-                    from device_recovery_system import ensure_main_terminal_available
-                    recovered_port = ensure_main_terminal_available(device_port)
-                    if recovered_port and recovered_port != device_port:
-                        logger.warning(f"🔄 代替メイン端末を使用: {device_port} -> {recovered_port}")
-                        # 代替端末で再試行
-                        return push_file_to_nox(recovered_port, folder_name)
-                    elif recovered_port == device_port:
-                        logger.info(f"🔧 メイン端末復旧成功: {device_port}")
-                        # 復旧後に再試行
-                        device_check = run_adb_command(["shell", "echo", "device_test"], device_port)
-                        if not device_check or "device_test" not in device_check:
-                            logger.error(f"❌ 復旧後も応答なし: {device_port}")
-                            return False
-                    else:
-                        logger.error("❌ メイン端末復旧システムも失敗しました")
-                        return False
-                except ImportError:
-                    logger.error("復旧システムがインポートできません")
-                    return False
-                except Exception as e:
-                    logger.error(f"復旧システム実行エラー: {e}")
-                    return False
-            else:
-                return False
-        
-        # デバイス容量確認
-        df_check = run_adb_command(["shell", "df", "/data"], device_port, timeout=10)
-        if df_check:
-            logger.info(f"💾 デバイス容量: {df_check.strip()}")
-        
-        # ステップ3: 対象ディレクトリの権限確認・修正
-        remote_dir = f"/data/data/{APP_PACKAGE}"
-        remote = f"{remote_dir}/data10.bin"
-        
-        logger.info(f"🔧 デバイス権限設定確認: {remote_dir}")
-        
-        # ディレクトリ作成と権限設定
-        run_adb_command(["shell", "mkdir", "-p", remote_dir], device_port)
-        run_adb_command(["shell", "chmod", "755", remote_dir], device_port)
-        
-        # 既存ファイル削除
-        run_adb_command(["shell", "rm", "-f", remote], device_port)
+    except Exception as e:
+        logger.error(f"❌ ファイルプッシュエラー: {e}")
+        logger.error(f"📋 スタックトレース: {traceback.format_exc()}")
+        return False
+
+async def push_file_to_nox_async(device_port: str, folder_name: str) -> bool:
+    """push_file_to_nox の非同期版。
+    
+    adb呼び出しはスレッドで実行し、再試行までの待機は ``asyncio.sleep`` で行うため、
+    待機中にワーカースレッドを占有しません。引数・戻り値は push_file_to_nox と同じです。
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        job, result = await loop.run_in_executor(None, _prepare_push, device_port, folder_name)
+        if job is None:
+            return result
         
-        # ステップ4: ファイルプッシュ実行（詳細診断付きリトライ）
-        for attempt in range(3):  # 最大3回リトライ
-            logger.info(f"📤 ファイルプッシュ試行 {attempt + 1}/3: {local_path} -> {remote}")
-            
-            # 詳細診断版のADBコマンドを使用
-            from .core import run_adb_command_detailed
-            
-            stdout, stderr, returncode = run_adb_command_detailed(
-                ["push", local_path, remote], device_port, timeout=60
-            )
-            
-            # 詳細なエラー診断
-            if returncode == 0 and stdout:
-                logger.info(f"📤 プッシュ出力: {stdout.strip()}")
-                
-                # プッシュ後検証
-                verify_cmd = run_adb_command(["shell", "ls", "-la", remote], device_port)
-                if verify_cmd and "data10.bin" in verify_cmd:
-                    # ファイルサイズ確認
-                    size_cmd = run_adb_command(["shell", "stat", "-c", "%s", remote], device_port)
-                    if size_cmd:
-                        try:
-                            remote_size = int(size_cmd.strip())
-                            logger.info(f"✅ プッシュ検証: ローカル{file_size} -> リモート{remote_size}")
-                            
-                            if remote_size == file_size:
-                                logger.info(f"✅ ファイルプッシュ成功: {folder_name} -> {device_port}")
-                                return True
-                            else:
-                                logger.warning(f"⚠️ サイズ不一致: ローカル{file_size} != リモート{remote_size}")
-                        except ValueError:
-                            logger.warning(f"⚠️ リモートサイズ取得失敗: {size_cmd}")
-                
-                logger.info(f"✅ ファイルプッシュ成功（検証スキップ）: {folder_name} -> {device_port}")
+        for attempt in range(_PUSH_ATTEMPTS):
+            if await loop.run_in_executor(None, _push_once, job, attempt):
                 return True
-            else:
-                # 詳細なエラー情報をログ出力
-                logger.error(f"❌ プッシュ失敗（試行 {attempt + 1}/3）:")
-                logger.error(f"  - リターンコード: {returncode}")
-                logger.error(f"  - 標準出力: {stdout}")
-                logger.error(f"  - 標準エラー: {stderr}")
-                
-                # エラー原因を分析
-                if stderr:
-                    error_lower = stderr.lower()
-                    if "permission denied" in error_lower:
-                        logger.error("🔒 権限エラー検出 - デバイス権限を確認してください")
-                        # 権限修正を試行
-                        run_adb_command(["shell", "su", "-c", f"chmod 777 {remote_dir}"], device_port)
-                    elif "no space" in error_lower or "space left" in error_lower:
-                        logger.error("💾 容量不足エラー検出 - デバイスの空き容量を確認してください")
-                    elif "device not found" in error_lower or "device offline" in error_lower:
-                        logger.error("📱 デバイス接続エラー検出 - ADB接続を確認してください")
-                        # デバイス再接続を試行
-                        from .core import reconnect_device
-                        if reconnect_device(device_port):
-                            logger.info("🔗 デバイス再接続成功、次の試行を続行")
-                        else:
-                            logger.error("🔗 デバイス再接続失敗")
-                    elif "read-only" in error_lower:
-                        logger.error("📝 読み取り専用エラー検出 - ファイルシステムの状態を確認してください")
-                    else:
-                        logger.error(f"❓ 不明なエラー: {stderr}")
-            
-            if attempt < 2:  # 最後の試行でなければ待機
-                import time
-                wait_time = 2 ** attempt  # 指数バックオフ（1秒、2秒、4秒）
-                logger.info(f"⏳ {wait_time}秒待機後、再試行します...")
-                time.sleep(wait_time)
+            if attempt < _PUSH_ATTEMPTS - 1:  # 最後の試行でなければ待機
+                await asyncio.sleep(_push_backoff(attempt))
         
-        logger.error(f"❌ ファイルプッシュ失敗: {folder_name} -> {device_port} (全試行失敗)")
+        logger.error(f"❌ ファイルプッシュ失敗: {folder_name} -> {job.device_port} (全試行失敗)")
         return False
-            
+    
     except Exception as e:
         logger.error(f"❌ ファイルプッシュエラー: {e}")
-        import traceback
         logger.error(f"📋 スタックトレース: {traceback.format_exc()}")
-        return False
\ No newline at end of file
+        return False
@@ -6,12 +6,72 @@ NOX ULTRA-THINK 最終安定版 - ADB接続安定化 + シンプル確実方式
 
 from __future__ import annotations
 
+import functools
 import time
-from typing import Optional
+from types import MappingProxyType
+from typing import Optional, Sequence
 
-from .core import run_adb_command
+from .core import _DEFAULT_TIMEOUT, _run_shell, _send_input, run_adb_command
 from logging_util import logger
 
+# Android KeyCode完全マッピング
+_KEYCODES = MappingProxyType({
+    # 数字
+    '0': 7, '1': 8, '2': 9, '3': 10, '4': 11,
+    '5': 12, '6': 13, '7': 14, '8': 15, '9': 16,
+    # アルファベット (小文字) + 基本記号
+    'a': 29, 'b': 30, 'c': 31, 'd': 32, 'e': 33, 'f': 34,
+    'g': 35, 'h': 36, 'i': 37, 'j': 38, 'k': 39, 'l': 40,
+    'm': 41, 'n': 42, 'o': 43, 'p': 44, 'q': 45, 'r': 46,
+    's': 47, 't': 48, 'u': 49, 'v': 50, 'w': 51, 'x': 52,
+    'y': 53, 'z': 54,
+    '.': 56,  # KEYCODE_PERIOD
+    '@': 77,  # KEYCODE_AT
+})
+
+# ASCII大文字→小文字の変換表と、バイト値で直接引けるキーコード表（対応外はNone）
+_LOWER_TABLE = bytes(c | 0x20 if 0x41 <= c <= 0x5A else c for c in range(256))
+_KEYCODE_BY_BYTE = tuple(_KEYCODES.get(chr(c)) for c in range(256))
+
+# 数字→キーコードマッピング
+_NUMBER_KEYCODES = MappingProxyType({c: _KEYCODES[c] for c in "0123456789"})
+
+# NOX標準解像度でのQWERTYキーボード座標マッピング
+_KEYBOARD_COORDS = MappingProxyType({
+    # 数字行
+    '1': (72, 400),   '2': (144, 400),  '3': (216, 400),  '4': (288, 400),  '5': (360, 400),
+    '6': (432, 400),  '7': (504, 400),  '8': (576, 400),  '9': (648, 400),  '0': (720, 400),
+    # QWERTY行
+    'q': (72, 470),   'w': (144, 470),  'e': (216, 470),  'r': (288, 470),  't': (360, 470),
+    'y': (432, 470),  'u': (504, 470),  'i': (576, 470),  'o': (648, 470),  'p': (720, 470),
+    # ASDF行
+    'a': (108, 540),  's': (180, 540),  'd': (252, 540),  'f': (324, 540),  'g': (396, 540),
+    'h': (468, 540),  'j': (540, 540),  'k': (612, 540),  'l': (684, 540),
+    # ZXCV行
+    'z': (144, 610),  'x': (216, 610),  'c': (288, 610),  'v': (360, 610),  'b': (432, 610),
+    'n': (504, 610),  'm': (576, 610),
+})
+
+# バックスペース(67)×5 を1回の input keyevent で送るクリアコマンド
+_CLEAR_FIELD_COMMAND = "input keyevent " + " ".join(["67"] * 5)
+
+@functools.lru_cache(maxsize=None)
+def _keyevent_command(keycode: int) -> str:
+    """キーコードに対応する ``input keyevent`` コマンド文字列（キーコードごとに再利用）"""
+    return f"input keyevent {keycode}"
+
+@functools.lru_cache(maxsize=64)
+def _backspace_command(count: int) -> str:
+    """カーソルを末尾へ移動(123)してからバックスペース(67)をcount回送るコマンド"""
+    return "input keyevent 123 " + " ".join(["67"] * count)
+
+@functools.lru_cache(maxsize=1024)
+def _text_keycodes(text: str) -> tuple:
+    """テキストを送信するキーコード列に変換（対応外の文字は除外、同じテキストの再送は変換を省略）"""
+    # 対応文字はASCIIのみのため、バイト列に変換して表引きで小文字化・キーコード化する
+    data = text.encode("ascii", "ignore").translate(_LOWER_TABLE)
+    return tuple(code for code in map(_KEYCODE_BY_BYTE.__getitem__, data) if code is not None)
+
 def send_key_event(
     device_port: str, 
     *, 
@@ -49,35 +109,16 @@ def _send_text_stable_method(device_port: str, text: str, *, press_enter: bool =
 def _send_numbers_keycode(device_port: str, numbers: str, *, press_enter: bool = True) -> bool:
     """数字のみを物理キーコードで送信（バックスペースと同じ方式）"""
     
-    # 数字→キーコードマッピング
-    number_keycodes = {
-        '0': 7, '1': 8, '2': 9, '3': 10, '4': 11,
-        '5': 12, '6': 13, '7': 14, '8': 15, '9': 16
-    }
-    
     pass
     
     # 1. バックスペースでクリア（これは確実に動作）
-    for i in range(5):  # 5回バックスペース
-        backspace_result = _send_keyevent_with_retry(device_port, 67)
-        pass
-        time.sleep(0.2)
+    _clear_text_field(device_port)
     
-    # 2. 数字を1桁ずつ物理キーコードで送信
-    success_count = 0
-    for digit in numbers:
-        keycode = number_keycodes[digit]
-        result = _send_keyevent_with_retry(device_port, keycode)
-        if result:
-            success_count += 1
-        time.sleep(0.3)  # 適切な間隔
-    
-    # 3. Enter確定（これも確実に動作）
+    # 2. 数字とEnterを1回のシェル呼び出しにまとめて物理キーコードで送信
+    codes = [_NUMBER_KEYCODES[digit] for digit in numbers]
     if press_enter:
-        enter_result = _send_keyevent_with_retry(device_port, 66)
-    else:
-        enter_result = True
-    pass
+        codes.append(66)  # Enter確定
+    success_count = len(numbers) if _send_typed_keyevents(device_port, codes, len(numbers)) else 0
     
     success_rate = success_count / len(numbers)
     pass
@@ -92,47 +133,20 @@ def _send_text_keyevent_complete(
 ) -> bool:
     """完全keyevent方式 - 全ての文字をkeyeventで送信"""
     
-    # Android KeyCode完全マッピング
-    keycodes = {
-        # 数字
-        '0': 7, '1': 8, '2': 9, '3': 10, '4': 11,
-        '5': 12, '6': 13, '7': 14, '8': 15, '9': 16,
-        # アルファベット (小文字) + 基本記号
-        'a': 29, 'b': 30, 'c': 31, 'd': 32, 'e': 33, 'f': 34,
-        'g': 35, 'h': 36, 'i': 37, 'j': 38, 'k': 39, 'l': 40,
-        'm': 41, 'n': 42, 'o': 43, 'p': 44, 'q': 45, 'r': 46,
-        's': 47, 't': 48, 'u': 49, 'v': 50, 'w': 51, 'x': 52,
-        'y': 53, 'z': 54,
-        '.': 56,  # KEYCODE_PERIOD
-        '@': 77,  # KEYCODE_AT
-    }
-    
     pass
     
     # 1. バックスペースでクリア（確実に動作）
-    for i in range(5):
-        _send_keyevent_with_retry(device_port, 67)  # BACKSPACE
-        time.sleep(0.2)
-    
-    # 2. 文字を1つずつkeyeventで送信
-    success_count = 0
-    text_lower = text.lower()  # 小文字に変換
+    _clear_text_field(device_port)
     
-    for i, char in enumerate(text_lower):
-        if char in keycodes:
-            keycode = keycodes[char]
-            result = _send_keyevent_with_retry(device_port, keycode)
-            if result:
-                success_count += 1
-            time.sleep(0.4)  # 文字間隔
-        else:
-            pass
-    
-    # 3. Enter確定（必要な場合のみ）
+    # 2. 文字とEnterを1回のシェル呼び出しにまとめてkeyeventで送信
+    codes = _text_keycodes(text)
+    success_count = len(codes)
     if press_enter:
-        _send_keyevent_with_retry(device_port, 66)  # ENTER
+        codes += (66,)  # ENTER
+    if not codes or not _send_typed_keyevents(device_port, codes, success_count):
+        success_count = 0
     
-    success_rate = success_count / len(text_lower) if len(text_lower) > 0 else 0
+    success_rate = success_count / len(text) if len(text) > 0 else 0
     pass
     
     return success_rate >= 0.8  # 80%以上成功で成功判定
@@ -140,38 +154,19 @@ def _send_text_keyevent_complete(
 def _send_text_keyboard_tap(device_port: str, text: str, *, press_enter: bool = True) -> bool:
     """NOX完璧解決策 - 仮想キーボード座標タップでテキスト送信"""
     
-    # NOX標準解像度でのQWERTYキーボード座標マッピング
-    keyboard_coords = {
-        # 数字行
-        '1': (72, 400),   '2': (144, 400),  '3': (216, 400),  '4': (288, 400),  '5': (360, 400),
-        '6': (432, 400),  '7': (504, 400),  '8': (576, 400),  '9': (648, 400),  '0': (720, 400),
-        # QWERTY行
-        'q': (72, 470),   'w': (144, 470),  'e': (216, 470),  'r': (288, 470),  't': (360, 470),
-        'y': (432, 470),  'u': (504, 470),  'i': (576, 470),  'o': (648, 470),  'p': (720, 470),
-        # ASDF行  
-        'a': (108, 540),  's': (180, 540),  'd': (252, 540),  'f': (324, 540),  'g': (396, 540),
-        'h': (468, 540),  'j': (540, 540),  'k': (612, 540),  'l': (684, 540),
-        # ZXCV行
-        'z': (144, 610),  'x': (216, 610),  'c': (288, 610),  'v': (360, 610),  'b': (432, 610),
-        'n': (504, 610),  'm': (576, 610),
-    }
-    
     pass
     
     # 1. バックスペースでクリア（確実に動作）
-    for i in range(5):
-        _send_keyevent_with_retry(device_port, 67)  # BACKSPACE
-        time.sleep(0.2)
+    _clear_text_field(device_port)
     
     # 2. 文字を1つずつ座標タップで送信
     success_count = 0
     text_lower = text.lower()
     
     for char in text_lower:
-        if char in keyboard_coords:
-            x, y = keyboard_coords[char]
-            result = run_adb_command(["shell", "input", "tap", str(x), str(y)], device_port)
-            if result is not None:
+        if char in _KEYBOARD_COORDS:
+            x, y = _KEYBOARD_COORDS[char]
+            if _send_input(device_port, f"input tap {x} {y}"):
                 success_count += 1
                 pass
             else:
@@ -191,11 +186,57 @@ def _send_text_keyboard_tap(device_port: str, text: str, *, press_enter: bool =
 
 def _send_keyevent_with_retry(device_port: str, keycode: int, max_retries: int = 3) -> bool:
     """キーイベントを再試行で安定送信"""
+    return _send_keyevents_with_retry(device_port, [keycode], max_retries)
+
+def _send_keyevents_with_retry(device_port: str, keycodes: Sequence[int], max_retries: int = 3) -> bool:
+    """複数のキーイベントを1回のシェル呼び出しで送信（失敗時はまとめて再試行）"""
+    
+    command = " && ".join(map(_keyevent_command, keycodes))
+    # 端末側で input を順に起動するため、キー数に応じてタイムアウトを延ばす
+    timeout = _DEFAULT_TIMEOUT + 2 * len(keycodes)
+    return _send_command_with_retry(device_port, command, timeout, max_retries)
+
+def _send_typed_keyevents(
+    device_port: str,
+    keycodes: Sequence[int],
+    typed_count: int,
+    max_retries: int = 3,
+) -> bool:
+    """文字入力のキーイベント列を1回のシェル呼び出しで送信
+
+    失敗した送信も途中まで（または全て）入力済みの可能性があるため、
+    再試行の前に入力された可能性のある文字数分を消してから打ち直す。
+    """
+    command = " && ".join(map(_keyevent_command, keycodes))
+    timeout = _DEFAULT_TIMEOUT + 2 * len(keycodes)
+    for attempt in range(max_retries):
+        try:
+            if attempt == 0 or _send_input(device_port, _backspace_command(typed_count + 5)):
+                if _send_input(device_port, command, timeout):
+                    return True
+        except Exception as e:
+            pass
+        
+        if attempt < max_retries - 1:
+            time.sleep(0.5)  # 再試行前の待機
+    
+    return False
+
+def _clear_text_field(device_port: str) -> bool:
+    """入力欄をバックスペース5回でクリア（1回の input 起動で連続送信）"""
+    return _send_command_with_retry(device_port, _CLEAR_FIELD_COMMAND)
+
+def _send_command_with_retry(
+    device_port: str,
+    command: str,
+    timeout: int = _DEFAULT_TIMEOUT,
+    max_retries: int = 3,
+) -> bool:
+    """シェルコマンドを再試行付きで送信"""
     
     for attempt in range(max_retries):
         try:
-            result = run_adb_command(["shell", "input", "keyevent", str(keycode)], device_port)
-            if result is not None:
+            if _send_input(device_port, command, timeout):
                 return True
         except Exception as e:
             pass
@@ -210,7 +251,7 @@ def _send_with_connection_check(device_port: str, command: list) -> bool:
     
     try:
         # 接続確認
-        check_result = run_adb_command(["shell", "echo", "test"], device_port)
+        check_result = _run_shell(device_port, "echo test")
         if check_result is None or "test" not in check_result:
             return False
         
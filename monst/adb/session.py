@@ -0,0 +1,233 @@
+"""
+monst.adb.session - Persistent ``adb shell`` sessions.
+
+端末ごとに常駐する ``adb -s <port> shell`` プロセスを保持し、tap/swipe などの
+短いシェルコマンドを毎回のプロセス生成なしで送信します。
+セッションが使えない場合は呼び出し側がワンショット実行へフォールバックします。
+"""
+
+from __future__ import annotations
+
+import itertools
+import queue
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from config import get_config, get_config_value, register_reload_hook
+from logging_util import logger
+
+_SESSION_TIMEOUT = 10.0  # seconds
+_MARKER_PREFIX = "__DONE_"
+_RC_NOT_SENT = -1  # 起動・書き込みに失敗し、コマンドが端末へ届いていない
+
+# Windows: 端末ごとの常駐シェルでコンソールウィンドウを開かない
+_SPAWN_KWARGS = (
+    {"creationflags": getattr(subprocess, "CREATE_NO_WINDOW", 0x08000000)}
+    if sys.platform.startswith("win")
+    else {}
+)
+
+_sessions: Dict[str, "_ShellSession"] = {}
+_sessions_lock = threading.Lock()
+_enabled: Optional[bool] = None
+
+
+class _ShellSession:
+    """1端末分の常駐 ``adb shell`` プロセス。
+
+    コマンドの後ろに一意なマーカーを ``echo`` させ、標準出力でマーカーを
+    受け取るまでを1コマンド分の出力として扱います。
+    """
+
+    def __init__(self, device_port: str) -> None:
+        self.device_port = device_port
+        self.lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._seq = itertools.count(1)
+        # レジストリから外された後は再起動しない（孤立したadb shellを残さないため）
+        self._retired = False
+
+    def _alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def _spawn(self) -> None:
+        cmd = [get_config().NOX_ADB_PATH, "-s", self.device_port, "shell"]
+        self._proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=0,
+            **_SPAWN_KWARGS,
+        )
+        self._lines = queue.Queue()
+        threading.Thread(
+            target=self._pump,
+            args=(self._proc, self._lines),
+            name=f"AdbShell-{self.device_port}",
+            daemon=True,
+        ).start()
+        logger.debug("Persistent adb shell started for %s", self.device_port)
+
+    @staticmethod
+    def _pump(proc: subprocess.Popen, lines: "queue.Queue[Optional[str]]") -> None:
+        """stdoutを行単位でキューへ転送する（EOFでNoneを投入）。"""
+        try:
+            for raw in iter(proc.stdout.readline, b""):
+                lines.put(raw.decode("utf-8", errors="replace").rstrip("\r\n"))
+        except Exception:
+            pass
+        finally:
+            lines.put(None)
+
+    def retire(self) -> None:
+        """レジストリから外したセッションを終了し、以降の再起動を禁止する。"""
+        self._retired = True
+        self.close()
+
+    def close(self) -> None:
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+    def run(self, command: str, timeout: float) -> Tuple[Optional[str], int]:
+        """コマンドを送信し (stdout, returncode) を返す。
+
+        送信できなかった場合は (None, _RC_NOT_SENT)、送信後のタイムアウト・EOFは
+        (None, 1) を返す（後者は端末側で実行済みの可能性がある）。
+        """
+        with self.lock:
+            if self._retired:
+                return None, _RC_NOT_SENT
+            try:
+                if not self._alive():
+                    self._spawn()
+                    if self._retired:
+                        # 起動中に retire された場合は自分で後始末する
+                        self.close()
+                        return None, _RC_NOT_SENT
+                seq = next(self._seq)
+                marker = f"{_MARKER_PREFIX}{seq}__:"
+                # PTY経由でコマンド行がエコーされてもマーカーと一致しないよう、
+                # 入力側のマーカーは空の引用符で分割しておく
+                typed_marker = f'{_MARKER_PREFIX}""{seq}__:$?'
+                # ワンショットの ``adb shell`` と同様に標準出力だけを返すため、
+                # コマンドの標準エラーは捨てる（終了コードはグループの最後のコマンドのもの）
+                self._proc.stdin.write(f"{{ {command}; }} 2>/dev/null; echo {typed_marker}\n".encode("utf-8"))
+                self._proc.stdin.flush()
+            except Exception as exc:
+                logger.debug("Persistent adb shell write failed for %s: %s", self.device_port, exc)
+                self.close()
+                return None, _RC_NOT_SENT
+
+            deadline = time.monotonic() + timeout
+            output: List[str] = []
+            while True:
+                remaining = deadline - time.monotonic()
+                line: Optional[str] = None
+                if remaining > 0:
+                    try:
+                        line = self._lines.get(timeout=remaining)
+                    except queue.Empty:
+                        pass
+                if line is None:
+                    # タイムアウトまたはEOF: 出力の対応が取れなくなるため破棄する
+                    self.close()
+                    return None, 1
+                if typed_marker in line:
+                    # エコーされたコマンド行は出力に含めない
+                    continue
+                index = line.find(marker)
+                status = line[index + len(marker):].strip() if index >= 0 else ""
+                if not status.isdigit():
+                    output.append(line)
+                    continue
+                if index:
+                    output.append(line[:index])
+                return "\n".join(output), int(status)
+
+
+def _session_enabled() -> bool:
+    global _enabled
+    if _enabled is None:
+        _enabled = bool(get_config_value("adb_persistent_shell", True))
+    return _enabled
+
+
+def _on_config_reload() -> None:
+    global _enabled
+    _enabled = None
+
+
+register_reload_hook(_on_config_reload)
+
+
+def send_in_shell_session(
+    device_port: str,
+    command: str,
+    timeout: float = _SESSION_TIMEOUT,
+) -> Tuple[bool, Optional[str]]:
+    """常駐シェルでコマンドを実行し、(送信できたか, 成功時の標準出力) を返します。
+
+    送信済みでタイムアウト・非ゼロ終了した場合は (True, None) となります。
+    端末側で実行済みの可能性があるため、呼び出し側は再送してはいけません。
+
+    Args:
+        device_port: 対象デバイスのポート
+        command: シェルに送るコマンド文字列（例: "input swipe 1 2 1 2 150"）
+        timeout: マーカー受信までの待機秒数
+
+    Returns:
+        (送信できたか, 成功時は標準出力・それ以外はNone)
+    """
+    if not device_port or not _session_enabled():
+        return False, None
+    with _sessions_lock:
+        session = _sessions.get(device_port)
+        if session is None:
+            session = _sessions[device_port] = _ShellSession(device_port)
+    out, rc = session.run(command, timeout)
+    if rc == _RC_NOT_SENT:
+        return False, None
+    return True, out if rc == 0 else None
+
+
+def run_in_shell_session(
+    device_port: str,
+    command: str,
+    timeout: float = _SESSION_TIMEOUT,
+) -> Optional[str]:
+    """常駐シェルでコマンドを実行し、成功時は標準出力を返します。
+
+    Args:
+        device_port: 対象デバイスのポート
+        command: シェルに送るコマンド文字列（例: "input swipe 1 2 1 2 150"）
+        timeout: マーカー受信までの待機秒数
+
+    Returns:
+        成功時は標準出力、セッション異常や非ゼロ終了時はNone
+    """
+    return send_in_shell_session(device_port, command, timeout)[1]
+
+
+def close_shell_sessions(device_port: Optional[str] = None) -> None:
+    """常駐シェルを終了します（ADBリセット・端末再起動時など）。"""
+    with _sessions_lock:
+        if device_port is None:
+            targets = list(_sessions.values())
+            _sessions.clear()
+        else:
+            session = _sessions.pop(device_port, None)
+            targets = [session] if session else []
+    for session in targets:
+        # 実行中のrun()はEOFを受けて自身で後始末するためロックは取らない
+        # （既にこのセッションを参照しているスレッドが再起動しないよう retire する）
+        session.retire()
@@ -8,7 +8,7 @@ from __future__ import annotations
 
 from typing import Optional
 
-from .core import run_adb_command, _DEFAULT_TIMEOUT
+from .core import _run_shell, _DEFAULT_TIMEOUT
 
 def run_adb_shell_command(
     command: str, 
@@ -29,9 +29,7 @@ def run_adb_shell_command(
         >>> run_adb_shell_command("ls /data/data", "127.0.0.1:62001")
         "com.android.providers.settings\\ncom.android.shell\\n..."
     """
-    # 文字列を分割してコマンド引数リストに変換
-    if isinstance(command, str):
-        cmd = command.split()
-    else:
-        cmd = list(command)
-    return run_adb_command(["shell", *cmd], device_port, timeout)
\ No newline at end of file
+    if not isinstance(command, str):
+        command = " ".join(command)
+    # 常駐シェル経由で送信し、端末ごとのadb接続確立を省く
+    return _run_shell(device_port, command, timeout)
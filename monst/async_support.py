@@ -8,13 +8,30 @@ from __future__ import annotations
 
 import asyncio
 import functools
+import os
 import threading
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from typing import Any, Awaitable, Callable, TypeVar
 
 T = TypeVar('T')
 P = TypeVar('P')
 
+_default_executor: ThreadPoolExecutor | None = None
+_default_executor_lock = threading.Lock()
+
+def _get_default_executor() -> ThreadPoolExecutor:
+    """AsyncAdapter 共通のエグゼキューターを初回利用時に生成して返します。"""
+    global _default_executor
+    if _default_executor is None:
+        with _default_executor_lock:
+            if _default_executor is None:
+                _default_executor = ThreadPoolExecutor(
+                    max_workers=min(32, (os.cpu_count() or 1) * 4),
+                    thread_name_prefix="adb-async",
+                )
+    return _default_executor
+
 class AsyncAdapter:
     """同期関数を非同期で実行するためのアダプター。
     
@@ -31,7 +48,12 @@ class AsyncAdapter:
         Args:
             max_workers: 最大ワーカー数（Noneの場合は自動設定）
         """
-        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # 未指定時はプロセス共通のエグゼキューターを共有し、指定時のみ専用プールを作る
+        self._owns_executor = max_workers is not None
+        if self._owns_executor:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        else:
+            self._executor = _get_default_executor()
         self._loop = None
     
     async def run_in_thread(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
@@ -49,14 +71,18 @@ class AsyncAdapter:
             >>> result = await adapter.run_in_thread(blocking_operation, param1, param2)
         """
         loop = asyncio.get_running_loop()
+        if not kwargs:
+            # 位置引数のみなら run_in_executor に直接渡し、partial の生成を省く
+            return await loop.run_in_executor(self._executor, func, *args)
         return await loop.run_in_executor(
             self._executor, 
             functools.partial(func, *args, **kwargs)
         )
     
     def close(self) -> None:
-        """エグゼキューターを終了します。"""
-        self._executor.shutdown(wait=True)
+        """エグゼキューターを終了します（共有エグゼキューターは終了しません）。"""
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
     
     async def __aenter__(self):
         """非同期コンテキストマネージャー対応。"""
@@ -110,8 +136,9 @@ class AsyncBatch:
             max_concurrent: 同時実行数の上限
         """
         self.max_concurrent = max_concurrent
-        self._tasks: list[tuple[Callable[..., Awaitable[Any]], tuple, dict]] = []
-        self._semaphore: asyncio.Semaphore | None = None
+        self._tasks: deque[tuple[Callable[..., Awaitable[Any]], tuple, dict]] = deque()
+        # 他タスク・他スレッドからの add() と実行時の取り出しを排他する
+        self._tasks_lock = threading.Lock()
     
     def add(self, coro_func: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> None:
         """バッチに非同期関数を追加します。
@@ -121,30 +148,55 @@ class AsyncBatch:
             *args: 関数の位置引数
             **kwargs: 関数のキーワード引数
         """
-        self._tasks.append((coro_func, args, kwargs))
+        with self._tasks_lock:
+            self._tasks.append((coro_func, args, kwargs))
     
-    async def execute(self) -> list[Any]:
+    async def execute(self, *, return_exceptions: bool = False) -> list[Any]:
         """バッチ内の全タスクを実行します。
         
+        ``max_concurrent`` 本のワーカーが順にタスクを取り出して実行するため、
+        コルーチンは実行直前にのみ生成されます。
+        
+        Args:
+            return_exceptions: Trueの場合、失敗したタスクの例外を結果に格納して続行
+            
         Returns:
-            各タスクの実行結果のリスト
+            各タスクの実行結果のリスト（追加順）
             
         Raises:
-            Exception: いずれかのタスクが失敗した場合
+            Exception: いずれかのタスクが失敗した場合（return_exceptions=False時）
         """
-        if self._semaphore is None:
-            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        # 実行開始時点のタスクを固定する（実行中に追加されたタスクは次回の execute で実行）
+        with self._tasks_lock:
+            tasks = tuple(self._tasks)
+        results: list[Any] = [None] * len(tasks)
+        if not results:
+            return results
         
-        async def _execute_task(func, args, kwargs):
-            async with self._semaphore:
-                return await func(*args, **kwargs)
+        pending = iter(enumerate(tasks))
         
-        tasks = [
-            _execute_task(func, args, kwargs) 
-            for func, args, kwargs in self._tasks
-        ]
+        async def _worker() -> None:
+            # イベントループは単一スレッドのため、イテレーターを共有しても競合しない
+            for index, (func, args, kwargs) in pending:
+                try:
+                    results[index] = await func(*args, **kwargs)
+                except Exception as exc:
+                    if not return_exceptions:
+                        raise
+                    results[index] = exc
         
-        return await asyncio.gather(*tasks)
+        workers = [
+            asyncio.ensure_future(_worker())
+            for _ in range(min(self.max_concurrent, len(results)))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            # 失敗・キャンセル時は残りのワーカーを止める
+            for worker in workers:
+                worker.cancel()
+            raise
+        return results
     
     async def execute_with_timeout(self, timeout: float) -> list[Any]:
         """タイムアウト付きでバッチを実行します。
@@ -162,7 +214,8 @@ class AsyncBatch:
     
     def clear(self) -> None:
         """バッチをクリアします。"""
-        self._tasks.clear()
+        with self._tasks_lock:
+            self._tasks.clear()
     
     async def __aenter__(self):
         """非同期コンテキストマネージャー対応。"""
@@ -181,21 +234,69 @@ class AsyncAdbClient:
     """
     
     def __init__(self, adapter: AsyncAdapter | None = None) -> None:
+        from monst.adb import perform_action
+        from config import get_config
+        from monst.adb.core import _ENCODINGS, _IS_WINDOWS, _WINDOWS_SPAWN_FLAGS, _adb_path
+
         self._adapter = adapter or AsyncAdapter()
+        # monst.adb の依存は生成時に1度だけ解決し、呼び出しごとのimportを避ける
+        self._perform_action = perform_action
+        self._adb_path = _adb_path
+        self._encodings = _ENCODINGS
+        self._spawn_kwargs = {"creationflags": _WINDOWS_SPAWN_FLAGS} if _IS_WINDOWS else {}
+        # 同期版 run_adb_command と同じ上限（ADB_MAX_CONCURRENT）で同時起動数を制限する
+        self._semaphore = asyncio.Semaphore(int(getattr(get_config(), "ADB_MAX_CONCURRENT", 3)))
     
-    async def run_command(self, args: list[str], device_port: str | None = None) -> str | None:
-        """非同期でADBコマンドを実行します（将来実装予定）。
+    async def run_command(
+        self,
+        args: list[str],
+        device_port: str | None = None,
+        timeout: float = 20.0,
+    ) -> str | None:
+        """非同期でADBコマンドを実行します。
+        
+        スレッドを占有せず asyncio のサブプロセスで adb を起動するため、
+        多数の端末へ同時に送ってもイベントループ1本で待機できます。
+        （同期版 run_adb_command のリトライ・自動復旧は行いません）
         
         Args:
             args: ADBコマンド引数
             device_port: デバイスポート
+            timeout: タイムアウト秒数
             
         Returns:
-            コマンド実行結果
+            成功時は標準出力、失敗・タイムアウト時はNone
         """
-        # 現在は同期版をラップ
-        from monst.adb import run_adb_command
-        return await self._adapter.run_in_thread(run_adb_command, args, device_port)
+        cmd = [self._adb_path()]
+        if device_port:
+            cmd += ["-s", device_port]
+        cmd += args
+        async with self._semaphore:
+            try:
+                # adb shell が親の標準入力を読み込まないよう stdin は DEVNULL に固定する
+                proc = await asyncio.create_subprocess_exec(
+                    *cmd,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    **self._spawn_kwargs,
+                )
+            except OSError:
+                return None
+            try:
+                stdout, _ = await asyncio.wait_for(proc.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                proc.kill()
+                await proc.wait()
+                return None
+        if proc.returncode != 0:
+            return None
+        for encoding in self._encodings:
+            try:
+                return stdout.decode(encoding)
+            except UnicodeDecodeError:
+                continue
+        return stdout.decode("utf-8", errors="replace")
     
     async def perform_action(
         self, 
@@ -217,8 +318,7 @@ class AsyncAdbClient:
             操作成功したかどうか
         """
         # 現在は同期版をラップ
-        from monst.adb import perform_action
-        return await self._adapter.run_in_thread(perform_action, device_port, action, x, y, **kwargs)
+        return await self._adapter.run_in_thread(self._perform_action, device_port, action, x, y, **kwargs)
 
 # Example usage patterns for future migration
 async def example_async_device_operations():
@@ -8,7 +8,7 @@ from __future__ import annotations
 
 from .core import device_operation_select
 from .navigation import home
-from .checks import icon_check
+from .checks import icon_check, export_kuribo_xlsx, flush_kuribo_results
 from .events import event_do
 from .gacha import mon_gacha_shinshun
 from .quest import device_operation_quest, reset_quest_state, get_quest_state
@@ -35,6 +35,8 @@ __all__ = [
     "device_operation_select",
     "home",
     "icon_check",
+    "export_kuribo_xlsx",
+    "flush_kuribo_results",
     "event_do",
     "mon_gacha_shinshun",
     "device_operation_quest",
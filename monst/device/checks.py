@@ -6,22 +6,85 @@ monst.device.checks - Character and progress checking operations.
 
 from __future__ import annotations
 
+import atexit
+import csv
+import importlib.util
 import os
+import queue
 import time
 import threading
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional, Sequence, Tuple
 
 from config import on_check
 from logging_util import logger, MultiDeviceLogger
 from monst.adb import perform_action
-from monst.image import tap_if_found, tap_until_found
+from monst.image import (
+    check_presence_batch,
+    find_all_on_device,
+    is_present,
+    preload_templates,
+    tap_first_of,
+    tap_if_found,
+    tap_until_found,
+)
 from utils.path_manager import get_base_path
 
 from .navigation import home
 from openpyxl import Workbook, load_workbook
 
 _kuribo_excel_lock = threading.Lock()
+# クリボー確認結果の書き込みキュー（デバイス側は積むだけで、1本の書き込みスレッドがまとめて保存する）
+_kuribo_queue: "queue.Queue[list]" = queue.Queue()
+_kuribo_writer: Optional[threading.Thread] = None
+_kuribo_writer_lock = threading.Lock()
+_kuribo_dir_ready = False
+# CSVに追記したがExcelへ未反映の記録がある（Excelは export_kuribo_xlsx と終了時にのみ出力）
+_kuribo_xlsx_stale = False
+_lxml_checked = False
+_KURIBO_CSV_NAME = "kuribo_check.csv"
+_KURIBO_XLSX_NAME = "kuribo_check.xlsx"
+_KURIBO_CSV_PATH = os.path.join(get_base_path(), _KURIBO_CSV_NAME)
+_KURIBO_XLSX_PATH = os.path.join(get_base_path(), _KURIBO_XLSX_NAME)
+_KURIBO_HEADER = ("Timestamp", "Folder", "Result", "Detected", "Count")
+_KURIBO_RESULT_WAIT = 2.0  # ソート後にクリボー表示を待つ上限（秒）
+_KURIBO_EXIT_FLUSH_TIMEOUT = 10.0  # 終了時に書き込み待ちの記録を待つ上限（秒）
+
+# クエスト画面へ遷移するためのタップ候補（上から順に判定）
+_QUEST_NAV_IMAGES = tuple(
+    (image_name, "key")
+    for image_name in ("quest_c.png", "quest.png", "ichiran.png", "ok.png", "close.png")
+)
+# 守護獣アイコンと未所持時のログ表記
+_SHUGO_IMAGES = {
+    "shugo1.png": "守護１",
+    "shugo2.png": "守護２",
+    "shugo3.png": "守護３",
+    "shugo4.png": "守護４",
+}
+# ソート画面へ遷移するためのタップ候補（画面を塞ぐダイアログを先に閉じ、以降は進んだ画面のボタンを優先）
+_KURIBO_NAV_IMAGES = tuple(
+    (image_name, "ui")
+    for image_name in ("ok.png", "close.png", "hyoujijun.png", "monster_box.png", "monster.png")
+)
+_KURIBO_NAV_TIMEOUT = 30.0  # ソート画面へ遷移するまでの上限（秒）
+# チェック処理で使うテンプレート（初回の icon_check でまとめて読み込む）
+_CHECK_TEMPLATES = (
+    _QUEST_NAV_IMAGES
+    + (("noma.png", "key"), ("hasyafin1.png", "key"))
+    + tuple((image_name, "key") for image_name in (
+        "monbox.png", "monster.png", "shugo_box2.png", "shugo_box.png", "shugo_ishi.png",
+    ))
+    + tuple((image_name, "icon") for image_name in _SHUGO_IMAGES)
+    + _KURIBO_NAV_IMAGES
+    + tuple((image_name, "ui") for image_name in (
+        "sort.png", "z_hoshi3.png", "z_yami.png", "kettei_mon.png", "kuribo.png",
+    ))
+)
+_templates_preloaded = False
+_POLL_MIN_DELAY = 0.1  # ポーリング待機の初期値（秒）
+_POLL_MAX_DELAY = 1.0  # ポーリング待機の上限（秒）
+_NAV_SETTLE_DELAY = 0.3  # 遷移ボタンをタップした後、画面が切り替わるのを待つ時間（秒）
 
 def icon_check(
     device_port: str, 
@@ -44,53 +107,65 @@ def icon_check(
     Example:
         >>> icon_check("127.0.0.1:62001", "folder_001")
     """
+    global _templates_preloaded
+    if not _templates_preloaded:
+        _templates_preloaded = True
+        preload_templates(_CHECK_TEMPLATES)
+
     if not home(device_port, folder):
         logger.warning(f"デバイス {device_port}: home関数が失敗しましたが、処理を継続します")
 
-    if on_check == 1:  # ノマクエチェック
-        _check_normal_quest(device_port, folder)
-    elif on_check == 2:  # 覇者の塔クリアチェック
-        _check_tower_completion(device_port, folder)
-    elif on_check == 3:  # 守護獣所持チェック
-        _check_guardian_beasts(device_port, folder)
-    elif on_check == 4:  # クリボー確認
-        _check_kuribo(device_port, folder)
+    check_fn = _CHECK_FNS.get(on_check)
+    if check_fn is not None:
+        check_fn(device_port, folder)
+
+def _navigate_until(
+    device_port: str,
+    reached: Callable[[], bool],
+    nav_images: Sequence[Tuple[str, str]],
+    timeout: float,
+) -> bool:
+    """reached() が真になるまで、今の画面に出ている遷移ボタンを1つだけタップして進めます。
+    
+    タップ後は画面遷移を待ってから判定し直し、何も押せなかった場合は
+    待機を0.1秒から1秒まで伸ばします。
+    
+    Returns:
+        timeout 秒以内に reached() が真になったかどうか
+    """
+    deadline = time.monotonic() + timeout
+    delay = _POLL_MIN_DELAY
+    while not reached():
+        if time.monotonic() >= deadline:
+            return False
+        if tap_first_of(device_port, nav_images):
+            time.sleep(_NAV_SETTLE_DELAY)
+            delay = _POLL_MIN_DELAY
+            continue
+        time.sleep(delay)
+        delay = min(delay * 1.5, _POLL_MAX_DELAY)
+    return True
 
 def _check_normal_quest(device_port: str, folder: str) -> None:
     """ノマクエの進行状況をチェックします。"""
     max_attempts = 10
-    for attempt in range(max_attempts):
-        if tap_if_found('tap', device_port, "noma.png", "key"):
-            break
-        tap_if_found('tap', device_port, "quest_c.png", "key")
-        tap_if_found('tap', device_port, "quest.png", "key")
-        tap_if_found('tap', device_port, "ichiran.png", "key")
-        tap_if_found('tap', device_port, "ok.png", "key")
-        tap_if_found('tap', device_port, "close.png", "key")
-        time.sleep(1)
+    _navigate_until(
+        device_port,
+        lambda: tap_if_found('tap', device_port, "noma.png", "key"),
+        _QUEST_NAV_IMAGES,
+        max_attempts * _POLL_MAX_DELAY,
+    )
 
 def _check_tower_completion(device_port: str, folder: str) -> None:
     """覇者の塔のクリア状況をチェックします。"""
     timeout: int = 60  # タイムアウト時間（秒単位）
-    start_time: float = time.time()  # 処理開始時間を記録
-
-    while True:
-        # "hasyafin1.png" を探す
-        if tap_if_found('tap', device_port, "hasyafin1.png", "key"):
-            break  # 見つかった場合、ループを終了
-
-        # 2分間見つからなかった場合
-        if time.time() - start_time > timeout:
-            logger.info(f"覇者未完了。対象フォルダ: {folder}")
-            break
-
-        # 他のタップ処理を実行
-        tap_if_found('tap', device_port, "quest_c.png", "key")
-        tap_if_found('tap', device_port, "quest.png", "key")
-        tap_if_found('tap', device_port, "ichiran.png", "key")
-        tap_if_found('tap', device_port, "ok.png", "key")
-        tap_if_found('tap', device_port, "close.png", "key")
-        time.sleep(1)  # 次のチェックまで待機
+    if not _navigate_until(
+        device_port,
+        lambda: tap_if_found('tap', device_port, "hasyafin1.png", "key"),
+        _QUEST_NAV_IMAGES,
+        timeout,
+    ):
+        logger.info(f"覇者未完了。対象フォルダ: {folder}")
 
 def _check_guardian_beasts(device_port: str, folder: str) -> None:
     """守護獣の所持状況をチェックします（mon6準拠）。"""
@@ -98,35 +173,22 @@ def _check_guardian_beasts(device_port: str, folder: str) -> None:
     tap_until_found(device_port, "shugo_box2.png", "key", "shugo_box.png", "key", "tap")
     tap_until_found(device_port, "shugo_ishi.png", "key", "ok.png", "key", "tap")
     
-    # mon6準拠の守護獣所持チェック
-    if not tap_if_found('stay', device_port, "shugo1.png", "icon"):
-        logger.info(f"守護１未所持　対象フォルダ: {folder}")
-    if not tap_if_found('stay', device_port, "shugo2.png", "icon"):
-        logger.info(f"守護２未所持　対象フォルダ: {folder}")
-    if not tap_if_found('stay', device_port, "shugo3.png", "icon"):
-        logger.info(f"守護３未所持　対象フォルダ: {folder}")
-    if not tap_if_found('stay', device_port, "shugo4.png", "icon"):
-        logger.info(f"守護４未所持　対象フォルダ: {folder}")
+    # mon6準拠の守護獣所持チェック（4種類を1枚の画面でまとめて判定）
+    present = check_presence_batch(device_port, tuple(_SHUGO_IMAGES), "icon")
+    for image_name, label in _SHUGO_IMAGES.items():
+        if not present[image_name]:
+            logger.info(f"{label}未所持　対象フォルダ: {folder}")
 
 
 def _check_kuribo(device_port: str, folder: str) -> None:
     """クリボー確認（on_check=4）。"""
-    # ② sort.pngが表示されるまでUI遷移を繰り返す
-    navigation_images = [
-        "monster.png",
-        "monster_box.png",
-        "ok.png",
-        "close.png",
-        "hyoujijun.png",
-    ]
-    max_attempts = 20
-    for attempt in range(max_attempts):
-        if tap_if_found('stay', device_port, "sort.png", "ui"):
-            break
-        for image_name in navigation_images:
-            tap_if_found('tap', device_port, image_name, "ui")
-            time.sleep(0.3)
-    else:
+    # ② sort.pngが表示されるまで、今の画面で押せる遷移ボタンを1つずつタップして進める
+    if not _navigate_until(
+        device_port,
+        lambda: is_present(device_port, "sort.png", "ui"),
+        _KURIBO_NAV_IMAGES,
+        _KURIBO_NAV_TIMEOUT,
+    ):
         logger.warning(f"sort.pngが見つからずクリボー確認をスキップします: フォルダ {folder}")
         _record_kuribo_result(folder, has_kuribo=False, detected=False)
         return
@@ -136,37 +198,188 @@ def _check_kuribo(device_port: str, folder: str) -> None:
     tap_if_found('tap', device_port, "z_yami.png", "ui")
     tap_if_found('tap', device_port, "kettei_mon.png", "ui")
 
-    # ④ 2秒待機してクリボーを検出
-    time.sleep(2.0)
-    has_kuribo = tap_if_found('stay', device_port, "kuribo.png", "ui")
+    # ④ ソート結果の表示を最大2秒待ちながらクリボーを検出（見つかった時点で打ち切り）
+    deadline = time.monotonic() + _KURIBO_RESULT_WAIT
+    while True:
+        kuribo_locations = find_all_on_device(device_port, "kuribo.png", "ui", cache_time=0)
+        if kuribo_locations or time.monotonic() >= deadline:
+            break
+        time.sleep(0.3)
+    has_kuribo = bool(kuribo_locations)
     if has_kuribo:
-        logger.info(f"クリボーあり: フォルダ {folder}")
+        logger.info(f"クリボーあり({len(kuribo_locations)}体): フォルダ {folder}")
     else:
         logger.info(f"クリボーなし: フォルダ {folder}")
-    _record_kuribo_result(folder, has_kuribo=has_kuribo, detected=True)
+    _record_kuribo_result(folder, has_kuribo=has_kuribo, detected=True, count=len(kuribo_locations))
+
+
+# on_check の値ごとのチェック処理
+_CHECK_FNS = {
+    1: _check_normal_quest,  # ノマクエチェック
+    2: _check_tower_completion,  # 覇者の塔クリアチェック
+    3: _check_guardian_beasts,  # 守護獣所持チェック
+    4: _check_kuribo,  # クリボー確認
+}
+
+
+def _record_kuribo_result(folder: str, has_kuribo: bool, *, detected: bool, count: int = 0) -> None:
+    """クリボー確認結果を書き込みキューに積む（CSV追記は書き込みスレッド、Excel出力は export_kuribo_xlsx・終了時）。"""
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    result_label = "あり" if has_kuribo else "なし"
+    _ensure_kuribo_writer()
+    _kuribo_queue.put([timestamp, folder, result_label, "Yes" if detected else "No", count])
+    logger.debug(f"クリボー確認を保存キューに追加: {folder}: {result_label}")
 
 
-def _record_kuribo_result(folder: str, has_kuribo: bool, *, detected: bool) -> None:
-    """クリボー確認結果をExcelに記録する。"""
+def _ensure_kuribo_writer() -> None:
+    """クリボー記録の書き込みスレッドを必要に応じて起動する。"""
+    global _kuribo_writer
+    with _kuribo_writer_lock:
+        if _kuribo_writer is None or not _kuribo_writer.is_alive():
+            _kuribo_writer = threading.Thread(target=_kuribo_writer_loop, name="KuriboWriter", daemon=True)
+            _kuribo_writer.start()
+
+
+def _kuribo_writer_loop() -> None:
+    """キューに溜まった記録をまとめてCSVへ追記する（Excelの作り直しは行わない）。"""
+    global _kuribo_xlsx_stale
+    while True:
+        rows = [_kuribo_queue.get()]
+        while True:
+            try:
+                rows.append(_kuribo_queue.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            if _append_kuribo_rows(rows):
+                _kuribo_xlsx_stale = True
+        finally:
+            for _ in rows:
+                _kuribo_queue.task_done()
+
+
+def _append_kuribo_rows(rows: list) -> bool:
+    """記録をCSVに追記する（成功時True）。"""
     try:
-        base_path = get_base_path()
-        excel_path = os.path.join(base_path, "kuribo_check.xlsx")
-        os.makedirs(os.path.dirname(excel_path) or ".", exist_ok=True)
+        global _kuribo_dir_ready
+        csv_path = _KURIBO_CSV_PATH
 
+        # ロックは追記の間だけ保持する（ブック全体の読み込み・保存は行わない）
         with _kuribo_excel_lock:
-            if os.path.exists(excel_path):
-                workbook = load_workbook(excel_path)
-                sheet = workbook.active
-            else:
-                workbook = Workbook()
-                sheet = workbook.active
-                sheet.title = "kuribo"
-                sheet.append(["Timestamp", "Folder", "Result", "Detected"])
-
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            result_label = "あり" if has_kuribo else "なし"
-            sheet.append([timestamp, folder, result_label, "Yes" if detected else "No"])
-            workbook.save(excel_path)
-            logger.debug(f"クリボー確認をExcel保存: {excel_path} ({folder}: {result_label})")
+            if not _kuribo_dir_ready:
+                # 保存先フォルダの作成は初回の書き込み時だけ行う
+                os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+                _kuribo_dir_ready = True
+            with open(csv_path, "a", newline="", encoding="utf-8") as csv_file:
+                writer = csv.writer(csv_file)
+                if csv_file.tell() == 0:
+                    # 新規作成時はヘッダーと、旧形式のExcelに残っている記録を引き継ぐ
+                    writer.writerow(_KURIBO_HEADER)
+                    writer.writerows(_read_legacy_kuribo_rows(_KURIBO_XLSX_PATH))
+                writer.writerows(rows)
+        logger.debug(f"クリボー確認をCSV保存: {csv_path} ({len(rows)}件)")
+        return True
     except Exception as exc:
         logger.error(f"クリボー確認結果の保存に失敗しました: {exc}")
+        return False
+
+
+def flush_kuribo_results(timeout: Optional[float] = None) -> bool:
+    """キューに積まれたクリボー確認結果が書き込まれるまで待ちます。
+    
+    Args:
+        timeout: 待機の上限秒数（Noneは無制限）
+        
+    Returns:
+        全て書き込まれた場合True、タイムアウトした場合False
+    """
+    if timeout is None:
+        _kuribo_queue.join()
+        return True
+    deadline = time.monotonic() + timeout
+    with _kuribo_queue.all_tasks_done:
+        while _kuribo_queue.unfinished_tasks:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _kuribo_queue.all_tasks_done.wait(remaining)
+    return True
+
+
+def _read_legacy_kuribo_rows(excel_path: str) -> list:
+    """CSV導入前の kuribo_check.xlsx からヘッダーを除いた記録を読み込む。"""
+    if not os.path.exists(excel_path):
+        return []
+    try:
+        workbook = load_workbook(excel_path, read_only=True)
+        try:
+            rows = workbook.active.iter_rows(min_row=2, values_only=True)
+            return [list(row) for row in rows if any(cell is not None for cell in row)]
+        finally:
+            workbook.close()
+    except Exception as exc:
+        logger.warning(f"既存のクリボー確認Excelを読み込めませんでした: {exc}")
+        return []
+
+
+def export_kuribo_xlsx() -> Optional[str]:
+    """記録済みのクリボー確認結果CSVを kuribo_check.xlsx に書き出します。
+    
+    書き込み待ちの記録がある場合は、反映されるのを待ってから出力します。
+    
+    Returns:
+        書き出したExcelファイルのパス。記録がない場合はNone
+    """
+    global _kuribo_xlsx_stale
+    flush_kuribo_results()
+    _kuribo_xlsx_stale = False
+    return _write_kuribo_xlsx()
+
+
+def _new_kuribo_workbook():
+    """書き出し専用（write_only）のブックとシートを作成する。
+    
+    行をストリームで書き出すためメモリ使用量は行数に依存しない。lxml がない環境では
+    openpyxl が遅い標準XMLライブラリで書き出すため、初回のみ警告する。
+    """
+    global _lxml_checked
+    if not _lxml_checked:
+        _lxml_checked = True
+        if importlib.util.find_spec("lxml") is None:
+            logger.warning("lxml がインストールされていないため、クリボー確認Excelの出力が遅くなります")
+    workbook = Workbook(write_only=True)
+    return workbook, workbook.create_sheet("kuribo")
+
+
+def _write_kuribo_xlsx() -> Optional[str]:
+    """CSVの内容で kuribo_check.xlsx を作り直す。"""
+    csv_path = _KURIBO_CSV_PATH
+    excel_path = _KURIBO_XLSX_PATH
+    with _kuribo_excel_lock:
+        if not os.path.exists(csv_path):
+            return None
+        with open(csv_path, newline="", encoding="utf-8") as csv_file:
+            rows = list(csv.reader(csv_file))
+
+    workbook, sheet = _new_kuribo_workbook()
+    for row in rows:
+        sheet.append(row)
+    workbook.save(excel_path)
+    logger.debug(f"クリボー確認結果をExcelに出力: {excel_path} ({max(len(rows) - 1, 0)}件)")
+    return excel_path
+
+
+def _flush_kuribo_at_exit() -> None:
+    """終了時に書き込み待ちの記録をCSVへ反映し、未反映分があればExcelを出力する。"""
+    if not flush_kuribo_results(timeout=_KURIBO_EXIT_FLUSH_TIMEOUT):
+        logger.warning("クリボー確認結果の書き込みが終わらないため、待たずに終了します")
+        return
+    if _kuribo_xlsx_stale:
+        try:
+            export_kuribo_xlsx()
+        except Exception as exc:
+            logger.error(f"クリボー確認結果のExcel出力に失敗しました: {exc}")
+
+
+# 終了時に書き込み待ちの記録を取りこぼさない
+atexit.register(_flush_kuribo_at_exit)
@@ -6,21 +6,93 @@ monst.device.core - Core device operation orchestration.
 
 from __future__ import annotations
 
-from typing import Optional
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
 
 import config as cfg
 from config import get_config
 from logging_util import logger, MultiDeviceLogger
 from login_operations import device_operation_login
 from monst.adb import pull_file_from_nox
+from monst.image import tap_if_found
+from monst.image.device_management import mark_device_error, monitor_device_health
 from utils.device_utils import get_terminal_number
 
 from .checks import icon_check
-from .events import event_do, event4_menu_do
+from .events import bakuage_roulette_do, event_do, event4_menu_do
 from .exceptions import LoginError, GachaOperationError, SellOperationError
-from .gacha import mon_gacha_shinshun
+from .friends import friend_status_check
+from .gacha import mon_gacha_shinshun, wait_gacha_completion_data
 from .operations import medal_change, mon_initial, mission_get, name_change, mon_sell, orb_count, id_check
 
+# on_event の値ごとのイベント処理（ラベル, 関数）
+_EVENT_OPERATIONS = {
+    1: ("EVENT", event_do),
+    2: ("BAKUAGE_ROULETTE", bakuage_roulette_do),
+    3: ("FRIEND_STATUS_CHECK", friend_status_check),
+    4: ("EVENT4", event4_menu_do),
+}
+
+# イベント後に順番に実行する単純な作業（フラグ名, ラベル, 関数）
+_SIMPLE_OPERATIONS = (
+    ("on_medal", "MEDAL", medal_change),
+    ("on_mission", "MISSION", mission_get),
+    ("on_sell", "SELL", mon_sell),
+    ("on_initial", "INITIAL", mon_initial),
+    ("on_name", "NAME", name_change),
+)
+
+# セーブデータ退避（adbのファイル転送のみで画面操作を伴わない）を、後続の画面操作と並行して行うスレッド
+_save_executor: Optional[ThreadPoolExecutor] = None
+_save_executor_lock = threading.Lock()
+
+def _start_background_save(device_port: str, folder: str) -> Future:
+    """セーブデータの退避をバックグラウンドで開始する。"""
+    global _save_executor
+    with _save_executor_lock:
+        if _save_executor is None:
+            _save_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="device-save")
+    return _save_executor.submit(pull_file_from_nox, device_port, folder)
+
+def _run_step(
+    operations_completed: List[str],
+    label: str,
+    operation: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+) -> Any:
+    """作業を1つ実行して結果ラベルを記録する（例外時は "<label>_FAIL" を記録してNoneを返す）。"""
+    try:
+        result = operation(*args, **kwargs)
+    except Exception as exc:
+        logger.debug(f"{label} 失敗: {type(exc).__name__}: {exc}")
+        operations_completed.append(f"{label}_FAIL")
+        return None
+    operations_completed.append(label)
+    return result
+
+def _save_after_failure(
+    device_port: str,
+    folder: str,
+    on_save: int,
+    save_future: Optional[Future] = None,
+) -> None:
+    """処理失敗時も on_save 設定に従ってセーブデータを退避する（失敗は無視）。
+    
+    既にバックグラウンドで退避を開始している場合は、その完了を待つだけにする。
+    """
+    if on_save != 1:
+        return
+    try:
+        if save_future is not None:
+            save_future.result()
+        else:
+            pull_file_from_nox(device_port, folder)
+    except Exception:
+        pass
+
 def device_operation_select(
     device_port: str,
     folder: str,
@@ -49,9 +121,14 @@ def device_operation_select(
         >>> if success:
         ...     print("All operations completed successfully")
     """
+    # ログイン失敗時のセーブデータ退避にも使うため、先に読み込んでおく
+    on_save = int(getattr(cfg, 'on_save', 0))
+    save_future: Optional[Future] = None
     try:
+        # 前のフォルダのガチャ結果保存（バックグラウンド）を完了させてから始める
+        wait_gacha_completion_data(device_port)
+        
         # デバイス健全性チェック（開始前）
-        from monst.image.device_management import monitor_device_health
         monitor_device_health([device_port])
         
         # ログイン処理を実行
@@ -61,24 +138,18 @@ def device_operation_select(
         # 最新フラグを再読込（静的import更新漏れ対策）
         on_que = int(getattr(cfg, 'on_que', 0))
         on_event = int(getattr(cfg, 'on_event', 0))
-        on_medal = int(getattr(cfg, 'on_medal', 0))
-        on_mission = int(getattr(cfg, 'on_mission', 0))
-        on_sell = int(getattr(cfg, 'on_sell', 0))
-        on_initial = int(getattr(cfg, 'on_initial', 0))
-        on_name = int(getattr(cfg, 'on_name', 0))
+        simple_flags = {name: int(getattr(cfg, name, 0)) for name, _, _ in _SIMPLE_OPERATIONS}
         on_gacha = int(getattr(cfg, 'on_gacha', 0))
         on_check = int(getattr(cfg, 'on_check', 0))
         on_count = int(getattr(cfg, 'on_count', 0))
         on_save = int(getattr(cfg, 'on_save', 0))
         on_id_check = int(getattr(cfg, 'on_id_check', 0))
-        logger.info(f"[FLAGS] on_event={on_event} on_que={on_que} on_medal={on_medal} on_mission={on_mission} on_sell={on_sell} on_initial={on_initial} on_name={on_name} on_gacha={on_gacha} on_check={on_check} on_count={on_count} on_save={on_save} on_id_check={on_id_check}")
+        logger.info(f"[FLAGS] on_event={on_event} on_que={on_que} on_medal={simple_flags['on_medal']} on_mission={simple_flags['on_mission']} on_sell={simple_flags['on_sell']} on_initial={simple_flags['on_initial']} on_name={simple_flags['on_name']} on_gacha={on_gacha} on_check={on_check} on_count={on_count} on_save={on_save} on_id_check={on_id_check}")
 
         # ガチャボタン誤作動防止チェック
-        from image_detection import tap_if_found
         if tap_if_found('tap', device_port, "gacha_shu.png", "login"):
             tap_if_found('tap', device_port, "zz_home.png", "login")
             tap_if_found('tap', device_port, "zz_home2.png", "login")
-            import time
             time.sleep(1)
 
         found_character: Optional[bool] = None
@@ -91,68 +162,23 @@ def device_operation_select(
             # on_queは別の関数で処理されるため、ここではスキップ
             pass
             
-        if on_event == 1:
-            if event_do(device_port, folder):
-                operations_completed.append("EVENT")
-            else:
-                operations_completed.append("EVENT_FAIL")
-        elif on_event == 2:
-            from .events import bakuage_roulette_do
-            if bakuage_roulette_do(device_port, folder, multi_logger):
-                operations_completed.append("BAKUAGE_ROULETTE")
-            else:
-                operations_completed.append("BAKUAGE_ROULETTE_FAIL")
-        elif on_event == 3:
-            # フレンド状況確認処理
+        event_operation = _EVENT_OPERATIONS.get(on_event)
+        if event_operation is not None:
+            label, operation = event_operation
             try:
-                from .friends import friend_status_check
-                if friend_status_check(device_port, folder, multi_logger):
-                    operations_completed.append("FRIEND_STATUS_CHECK")
+                if operation(device_port, folder, multi_logger):
+                    operations_completed.append(label)
                 else:
-                    operations_completed.append("FRIEND_STATUS_CHECK_FAIL")
-            except Exception as e:
-                operations_completed.append("FRIEND_STATUS_CHECK_ERROR")
-            
-        elif on_event == 4:
-            if event4_menu_do(device_port, folder, multi_logger):
-                operations_completed.append("EVENT4")
-            else:
-                operations_completed.append("EVENT4_FAIL")
+                    operations_completed.append(f"{label}_FAIL")
+            except Exception:
+                # フレンド状況確認のみ例外をその場で記録し、他のイベントは従来通り呼び出し元へ伝播させる
+                if operation is not friend_status_check:
+                    raise
+                operations_completed.append(f"{label}_ERROR")
 
-        if on_medal == 1:
-            try:
-                medal_change(device_port, folder)
-                operations_completed.append("MEDAL")
-            except Exception as e:
-                operations_completed.append("MEDAL_FAIL")
-            
-        if on_mission == 1:
-            try:
-                mission_get(device_port, folder)
-                operations_completed.append("MISSION")
-            except Exception as e:
-                operations_completed.append("MISSION_FAIL")
-            
-        if on_sell == 1:
-            try:
-                mon_sell(device_port, folder)
-                operations_completed.append("SELL")
-            except Exception as e:
-                operations_completed.append("SELL_FAIL")
-            
-        if on_initial == 1:
-            try:
-                mon_initial(device_port, folder)
-                operations_completed.append("INITIAL")
-            except Exception as e:
-                operations_completed.append("INITIAL_FAIL")
-            
-        if on_name == 1:
-            try:
-                name_change(device_port, folder)
-                operations_completed.append("NAME")
-            except Exception as e:
-                operations_completed.append("NAME_FAIL")
+        for flag_name, label, operation in _SIMPLE_OPERATIONS:
+            if simple_flags[flag_name] == 1:
+                _run_step(operations_completed, label, operation, device_port, folder)
             
         if on_gacha == 1:
             try:
@@ -164,18 +190,22 @@ def device_operation_select(
                     operations_completed.append("GACHA_SUCCESS")
                 else:
                     operations_completed.append("GACHA_FAIL")
-            except Exception as e:
+            except Exception as exc:
+                logger.debug(f"GACHA 失敗: {type(exc).__name__}: {exc}")
                 operations_completed.append("GACHA_FAIL")
                 found_character = False
+
+        # ここから先（CHECK/COUNT/ID_CHECK）は画面の読み取りのみでセーブデータを変更しないため、
+        # ファイル転送は先に開始して画面操作と並行させる（結果はSAVEとして最後に記録）
+        if on_save == 1:
+            save_future = _start_background_save(device_port, folder)
             
         if on_check in [1, 2, 3, 4]:
-            try:
-                icon_check(device_port, folder)
-                operations_completed.append("CHECK")
-            except Exception as e:
-                operations_completed.append("CHECK_FAIL")
+            _run_step(operations_completed, "CHECK", icon_check, device_port, folder)
             
         if on_count == 1:
+            # ガチャ結果の行を先にorb_data.xlsxへ書き込ませる
+            wait_gacha_completion_data(device_port)
             max_orb_count_retries = 10
             orb_count_success = False
             
@@ -184,11 +214,10 @@ def device_operation_select(
                     if orb_count(device_port, folder, found_character=found_character):
                         orb_count_success = True
                         break
-                except Exception as e:
-                    pass
+                except Exception as exc:
+                    logger.debug(f"COUNT 失敗 ({orb_retry + 1}/{max_orb_count_retries}): {type(exc).__name__}: {exc}")
                 
                 if orb_retry < max_orb_count_retries - 1:
-                    import time
                     time.sleep(2)
             
             if orb_count_success:
@@ -208,17 +237,12 @@ def device_operation_select(
                     operations_completed.append("ID_CHECK_FAIL")
             except Exception as e:
                 # エラー時もフリーズ疑いとしてマーク
-                from monst.image.device_management import mark_device_error
                 mark_device_error(device_port, f"ID_CHECK処理エラー: {e}")
                 operations_completed.append("ID_CHECK_FAIL")
         # on_id_check == 0 の場合はIDチェックをスキップ
             
-        if on_save == 1:
-            try:
-                pull_file_from_nox(device_port, folder)
-                operations_completed.append("SAVE")
-            except Exception as e:
-                operations_completed.append("SAVE_FAIL")
+        if save_future is not None:
+            _run_step(operations_completed, "SAVE", save_future.result)
 
         
         # 1行でフォルダ処理結果をログ出力
@@ -233,30 +257,17 @@ def device_operation_select(
         logger.error(f"{get_terminal_number(device_port)}: {folder} [LOGIN_ERROR]")
         if multi_logger:
             multi_logger.log_error(device_port, str(e))
-        if on_save == 1:
-            try:
-                pull_file_from_nox(device_port, folder)
-            except Exception as save_e:
-                pass
+        _save_after_failure(device_port, folder, on_save, save_future)
         return False
     except (GachaOperationError, SellOperationError) as e:
         logger.error(f"{get_terminal_number(device_port)}: {folder} [OPERATION_ERROR]")
         if multi_logger:
             multi_logger.log_error(device_port, str(e))
-        if on_save == 1:
-            try:
-                pull_file_from_nox(device_port, folder)
-                pass
-            except Exception as save_e:
-                pass
+        _save_after_failure(device_port, folder, on_save, save_future)
         return False
     except Exception as e:
         logger.error(f"{get_terminal_number(device_port)}: {folder} [ERROR]")
         if multi_logger:
             multi_logger.log_error(device_port, str(e))
-        if on_save == 1:
-            try:
-                pull_file_from_nox(device_port, folder)
-            except Exception as save_e:
-                pass
+        _save_after_failure(device_port, folder, on_save, save_future)
         return False
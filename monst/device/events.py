@@ -8,15 +8,91 @@ from __future__ import annotations
 
 import time
 import os
-from typing import Optional
+from typing import Optional, Sequence
 
-from logging_util import MultiDeviceLogger
+from logging_util import MultiDeviceLogger, logger
+from login_operations import device_operation_login
 from monst.image.utils import get_image_path
-from monst.adb import perform_action
-from monst.image import tap_if_found, tap_until_found
+from monst.adb import perform_action, perform_actions_batch
+from monst.image import (
+    check_presence_batch,
+    find_and_tap_image,
+    tap_first_of,
+    tap_if_found,
+)
 
 from .navigation import home
 
+# イベント4メニューで処理する画像とアクション（上から順に優先）
+_EVENT4_ACTION_SEQUENCE = (
+    ("ev4_2.png", "event4", "tap"),
+    ("ev4_3.png", "event4", "tap"),
+    ("ev4_4.png", "event4", "swipe_down"),
+    ("ev4_5.png", "event4", "tap"),
+    ("ev4_6.png", "event4", "tap"),
+    ("ev4_7.png", "event4", "tap"),
+    ("ev4_8.png", "event4", "tap"),
+    ("ev4_9.png", "event4", "swipe_down"),
+    ("ev4_start.png", "event4", "tap"),
+)
+_EVENT4_MENU_THRESHOLD = 0.8
+_EVENT4_MIN_THRESHOLD = 0.6
+_EVENT4_RELAX_STEP = 0.05  # 連続未検出1回ごとに下げる閾値
+_EVENT4_RELAX_AFTER_MISSES = 3  # この回数を超えて未検出が続いたら閾値を下げ始める
+_EVENT4_FALLBACK_AFTER_MISSES = 10  # この回数を超えて未検出が続いたら安全位置をタップする
+
+# イベントガチャの画面遷移でタップするボタン（後の画面のものほど先に並べる。全て event フォルダ）
+# sel1 → イベントタイプ（el/geki/masa/vani のいずれか）→ check.png
+_EVENT_SELECT_STEPS = ("el.png", "geki.png", "masa.png", "vani.png", "sel1.png")
+# sel17 → sel21 → sel22.png
+_EVENT_GACHA_STEPS = ("sel21.png", "sel17.png")
+_STEP_RETAP_INTERVAL = 2.0  # 秒: 同じボタンを続けてタップする間隔（tap_until_found と同じ）
+
+# イベントガチャ結果画面で処理する画像とアクション（完了ボタンを優先）
+_GACHA_RESULT_TARGETS = (
+    ("gacha_back.png", "gacha", "tap"),
+    ("tama.png", "key", "swipe_down"),
+    ("tama2.png", "key", "swipe_down"),
+)
+
+# 画面待ちのポーリング間隔（50msから始め、見つからない間だけ1.4倍ずつ伸ばす）
+_POLL_MIN_DELAY = 0.05
+_POLL_GROWTH = 1.4
+_GACHA_RESULT_TIMEOUT = 60.0  # 秒
+_EVENT2_STEP_TIMEOUT = 30.0  # 秒（各 event2 待ちループ）
+
+def _backoff(delay: float, max_delay: float) -> float:
+    """delay秒待機し、次回の待機時間（max_delayで頭打ち）を返します。"""
+    time.sleep(delay)
+    return min(delay * _POLL_GROWTH, max_delay)
+
+def _tap_through(device_port: str, steps: Sequence[str], until: str, timeout: float) -> bool:
+    """until が表示されるまで、今の画面に出ている steps のボタンを1つずつタップして進めます。
+    
+    各ステップごとに tap_until_found を繰り返す代わりに、1枚の画面で until と全ステップを
+    まとめて照合し、表示されている中で最も先の段階のボタンをタップします。
+    
+    Returns:
+        timeout 秒以内に until が表示されたかどうか
+    """
+    images = (until,) + tuple(steps)
+    deadline = time.monotonic() + timeout
+    delay = _POLL_MIN_DELAY
+    last_tapped, last_tap_time = None, 0.0
+    while time.monotonic() < deadline:
+        present = check_presence_batch(device_port, images, "event", cache_time=0)
+        if present[until]:
+            return True
+        target = next((image for image in steps if present[image]), None)
+        retap_wait = target == last_tapped and time.monotonic() - last_tap_time < _STEP_RETAP_INTERVAL
+        if target is not None and not retap_wait and tap_if_found('tap', device_port, target, "event"):
+            last_tapped, last_tap_time = target, time.monotonic()
+            delay = _POLL_MIN_DELAY
+            continue
+        delay = _backoff(delay, 1.0)
+    logger.warning(f"デバイス {device_port}: {until}が見つかりません（タイムアウト {timeout}秒）")
+    return False
+
 def event_do(
     device_port: str, 
     folder: str, 
@@ -35,8 +111,6 @@ def event_do(
     Example:
         >>> success = event_do("127.0.0.1:62001", "folder_001")
     """
-    from logging_util import logger
-    
     try:
         logger.info(f"デバイス {device_port}: イベント処理を開始します")
         
@@ -57,18 +131,8 @@ def event_do(
         if tap_if_found('stay', device_port, "sel_A.png", "event"):
             logger.info(f"デバイス {device_port}: イベントガチャが利用可能です。実行します。")
             
-            # イベントガチャを実行
-            tap_until_found(device_port, "sel2.png", "event", "sel1.png", "event", "tap", "stay", timeout=15)
-            
-            # イベントタイプ判定とガチャ実行
-            if tap_if_found('tap', device_port, "el.png", "event"):
-                tap_until_found(device_port, "check.png", "event", "el.png", "event", "tap", "stay", timeout=15)
-            elif tap_if_found('tap', device_port, "geki.png", "event"):
-                tap_until_found(device_port, "check.png", "event", "geki.png", "event", "tap", "stay", timeout=15)
-            elif tap_if_found('tap', device_port, "masa.png", "event"):
-                tap_until_found(device_port, "check.png", "event", "masa.png", "event", "tap", "stay", timeout=15)
-            else:
-                tap_until_found(device_port, "check.png", "event", "vani.png", "event", "tap", "stay", timeout=15)
+            # イベントガチャを実行（sel1 → イベントタイプ → check.png まで1枚の画面ごとに進める）
+            _tap_through(device_port, _EVENT_SELECT_STEPS, "check.png", timeout=30)
 
             # 各色クリック処理
             _perform_color_selection(device_port)
@@ -96,31 +160,33 @@ def _perform_color_selection(device_port: str) -> None:
         (320, 270, 120, 330),  # 色5
     ]
     
+    # 10回のタップと間の待機を端末側で順に実行し、1回のシェル呼び出しで送信する
+    ops = []
     for first_tap, first_y, second_x, second_y in color_actions:
-        perform_action(device_port, 'tap', first_tap, first_y, duration=150)
-        time.sleep(2)
-        perform_action(device_port, 'tap', second_x, second_y, duration=150)
-        time.sleep(1)
+        ops += [
+            ('tap', first_tap, first_y, None, None, 150), ('sleep', 2),
+            ('tap', second_x, second_y, None, None, 150), ('sleep', 1),
+        ]
+    if not perform_actions_batch(device_port, ops):
+        logger.warning(f"デバイス {device_port}: 色選択の一括タップに失敗しました")
 
 def _execute_event_gacha(device_port: str) -> bool:
     """イベントガチャの実行処理を行います。"""
-    from logging_util import logger
-    
     try:
-        tap_until_found(device_port, "sel21.png", "event", "sel17.png", "event", "tap", "stay", timeout=15)
-        tap_until_found(device_port, "sel22.png", "event", "sel21.png", "event", "tap", "stay", timeout=15)
+        _tap_through(device_port, _EVENT_GACHA_STEPS, "sel22.png", timeout=30)
         tap_if_found('tap', device_port, "sel22.png", "event")
         time.sleep(3)
         
-        # ガチャ結果画面の処理（タイムアウト付き）
-        max_attempts = 30  # 最大60秒でタイムアウト
-        for attempt in range(max_attempts):
-            if tap_if_found('tap', device_port, "gacha_back.png", "gacha"):
+        # ガチャ結果画面の処理（最大60秒でタイムアウト）
+        deadline = time.monotonic() + _GACHA_RESULT_TIMEOUT
+        while time.monotonic() < deadline:
+            # 完了ボタンと玉演出を1枚の画面でまとめて判定する
+            handled = tap_first_of(device_port, _GACHA_RESULT_TARGETS)
+            if handled == "gacha_back.png":
                 logger.info(f"デバイス {device_port}: イベントガチャが完了しました")
                 return True
             
-            tap_if_found('swipe_down', device_port, "tama.png", "key")
-            tap_if_found('swipe_down', device_port, "tama2.png", "key")
+            # 手探りのタップ後は演出が進むまで固定で待つ
             perform_action(device_port, 'tap', 50, 170, duration=150)
             time.sleep(2)
         
@@ -146,13 +212,10 @@ def bakuage_roulette_do(
     Returns:
         爆獲れルーレット処理が成功したかどうか
     """
-    from logging_util import logger
-    
     try:
         logger.info(f"デバイス {device_port}: 爆獲れルーレット処理を開始します")
         
         # ①ログイン処理とroom発見（確実にroomが確認できるようにroom発見後3秒後改めてroomを発見）
-        from login_operations import device_operation_login
         if not device_operation_login(device_port, folder, multi_logger):
             logger.warning(f"デバイス {device_port}: ログインに失敗しました")
             return False
@@ -175,36 +238,42 @@ def bakuage_roulette_do(
             
         # event2_yes.pngが見つかるまでevent2_2.pngとevent2_ok.pngを探してクリック
         # event2_ok.pngを優先
-        max_attempts = 30  # 最大試行回数
-        for attempt in range(max_attempts):
+        deadline = time.monotonic() + _EVENT2_STEP_TIMEOUT
+        delay = _POLL_MIN_DELAY
+        while time.monotonic() < deadline:
             if tap_if_found('stay', device_port, "event2_yes.png", "event"):
                 break  # event2_yes.pngが見つかったのでループ終了
                 
             # event2_ok.pngを優先してクリック
             if tap_if_found('tap', device_port, "event2_ok.png", "event"):
                 time.sleep(1)
+                delay = _POLL_MIN_DELAY
                 continue
                 
             # event2_2.pngをクリック
             if tap_if_found('tap', device_port, "event2_2.png", "event"):
                 time.sleep(1)
+                delay = _POLL_MIN_DELAY
                 continue
                 
-            time.sleep(0.5)  # 短い待機
+            delay = _backoff(delay, 0.5)
         else:
             logger.warning(f"デバイス {device_port}: event2_yes.pngが見つかりませんでした")
             return False
         
         # ④event2_3.pngを見つけるまでevent2_yes.pngをクリック
-        for attempt in range(max_attempts):
+        deadline = time.monotonic() + _EVENT2_STEP_TIMEOUT
+        delay = _POLL_MIN_DELAY
+        while time.monotonic() < deadline:
             if tap_if_found('stay', device_port, "event2_3.png", "event"):
                 break  # event2_3.pngが見つかったのでループ終了
                 
             if tap_if_found('tap', device_port, "event2_yes.png", "event"):
                 time.sleep(1)
+                delay = _POLL_MIN_DELAY
                 continue
                 
-            time.sleep(0.5)
+            delay = _backoff(delay, 0.5)
         else:
             logger.warning(f"デバイス {device_port}: event2_3.pngが見つかりませんでした")
             return False
@@ -215,7 +284,6 @@ def bakuage_roulette_do(
         
         while retry_event3_count < max_event3_retries:
             # event2_3.pngを10秒間押しっぱなし
-            from monst.image import find_and_tap_image
             x, y = find_and_tap_image(device_port, "event2_3.png", "event")
             if x is not None and y is not None:
                 # 10秒間（10000ms）の長押し
@@ -279,11 +347,13 @@ def bakuage_roulette_do(
             return False
         
         # ⑦event2_okを見つけてクリックできるまで再トライ
-        for attempt in range(max_attempts):
+        deadline = time.monotonic() + _EVENT2_STEP_TIMEOUT
+        delay = _POLL_MIN_DELAY
+        while time.monotonic() < deadline:
             if tap_if_found('tap', device_port, "event2_ok.png", "event"):
                 logger.info(f"デバイス {device_port}: 爆獲れルーレット処理が完了しました")
                 return True
-            time.sleep(0.5)  # 短い待機
+            delay = _backoff(delay, 0.5)
         else:
             logger.warning(f"デバイス {device_port}: 最終のevent2_okクリックに失敗しました")
             return False
@@ -298,16 +368,15 @@ def event4_menu_do(
     multi_logger: Optional[MultiDeviceLogger] = None,
 ) -> bool:
     """Handle the custom Event 4 menu flow."""
-    from logging_util import logger
-
     logger.info(f"[EVENT4] Device {device_port}: start processing (folder={folder})")
 
     # ev4_start.png だけを確実に検知する（event4_start.png は存在しない）
     start_candidates = ("ev4_start.png",)
     start_found = False
     max_start_wait = 30  # seconds
-    start_poll_interval = 1.0
-    start_time = time.time()
+    start_poll_max_interval = 1.0
+    delay = _POLL_MIN_DELAY
+    deadline = time.monotonic() + max_start_wait
     attempt = 0
 
     # 事前にパス存在を確認してログ出力（パス問題の切り分け用）
@@ -316,7 +385,7 @@ def event4_menu_do(
         exists = os.path.exists(start_path)
         logger.info(f"[EVENT4] start image path: {start_path} (exists={exists})")
 
-    while time.time() - start_time < max_start_wait:
+    while time.monotonic() < deadline:
         attempt += 1
         found_this_round = False
         for image in start_candidates:
@@ -332,49 +401,51 @@ def event4_menu_do(
         logger.info(
             f"[EVENT4] Device {device_port}: ev4_start polling attempt {attempt} -> found={found_this_round}"
         )
-        time.sleep(start_poll_interval)
+        delay = _backoff(delay, start_poll_max_interval)
 
     if not start_found:
         logger.info(f"[EVENT4] Device {device_port}: start image missing, skip folder")
         return True
 
-    action_sequence = [
-        ("ev4_2.png", "tap"),
-        ("ev4_3.png", "tap"),
-        ("ev4_4.png", "swipe_down"),
-        ("ev4_5.png", "tap"),
-        ("ev4_6.png", "tap"),
-        ("ev4_7.png", "tap"),
-        ("ev4_8.png", "tap"),
-        ("ev4_9.png", "swipe_down"),
-        ("ev4_start.png", "tap"),
-    ]
     end_candidates = ("ev4_end.png",)
 
-    start_time = time.time()
     max_duration = 180
+    deadline = time.monotonic() + max_duration
+    delay = _POLL_MIN_DELAY
+    consecutive_misses = 0
 
-    while time.time() - start_time < max_duration:
+    while time.monotonic() < deadline:
         for end_image in end_candidates:
             if tap_if_found("tap", device_port, end_image, "event4"):
                 logger.info(f"[EVENT4] Device {device_port}: detected end image {end_image}")
                 return True
 
-        action_executed = False
-        for image_name, action in action_sequence:
-            if tap_if_found(action, device_port, image_name, "event4"):
-                action_executed = True
-                if image_name == "ev4_4.png":
-                    logger.info(f"[EVENT4] Device {device_port}: swipe-down action executed")
-                else:
-                    logger.debug(f"[EVENT4] Device {device_port}: handled {image_name}")
-                time.sleep(0.8)
-                break
+        # メニューの各画像を1枚の画面でまとめて探し、最初に見つかったものを処理する
+        # 見つからない状態が続く場合は閾値を段階的に下げて見落としを拾う
+        threshold = _EVENT4_MENU_THRESHOLD
+        if consecutive_misses > _EVENT4_RELAX_AFTER_MISSES:
+            relaxed = threshold - _EVENT4_RELAX_STEP * (consecutive_misses - _EVENT4_RELAX_AFTER_MISSES)
+            threshold = max(_EVENT4_MIN_THRESHOLD, relaxed)
+        image_name = tap_first_of(device_port, _EVENT4_ACTION_SEQUENCE, threshold=threshold)
+        if image_name:
+            if image_name == "ev4_4.png":
+                logger.info(f"[EVENT4] Device {device_port}: swipe-down action executed")
+            else:
+                logger.debug(f"[EVENT4] Device {device_port}: handled {image_name} (threshold={threshold:.2f})")
+            time.sleep(0.8)
+            delay = _POLL_MIN_DELAY
+            consecutive_misses = 0
+            continue
 
-        if not action_executed:
+        consecutive_misses += 1
+        if consecutive_misses > _EVENT4_FALLBACK_AFTER_MISSES:
+            # 緩めた閾値でも見つからない画面が続く場合だけ、安全な位置をタップして遷移を促す
             logger.info(f"[EVENT4] Device {device_port}: fallback tap at safe position")
             perform_action(device_port, "tap", 40, 180, duration=150)
             time.sleep(1.0)
+            delay = _POLL_MIN_DELAY
+            continue
+        delay = _backoff(delay, 1.0)
 
     logger.warning(f"[EVENT4] Device {device_port}: timed out during menu processing")
     return False
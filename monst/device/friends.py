@@ -12,6 +12,20 @@ from typing import Optional
 from logging_util import logger, MultiDeviceLogger
 from utils.device_utils import get_terminal_number
 from login_operations import device_operation_login
+from monst.image import tap_first_of, tap_if_found
+
+# フレンドUI操作シーケンス（friends.png → friends_syotai.png → friends_ok → friend_hosyu）
+_FRIEND_UI_TARGETS = (
+    ("friends.png", "ui"),
+    ("friends_syotai.png", "ui"),
+    ("friends_ok.png", "ui"),
+    ("friend_hosyu.png", "ui"),
+)
+_FRIEND_UI_TIMEOUT = 60.0  # 秒（旧: 最大100回試行）
+# 見つからない間のポーリング間隔（50msから1.4倍ずつ伸ばし、従来の0.2秒で頭打ち）
+_POLL_MIN_DELAY = 0.05
+_POLL_GROWTH = 1.4
+_FRIEND_UI_MAX_DELAY = 0.2
 
 
 def friend_status_check(
@@ -68,8 +82,6 @@ def _login_with_room_verification(
     """
     terminal_num = get_terminal_number(device_port)
 
-    from image_detection import tap_if_found
-
     max_login_attempts = 5
     max_idle_checks = 12
 
@@ -141,35 +153,28 @@ def _execute_friend_ui_sequence(device_port: str) -> bool:
     terminal_num = get_terminal_number(device_port)
     
     try:
-        from image_detection import tap_if_found
-        
-        # UI操作シーケンス定義
-        ui_targets = [
-            "friends.png",
-            "friends_syotai.png", 
-            "friends_ok.png",
-            "friend_hosyu.png"
-        ]
-        
-        max_total_attempts = 100  # 全体の最大試行回数
+        deadline = time.monotonic() + _FRIEND_UI_TIMEOUT
+        delay = _POLL_MIN_DELAY
         
-        for attempt in range(max_total_attempts):
+        while time.monotonic() < deadline:
             # friend_hosyuend.pngが見つかったら完了
             if tap_if_found('stay', device_port, "friend_hosyuend.png", "ui"):
                 return True
             
-            # 各UI要素を探してタップ
-            for ui_target in ui_targets:
-                if tap_if_found('tap', device_port, ui_target, "ui"):
-                    # friend_hosyuは長めの待機、それ以外は短い待機
-                    wait_time = 1.0 if ui_target == "friend_hosyu.png" else 0.3
-                    time.sleep(wait_time)
-                    break  # 1つ見つかったら次のループへ
+            # 各UI要素を1枚の画面でまとめて探し、最初に見つかったものをタップ
+            tapped = tap_first_of(device_port, _FRIEND_UI_TARGETS)
+            if tapped:
+                # friend_hosyuは長めの待機、それ以外は短い待機
+                time.sleep(1.0 if tapped == "friend_hosyu.png" else 0.3)
+                delay = _POLL_MIN_DELAY
+                continue
             
-            time.sleep(0.2)  # 次の試行まで短い待機
+            # 何も見つからない間だけ待機を伸ばす
+            time.sleep(delay)
+            delay = min(delay * _POLL_GROWTH, _FRIEND_UI_MAX_DELAY)
         
-        # 最大試行回数に達した場合は失敗
-        logger.error(f"{terminal_num}: friend_hosyuend.png検出に失敗（最大試行回数到達）")
+        # 制限時間に達した場合は失敗
+        logger.error(f"{terminal_num}: friend_hosyuend.png検出に失敗（タイムアウト）")
         return False
         
     except Exception as e:
@@ -189,8 +194,6 @@ def _check_friend_2nin_status(device_port: str, folder: str) -> bool:
         bool: friend_2ninが検出された場合はTrue
     """
     try:
-        from image_detection import tap_if_found
-        
         # friend_2nin検出試行
         if tap_if_found('stay', device_port, "friend_2nin.png", "ui"):
             print(f"✅ フォルダ{folder}: フレンド状況確認成功")
@@ -7,19 +7,30 @@ monst.device.gacha - Gacha operation functions.
 from __future__ import annotations
 
 import os
+import threading
 import time
-from typing import List, Optional, Tuple, Set
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple, Set
 
 import cv2
 import numpy as np
 
 # デバイス別のownership_screenshotパスを保存する辞書（ガチャ実行前の処理のみで使用）
 _device_ownership_screenshot_paths = {}
+_device_ownership_lock = threading.Lock()
+# ガチャ結果のOCR・Excel保存を行うワーカー（Excelへの書き込みを直列化するため1本）
+_gacha_record_executor: Optional[ThreadPoolExecutor] = None
+_gacha_record_lock = threading.Lock()
+# デバイス別の未完了の保存ジョブ（COUNTや次のフォルダの前に完了を待つ）
+_pending_gacha_records: Dict[str, List[Future]] = {}
+# ディレクトリ → PNGファイル名一覧（_iter_png_files のキャッシュ）
+_png_list_cache: Dict[str, Tuple[str, ...]] = {}
 
 from logging_util import logger, MultiDeviceLogger
 from monst.adb import perform_action
 from monst.image import (
-    tap_if_found, tap_until_found, get_device_screenshot, find_and_tap_image,
+    tap_if_found, tap_until_found, tap_first_of, get_device_screenshot, find_and_tap_image,
     save_character_ownership_image, read_account_name, save_account_name_image, 
     save_orb_count_image, read_orb_count
 )
@@ -32,30 +43,44 @@ from .navigation import home
 from .operations import perform_monster_sell
 
 
-def _iter_png_files(directory: Optional[str]) -> List[str]:
-    """指定ディレクトリからPNGファイルのみを返す。存在しない場合は空。"""
-    if not directory or not os.path.isdir(directory):
-        return []
+def _iter_png_files(directory: Optional[str]) -> Tuple[str, ...]:
+    """指定ディレクトリからPNGファイルのみを返す。存在しない場合は空。
+    
+    画像フォルダは実行中に変わらないため、一度読めた一覧はディレクトリごとに使い回す。
+    """
+    if not directory:
+        return ()
+    cached = _png_list_cache.get(directory)
+    if cached is not None:
+        return cached
+    if not os.path.isdir(directory):
+        return ()
     try:
-        files: List[str] = []
-        for entry in sorted(os.listdir(directory)):
-            path = os.path.join(directory, entry)
-            if os.path.isfile(path) and entry.lower().endswith(".png"):
-                files.append(entry)
-        return files
+        files = tuple(
+            entry
+            for entry in sorted(os.listdir(directory))
+            if entry.lower().endswith(".png") and os.path.isfile(os.path.join(directory, entry))
+        )
     except Exception as exc:
         logger.debug("PNGリスト取得失敗 (%s): %s", directory, exc)
-        return []
+        return ()
+    _png_list_cache[directory] = files
+    return files
 
 
 def _check_green_text_in_region(device_port: str) -> bool:
-    """指定範囲内で緑文字をチェック（連続検出による確認）"""
+    """指定範囲内で緑文字をチェック（判定が際どい場合のみ連続検出で確認）"""
     try:
         # 複数回チェックして誤検出を減らす
         detection_count = 0
         check_attempts = 3
+        required_detections = 2
         
         for i in range(check_attempts):
+            # 残りの試行で判定が変わらない場合は打ち切る
+            if detection_count >= required_detections or detection_count + (check_attempts - i) < required_detections:
+                break
+
             screenshot = get_device_screenshot(device_port, cache_time=0.5, force_refresh=True)
             if screenshot is None:
                 continue
@@ -72,15 +97,21 @@ def _check_green_text_in_region(device_port: str) -> bool:
             region = screenshot[y1:y2, x1:x2]
             
             # 緑色文字の検出
-            if _detect_green_text(region):
+            green_pixels = _count_green_pixels(region)
+            if green_pixels >= _GREEN_TEXT_MIN_PIXELS:
                 detection_count += 1
+            
+            # 1回目が閾値から十分離れていれば、その1枚で判定する
+            if i == 0 and abs(green_pixels - _GREEN_TEXT_MIN_PIXELS) > _GREEN_TEXT_MIN_PIXELS * _GREEN_TEXT_UNCERTAIN_RATIO:
+                is_detected = green_pixels >= _GREEN_TEXT_MIN_PIXELS
+                logger.info(f"緑文字検出結果: 1回で判定 ({green_pixels}画素) -> {is_detected}")
+                return is_detected
                 
             # 短時間の間隔を空けて再検出
             if i < check_attempts - 1:
                 time.sleep(0.3)
         
         # 2回以上検出されたら真の所持と判定
-        required_detections = 2
         is_detected = detection_count >= required_detections
         
         logger.info(f"緑文字検出結果: {detection_count}/{check_attempts} 回検出 -> {is_detected}")
@@ -477,20 +508,18 @@ def _check_character_acquisition(device_port: str) -> bool:
     character_images: List[str] = ["shinshun_icon.png", "shinshun_zenshin.png", "syoji1.png", "syoji2.png"]
     return any(tap_if_found('stay', device_port, img, "end") for img in character_images)
 
+# 10renはタップ、gacharuは緑文字チェック前のため存在確認のみ（先頭ほど優先）
+_SIMPLE_GACHA_BUTTONS: Tuple[Tuple[str, ...], ...] = (
+    ("10ren.png", "gacha", "tap"),
+    ("gacharu.png", "end", "stay"),
+)
+
 def _execute_simple_gacha_action(device_port: str) -> bool:
     """シンプルなガチャ実行。成功したらTrueを返す"""
-    # まず10renボタンを優先的に探す
-    if tap_if_found('tap', device_port, "10ren.png", "gacha"):
-        time.sleep(2)  # ガチャアニメーション待機
-        
-        # 10renクリック後に緑文字チェック
-        if _check_green_text_in_region(device_port):
-            return "character_found"  # 特別な戻り値でキャラ獲得を示す
-        
-        return True
-    
-    # 10renが見つからない場合、直接10renボタンを再検索
-    if tap_if_found('tap', device_port, "10ren.png", "gacha"):
+    # 10renボタン（優先）とgacharuボタンを1枚のスクリーンショットでまとめて探す
+    # （未検出時はキャッシュなしで1回だけ再取得して再判定される）
+    found = tap_first_of(device_port, _SIMPLE_GACHA_BUTTONS)
+    if found == "10ren.png":
         time.sleep(2)  # ガチャアニメーション待機
         
         # 10renクリック後に緑文字チェック
@@ -500,7 +529,7 @@ def _execute_simple_gacha_action(device_port: str) -> bool:
         return True
     
     # 10renが見つからない場合、gacharuボタンを試す
-    if tap_if_found('stay', device_port, "gacharu.png", "end"):
+    if found == "gacharu.png":
         # gacharuをクリックする前に緑文字チェック
         if _check_green_text_in_region(device_port):
             return "character_found"  # 特別な戻り値でキャラ獲得を示す
@@ -537,7 +566,6 @@ def _handle_gacha_interface(device_port: str) -> None:
     
     # 売却処理
     if tap_if_found('tap', device_port, "sell2.png", "key"):
-        from .operations import perform_monster_sell
         sell_operations: List[Tuple[str, str]] = [("l4check.png", "pre.png"), ("l5check.png", "sonota.png")]
         for level_check_img, category_img in sell_operations:
             if not perform_monster_sell(device_port, level_check_img, category_img):
@@ -622,8 +650,8 @@ def check_character_ownership_at_position(device_port: str, target_position: tup
         screenshot_path = _save_ownership_screenshot_and_excel(device_port, region, target_position, has_green_text)
         
         # デバイス別辞書に保存
-        global _device_ownership_screenshot_paths
-        _device_ownership_screenshot_paths[device_port] = screenshot_path
+        with _device_ownership_lock:
+            _device_ownership_screenshot_paths[device_port] = screenshot_path
         
         return should_gacha
         
@@ -632,50 +660,59 @@ def check_character_ownership_at_position(device_port: str, target_position: tup
         # エラー時は安全側に倒してガチャを実行
         return True
 
-def _detect_green_text(region: np.ndarray) -> bool:
-    """画像領域内で緑色文字を検出。
-    
-    Args:
-        region: 検査対象の画像領域
-        
-    Returns:
-        緑色文字が検出されたかどうか
-    """
+# 緑色の範囲を定義（所持済み文字の緑色）
+# より厳密な緑色範囲を設定して誤検出を減らす
+# 色相(H): 65-75 (より狭い緑色の範囲)
+# 彩度(S): 150-255 (より鮮やかな色のみ)
+# 明度(V): 150-255 (より明るい色のみ)
+_GREEN_TEXT_LOWER = np.array([65, 150, 150], np.uint8)
+_GREEN_TEXT_UPPER = np.array([75, 255, 255], np.uint8)
+_green_text_buffers = threading.local()
+# より厳しい閾値を設定して誤検出を減らす（最低100ピクセル、従来の50から増加）
+_GREEN_TEXT_MIN_PIXELS = 100
+# 1回目の画素数が閾値の±10%以内のときだけ複数回の確認に進む
+_GREEN_TEXT_UNCERTAIN_RATIO = 0.1
+
+def _count_green_pixels(region: np.ndarray) -> int:
+    """画像領域内の緑色文字の画素数を数えます（空の領域・エラー時は0）。"""
     try:
         # 画像が空でないかチェック
         if region is None or region.size == 0:
             logger.warning("画像領域が空です")
-            return False
+            return 0
             
-        # HSV色空間に変換
-        hsv = cv2.cvtColor(region, cv2.COLOR_BGR2HSV)
-        
-        # 緑色の範囲を定義（所持済み文字の緑色）
-        # より厳密な緑色範囲を設定して誤検出を減らす
-        # 色相(H): 65-75 (より狭い緑色の範囲)
-        # 彩度(S): 150-255 (より鮮やかな色のみ)  
-        # 明度(V): 150-255 (より明るい色のみ)
-        lower_green = np.array([65, 150, 150])
-        upper_green = np.array([75, 255, 255])
-        
-        # 緑色のマスクを作成
-        mask = cv2.inRange(hsv, lower_green, upper_green)
-        
-        # 緑色ピクセルの数をカウント
+        # HSV変換先とマスクは、同じ大きさの領域ではスレッドごとのバッファを再利用
+        hsv = getattr(_green_text_buffers, "hsv", None)
+        if hsv is None or hsv.shape != region.shape:
+            hsv = _green_text_buffers.hsv = np.empty(region.shape, np.uint8)
+            _green_text_buffers.mask = np.empty(region.shape[:2], np.uint8)
+        mask = _green_text_buffers.mask
+        cv2.cvtColor(region, cv2.COLOR_BGR2HSV, dst=hsv)
+        
+        # 緑色のマスクを作成し、緑色ピクセルの数をカウント
+        cv2.inRange(hsv, _GREEN_TEXT_LOWER, _GREEN_TEXT_UPPER, dst=mask)
         green_pixels = cv2.countNonZero(mask)
         
-        # より厳しい閾値を設定して誤検出を減らす
-        threshold = 100  # 最低100ピクセル（従来の50から増加）
-        
         # デバッグ用ログ出力（条件付き）
         if green_pixels > 0:  # 緑色ピクセルが検出された場合のみログ出力
-            logger.info(f"緑色ピクセル数: {green_pixels}, 閾値: {threshold}")
+            logger.info(f"緑色ピクセル数: {green_pixels}, 閾値: {_GREEN_TEXT_MIN_PIXELS}")
         
-        return green_pixels >= threshold
+        return green_pixels
         
     except Exception as e:
         logger.error(f"緑色文字検出中にエラー: {e}")
-        return False
+        return 0
+
+def _detect_green_text(region: np.ndarray) -> bool:
+    """画像領域内で緑色文字を検出。
+    
+    Args:
+        region: 検査対象の画像領域
+        
+    Returns:
+        緑色文字が検出されたかどうか
+    """
+    return _count_green_pixels(region) >= _GREEN_TEXT_MIN_PIXELS
 
 def _save_ownership_screenshot_and_excel(device_port: str, region: np.ndarray, target_position: tuple, has_green_text: bool) -> str:
     """所持状況のスクリーンショット保存とExcel出力
@@ -690,11 +727,6 @@ def _save_ownership_screenshot_and_excel(device_port: str, region: np.ndarray, t
         str: 保存されたスクリーンショットのパス
     """
     try:
-        import cv2
-        import os
-        from datetime import datetime
-        from utils.data_persistence import update_excel_data
-        
         # タイムスタンプ生成
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
@@ -725,73 +757,11 @@ def _save_ownership_screenshot_and_excel(device_port: str, region: np.ndarray, t
         return None
 
 
-def _save_gacha_completion_data_with_target_image(device_port: str, folder: str) -> bool:
+def _save_gacha_completion_data_with_target_image(device_port: str, folder: str) -> Optional[Future]:
     """ガチャ実行前の所持確認時のデータ保存処理（target.png位置の画像を使用）"""
-    max_retries = 3
-    
-    for retry in range(max_retries):
-        try:
-            terminal_num = get_terminal_number(device_port)
-        
-            # ①フォルダナンバー: 引数として既に取得済み
-            
-            # ②アカウント名を読み取り
-            account_name = read_account_name(device_port)
-            if not account_name:
-                account_name = "Unknown"
-            
-            # ③アカウント名スクリーンショット画像を保存
-            account_image_path = save_account_name_image(device_port, folder)
-            
-            # ④オーブ数を読み取り
-            orb_count = read_orb_count(device_port, folder)
-            if orb_count is None:
-                orb_count = 0
-            
-            # ⑤オーブ数部分の画像を保存
-            orb_image_path = save_orb_count_image(device_port, folder)
-            
-            # ⑥所持キャラ確認時の切り取り画像を保存（target.png位置の画像を使用）
-            global _device_ownership_screenshot_paths
-            try:
-                character_ownership_image_path = _device_ownership_screenshot_paths.get(device_port) or save_character_ownership_image(device_port, folder)
-            except Exception as e:
-                logger.error(f"所持キャラ画像保存エラー: {e}")
-                character_ownership_image_path = None
-            
-            # 既存のorb_data.xlsxファイルに保存
-            excel_filename = "orb_data.xlsx"
-            success = update_excel_data(
-                filename=excel_filename,
-                folder=folder,
-                orbs=orb_count,
-                found_character=True,  # キャラ獲得時のみ呼び出されるためTrue
-                account_name=account_name,
-                account_image=account_image_path or "",
-                orb_image=orb_image_path or "",
-                character_ownership_image=character_ownership_image_path or ""
-            )
-            
-            if success:
-                return True
-            else:
-                if retry < max_retries - 1:
-                    logger.warning(f"{terminal_num}: ガチャ結果データ保存失敗、再試行 ({retry+1}/{max_retries})")
-                    time.sleep(2)  # 2秒待機してリトライ
-                else:
-                    logger.error(f"{terminal_num}: ガチャ結果データ保存失敗（最大リトライ回数到達）")
-                    return False
-                    
-        except Exception as e:
-            logger.error(f"ガチャ完了データ保存中にエラー: {e}")
-            if retry < max_retries - 1:
-                time.sleep(2)  # 2秒待機してリトライ
-            else:
-                return False
-    
-    return False
+    return _queue_gacha_completion_data(device_port, folder, use_target_image=True)
 
-def _save_gacha_completion_data(device_port: str, folder: str) -> bool:
+def _save_gacha_completion_data(device_port: str, folder: str) -> Optional[Future]:
     """キャラ所持確認後のデータ保存処理
     
     Args:
@@ -799,43 +769,102 @@ def _save_gacha_completion_data(device_port: str, folder: str) -> bool:
         folder: フォルダ名
         
     Returns:
-        bool: 保存成功の場合True、失敗の場合False
+        Optional[Future]: OCRとExcel保存を行うバックグラウンド処理（結果はbool）。
+        画面取得に失敗して開始できなかった場合はNone
     """
-    max_retries = 3
+    return _queue_gacha_completion_data(device_port, folder, use_target_image=False)
+
+def wait_gacha_completion_data(device_port: str, timeout: Optional[float] = None) -> bool:
+    """デバイスの未完了のガチャ結果保存を待ち、全て成功したかを返します。
     
-    for retry in range(max_retries):
+    orb_data.xlsx への書き込み順を保つため、COUNTや次のフォルダの処理の前に呼び出します。
+    
+    Args:
+        device_port: 対象デバイスのポート
+        timeout: 1件あたりの最大待機秒数（Noneは無制限）
+        
+    Returns:
+        bool: 未完了の保存がない、または全て成功した場合True
+    """
+    with _gacha_record_lock:
+        pending = _pending_gacha_records.pop(device_port, [])
+    ok = True
+    for future in pending:
         try:
-            terminal_num = get_terminal_number(device_port)
+            ok = bool(future.result(timeout=timeout)) and ok
+        except Exception as e:
+            logger.error(f"{get_terminal_number(device_port)}: ガチャ結果データ保存の完了待ちでエラー: {e}")
+            ok = False
+    if not ok:
+        logger.warning(f"{get_terminal_number(device_port)}: ガチャ結果データの保存に失敗しました")
+    return ok
+
+def _queue_gacha_completion_data(device_port: str, folder: str, *, use_target_image: bool) -> Optional[Future]:
+    """画面の取得だけをその場で行い、OCRとExcel保存をバックグラウンドへ回す。"""
+    global _gacha_record_executor
+    
+    screenshot = get_device_screenshot(device_port, cache_time=0, force_refresh=True)
+    if screenshot is None:
+        logger.error(f"{get_terminal_number(device_port)}: ガチャ結果の画面取得に失敗しました")
+        return None
+    
+    # ⑥所持キャラ確認時の切り取り画像を保存（画面が変わる前に取得する）
+    try:
+        with _device_ownership_lock:
+            target_image_path = _device_ownership_screenshot_paths.get(device_port) if use_target_image else None
+        character_ownership_image_path = target_image_path or save_character_ownership_image(device_port, folder)
+    except Exception as e:
+        logger.error(f"所持キャラ画像保存エラー: {e}")
+        character_ownership_image_path = None
+    
+    with _gacha_record_lock:
+        if _gacha_record_executor is None:
+            _gacha_record_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gacha-record")
+        future = _gacha_record_executor.submit(
+            _record_gacha_completion_data, device_port, folder, screenshot, character_ownership_image_path
+        )
+        _pending_gacha_records.setdefault(device_port, []).append(future)
+    return future
+
+def _record_gacha_completion_data(
+    device_port: str,
+    folder: str,
+    screenshot: np.ndarray,
+    character_ownership_image_path: Optional[str],
+) -> bool:
+    """取得済みの画面からアカウント名・オーブ数を読み取り、orb_data.xlsxへ保存します。
+    
+    OCRは固定の画面に対して1回だけ行い、失敗時の再試行はExcel保存のみ行います。
+    """
+    terminal_num = get_terminal_number(device_port)
+    try:
+        # ①フォルダナンバー: 引数として既に取得済み
         
-            # ①フォルダナンバー: 引数として既に取得済み
-            
-            # ②アカウント名を読み取り
-            account_name = read_account_name(device_port)
-            if not account_name:
-                account_name = "Unknown"
-            
-            # ③アカウント名スクリーンショット画像を保存
-            account_image_path = save_account_name_image(device_port, folder)
-            
-            # ④オーブ数を読み取り
-            orb_count = read_orb_count(device_port, folder)
-            if orb_count is None:
-                orb_count = 0
-            
-            # ⑤オーブ数部分の画像を保存
-            orb_image_path = save_orb_count_image(device_port, folder)
-            
-            # ⑥所持キャラ確認時の切り取り画像を保存（防御的プログラミング）
-            try:
-                character_ownership_image_path = save_character_ownership_image(device_port, folder)
-            except Exception as e:
-                logger.error(f"所持キャラ画像保存エラー: {e}")
-                character_ownership_image_path = None
-            
+        # ②アカウント名を読み取り
+        account_name = read_account_name(device_port, screenshot=screenshot)
+        if not account_name:
+            account_name = "Unknown"
+        
+        # ③アカウント名スクリーンショット画像を保存
+        account_image_path = save_account_name_image(device_port, folder, screenshot=screenshot)
+        
+        # ④オーブ数を読み取り
+        orb_count = read_orb_count(device_port, folder, screenshot=screenshot)
+        if orb_count is None:
+            orb_count = 0
+        
+        # ⑤オーブ数部分の画像を保存
+        orb_image_path = save_orb_count_image(device_port, folder, screenshot=screenshot)
+    except Exception as e:
+        logger.error(f"ガチャ完了データ保存中にエラー: {e}")
+        return False
+    
+    max_retries = 3
+    for retry in range(max_retries):
+        try:
             # 既存のorb_data.xlsxファイルに保存
-            excel_filename = "orb_data.xlsx"
             success = update_excel_data(
-                filename=excel_filename,
+                filename="orb_data.xlsx",
                 folder=folder,
                 orbs=orb_count,
                 found_character=True,  # キャラ獲得時のみ呼び出されるためTrue
@@ -844,24 +873,16 @@ def _save_gacha_completion_data(device_port: str, folder: str) -> bool:
                 orb_image=orb_image_path or "",
                 character_ownership_image=character_ownership_image_path or ""
             )
-            
             if success:
                 return True
-            else:
-                if retry < max_retries - 1:
-                    logger.warning(f"{terminal_num}: ガチャ結果データ保存失敗、再試行 ({retry+1}/{max_retries})")
-                    time.sleep(2)  # 2秒待機してリトライ
-                else:
-                    logger.error(f"{terminal_num}: ガチャ結果データ保存失敗（最大リトライ回数到達）")
-                    return False
-                    
         except Exception as e:
             logger.error(f"ガチャ完了データ保存中にエラー: {e}")
-            if retry < max_retries - 1:
-                time.sleep(2)  # 2秒待機してリトライ
-            else:
-                return False
+        
+        if retry < max_retries - 1:
+            logger.warning(f"{terminal_num}: ガチャ結果データ保存失敗、再試行 ({retry+1}/{max_retries})")
+            time.sleep(2)  # 2秒待機してリトライ
     
+    logger.error(f"{terminal_num}: ガチャ結果データ保存失敗（最大リトライ回数到達）")
     return False
 
 def _search_target_with_swipe(device_port: str) -> tuple:
@@ -886,7 +907,6 @@ def _search_target_with_swipe(device_port: str) -> tuple:
 
         for swipe_count in range(max_swipes):
             # まずtarget.pngを探す
-            from monst.image.core import find_and_tap_image
             x, y = find_and_tap_image(device_port, "target.png", "key")
             if x is not None and y is not None:
                 if y < 500:  # y軸500より高い位置にある場合のみクリア（下部を除外）
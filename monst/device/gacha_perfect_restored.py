@@ -208,7 +208,8 @@ class _PerfectGachaRunner:
             if has_target_snapshot
             else self._gacha_module._save_gacha_completion_data
         )
-        if not saver(self.ctx.device_port, self.ctx.folder):
+        # OCRとExcel保存はバックグラウンドで行われ、結果は wait_gacha_completion_data で報告される
+        if saver(self.ctx.device_port, self.ctx.folder) is None:
             logger.warning("%s: ガチャ結果データの保存に失敗しました", self.ctx.terminal_label)
 
     # --------------------------------------------------------- custom targets --
@@ -11,7 +11,7 @@ from typing import Optional
 from login_operations import handle_screens
 from logging_util import MultiDeviceLogger
 from monst.adb import perform_action
-from monst.image import tap_if_found
+from monst.image import is_present, tap_if_found
 
 def home(
     device_port: str, 
@@ -37,8 +37,8 @@ def home(
     max_attempts = 10  # 最大試行回数を制限
     
     for attempt in range(max_attempts):
-        # room.pngが見つかったら成功
-        if tap_if_found('stay', device_port, "room.png", "login"):
+        # room.pngが見つかったら成功（既にホーム画面なら判定1回で戻る）
+        if is_present(device_port, "room.png", "login"):
             return True
             
         # ホームボタンを押してホーム画面に戻る
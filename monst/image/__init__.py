@@ -12,8 +12,14 @@ from .core import (
     find_image_on_device_enhanced,
     find_and_tap_image,
     tap_if_found,
+    tap_first_of,
+    find_best_of,
+    check_presence_batch,
+    is_present,
+    find_all_on_device,
     find_image_count,
 )
+from .template_cache import preload_templates
 from .recognition import read_orb_count, read_account_name, save_account_name_image, save_orb_count_image, is_ocr_available
 from .gacha_capture import save_character_ownership_image, save_full_gacha_screen_image
 from .device_control import (
@@ -47,7 +53,13 @@ __all__ = [
     "find_image_on_device_enhanced",
     "find_and_tap_image",
     "tap_if_found",
+    "tap_first_of",
+    "find_best_of",
+    "check_presence_batch",
+    "is_present",
+    "find_all_on_device",
     "find_image_count",
+    "preload_templates",
     "read_orb_count",
     "read_account_name",
     "save_account_name_image",
@@ -8,52 +8,60 @@ from __future__ import annotations
 
 import gc
 import hashlib
+import struct
 import subprocess
 import threading
 import time
-from typing import Dict, Optional, Tuple
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import cv2
 import numpy as np
 
-from config import NOX_ADB_PATH
+from config import NOX_ADB_PATH, get_config_value, register_reload_hook
 from logging_util import logger
+from monst.adb import get_last_input_time, perform_action, reconnect_device, run_adb_command
 from .constants import MAX_SCREENSHOT_CACHE_AGE
 from .device_management import (
+    MAX_RECOVERY_ATTEMPTS,
+    _recovery_attempts,
     mark_device_error,
     mark_device_recovered,
     is_device_in_error_state,
-    record_device_progress,
     note_black_screen,
+    record_device_progress,
+    recover_device,
 )
+from .template_cache import get_template, get_template_gray
 from .utils import get_image_path
 
-# テンプレート画像の簡易キャッシュ（プロセス内）
-_template_cache: Dict[str, np.ndarray] = {}
-
-def _get_template_gray(path: str) -> Optional[np.ndarray]:
-    """グレースケールテンプレートを読み込み、プロセス内にキャッシュする。"""
-    try:
-        if not path:
-            return None
-        cached = _template_cache.get(path)
-        if cached is not None:
-            return cached
-        tmpl = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
-        if tmpl is not None:
-            _template_cache[path] = tmpl
-        else:
-            logger.error(f"[ULTRATHINK] テンプレート読込失敗: {path}")
-        return tmpl
-    except Exception as e:
-        logger.error(f"[ULTRATHINK] テンプレート読込エラー: {e}")
-        return None
-
 # スクリーンショットキャッシュ
 _last_screenshot: Dict[str, np.ndarray] = {}
 _last_screenshot_time: Dict[str, float] = {}
 _last_screen_digest: Dict[str, str] = {}
 _screenshot_lock = threading.Lock()
+# 直近フレームのグレースケール変換結果（元フレームは弱参照で持ち、同じフレームなら変換を再利用）
+# 3要素目は元フレームのダイジェスト（取得時にキャッシュされたフレームのみ、不明ならNone）
+_gray_cache: Dict[str, Tuple["weakref.ref[np.ndarray]", np.ndarray, Optional[str]]] = {}
+# (フレームのダイジェスト, 画像名, サブフォルダ) → (最大一致度, 位置, 有効な閾値の下限, 上限)。画面が変わらない間の再照合を省く
+_MATCH_MEMO_SIZE = 256
+_match_memo: "OrderedDict[Tuple[str, str, Tuple[str, ...]], Tuple[float, Tuple[int, int], float, float]]" = OrderedDict()
+_match_memo_lock = threading.Lock()
+# (画像名, サブフォルダ) → 前回検出した左上座標。次回はその周辺だけを先に照合する
+_last_match_loc: Dict[Tuple[str, Tuple[str, ...]], Tuple[int, int]] = {}
+_ROI_MARGIN = 24  # 画素
+# 1/2縮小での粗探索（小さいテンプレートは縮小で特徴が潰れるため対象外）
+_COARSE_MIN_TEMPLATE_SIZE = 24  # 画素
+# 縮小画面の一致度がこれ（閾値の方が低ければ閾値）未満なら、全画面照合をせず未検出とする
+_COARSE_REJECT_SCORE = 0.75
+_COARSE_CONFIRM_MARGIN = 4  # 画素: 粗探索の位置を原寸で確認する範囲
+_half_templates: Dict[Tuple[str, Tuple[str, ...]], np.ndarray] = {}
+_half_gray_cache: Dict[str, Tuple["weakref.ref[np.ndarray]", np.ndarray]] = {}
+# matchTemplate の結果バッファ（スレッドごとに (結果の高さ, 幅) 単位で再利用）
+_match_buffers = threading.local()
+_MATCH_BUFFER_LIMIT = 32
 
 _device_state_lock = threading.Lock()
 _device_last_ok: Dict[str, float] = {}
@@ -61,6 +69,48 @@ _device_last_fail: Dict[str, float] = {}
 _DEVICE_CHECK_INTERVAL = 2.0
 _DEVICE_FAILURE_BACKOFF = 8.0
 
+# 生フレーム形式のスクリーンショット（端末側のPNGエンコードを省略）
+_RAW_SCREENCAP_HEADER_SIZES = (12, 16)  # Android 9以降はカラースペース分の4バイトが増える
+_RAW_SCREENCAP_FORMATS = (1, 2)  # RGBA_8888 / RGBX_8888
+_raw_screencap_enabled: Optional[bool] = None
+_raw_screencap_unsupported: set = set()
+
+# 次フレームの先読み（ポーリング中の端末のみ。照合中に次の screencap を進めておく）
+_PREFETCH_POLL_WINDOW = 1.5  # 秒: 前回の取得からこの間隔内に再取得されたらポーリング中とみなす
+_PREFETCH_MAX_AGE = 1.0  # 秒: 取得開始からこれより古い先読みは使わない
+_screencap_prefetch_enabled: Optional[bool] = None
+_prefetch_executor: Optional[ThreadPoolExecutor] = None
+_prefetch_lock = threading.Lock()
+_pending_prefetch: Dict[str, Tuple[float, "Future[np.ndarray]"]] = {}
+_last_fresh_request: Dict[str, float] = {}
+
+def _use_raw_screencap(device_port: str) -> bool:
+    """この端末で生フレーム形式の screencap を使うかを返す。"""
+    global _raw_screencap_enabled
+    if _raw_screencap_enabled is None:
+        _raw_screencap_enabled = bool(get_config_value("screencap_raw", True))
+    return _raw_screencap_enabled and device_port not in _raw_screencap_unsupported
+
+def _on_config_reload() -> None:
+    global _raw_screencap_enabled, _screencap_prefetch_enabled
+    _raw_screencap_enabled = None
+    _screencap_prefetch_enabled = None
+    _raw_screencap_unsupported.clear()
+
+register_reload_hook(_on_config_reload)
+
+def _decode_raw_screencap(data: bytes) -> Optional[np.ndarray]:
+    """``screencap``（-pなし）の出力をBGR画像に変換する（想定外の形式はNone）。"""
+    if len(data) < 12:
+        return None
+    width, height, pixel_format = struct.unpack_from("<III", data)
+    pixel_bytes = width * height * 4
+    header_size = len(data) - pixel_bytes
+    if not pixel_bytes or pixel_format not in _RAW_SCREENCAP_FORMATS or header_size not in _RAW_SCREENCAP_HEADER_SIZES:
+        return None
+    rgba = np.frombuffer(data, np.uint8, count=pixel_bytes, offset=header_size).reshape(height, width, 4)
+    return cv2.cvtColor(rgba, cv2.COLOR_RGBA2BGR)
+
 # 連続失敗追跡
 _consecutive_failures: Dict[str, int] = {}
 _last_failure_time: Dict[str, float] = {}
@@ -80,6 +130,9 @@ def _handle_memory_pressure(device_port: str, exc: Exception) -> None:
         _last_screenshot.pop(device_port, None)
         _last_screenshot_time.pop(device_port, None)
         _last_screen_digest.pop(device_port, None)
+    _gray_cache.pop(device_port, None)
+    _half_gray_cache.pop(device_port, None)
+    _discard_prefetch(device_port)
     gc.collect()
     mark_device_error(device_port, f"Image memory error: {exc}")
     raise RuntimeError(f"image memory error ({device_port})") from exc
@@ -102,11 +155,6 @@ def _ensure_device_ready(device_port: str, *, force_check: bool = False) -> bool
         if not force_check and last_fail and (now - last_fail) < _DEVICE_FAILURE_BACKOFF:
             return False
 
-    try:
-        from monst.adb import reconnect_device, run_adb_command
-    except Exception as exc:  # pragma: no cover - should not happen
-        logger.debug("ADB helpers unavailable while checking %s: %s", device_port, exc)
-        return True
 
     out = run_adb_command(["get-state"], device_port=device_port, timeout=6)
     if out and "device" in out.lower():
@@ -134,6 +182,103 @@ def _ensure_device_ready(device_port: str, *, force_check: bool = False) -> bool
 
 
 
+def _capture_frame(device_port: str) -> np.ndarray:
+    """adb screencap で1フレームを取得する（失敗時は SubprocessError を送出）。"""
+    max_retries = 3
+    for attempt in range(max_retries):
+        try:
+            raw = _use_raw_screencap(device_port)
+            cmd = [NOX_ADB_PATH, '-s', device_port, 'exec-out', 'screencap']
+            if not raw:
+                cmd.append('-p')
+            screenshot_data = subprocess.check_output(cmd, stderr=subprocess.PIPE, timeout=30)
+
+            if not screenshot_data:
+                if attempt < max_retries - 1:
+                    time.sleep(0.5)
+                    continue
+                raise subprocess.SubprocessError('Empty screenshot data after retries')
+
+            if raw:
+                img = _decode_raw_screencap(screenshot_data)
+                if img is None:
+                    # 想定外の形式の端末はPNG形式に切り替えて再取得する
+                    logger.debug("Raw screencap not supported on %s, using PNG", device_port)
+                    _raw_screencap_unsupported.add(device_port)
+            else:
+                img_array = np.frombuffer(screenshot_data, np.uint8)
+                img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
+
+            if img is None or img.size == 0:
+                if attempt < max_retries - 1:
+                    time.sleep(0.5)
+                    continue
+                raise subprocess.SubprocessError('Failed to decode screenshot after retries')
+
+            break
+
+        except subprocess.CalledProcessError as exc:
+            if attempt < max_retries - 1:
+                time.sleep(0.5)
+                continue
+            raise subprocess.SubprocessError(f"Screenshot command failed: {exc}")
+        except subprocess.TimeoutExpired:
+            if attempt < max_retries - 1:
+                time.sleep(1)
+                continue
+            raise subprocess.SubprocessError('Screenshot timeout after retries')
+
+    return img
+
+def _prefetch_enabled() -> bool:
+    global _screencap_prefetch_enabled
+    if _screencap_prefetch_enabled is None:
+        _screencap_prefetch_enabled = bool(get_config_value("screencap_prefetch", True))
+    return _screencap_prefetch_enabled
+
+def _start_prefetch(device_port: str, now: float) -> None:
+    """連続して新しいフレームが要求されている端末では、次のフレームを先に取得しておく。"""
+    previous = _last_fresh_request.get(device_port)
+    _last_fresh_request[device_port] = now
+    if previous is None or now - previous > _PREFETCH_POLL_WINDOW or not _prefetch_enabled():
+        return
+
+    global _prefetch_executor
+    with _prefetch_lock:
+        if device_port in _pending_prefetch:
+            return
+        if _prefetch_executor is None:
+            _prefetch_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="screencap-prefetch")
+        _pending_prefetch[device_port] = (time.time(), _prefetch_executor.submit(_capture_frame, device_port))
+
+def _take_prefetched_frame(device_port: str, now: float) -> Optional[Tuple[np.ndarray, float]]:
+    """先読み中のフレームを (画像, 取得開始時刻) で受け取る（古い・失敗したものはNone）。"""
+    with _prefetch_lock:
+        pending = _pending_prefetch.pop(device_port, None)
+    if pending is None:
+        return None
+    started, future = pending
+    with _screenshot_lock:
+        last_captured = _last_screenshot_time.get(device_port, 0.0)
+    # 取得開始後にtap/keyeventなどの入力が送られていれば、操作前の画面の可能性がある
+    # また、より新しい画面が既に取得済みなら先読み分は古い
+    if (
+        now - started > _PREFETCH_MAX_AGE
+        or started < get_last_input_time(device_port)
+        or started < last_captured
+    ):
+        return None
+    try:
+        return future.result(), started
+    except Exception as exc:
+        logger.debug("Prefetched screencap failed for %s: %s", device_port, exc)
+        return None
+
+def _discard_prefetch(device_port: str) -> None:
+    """タップなどで画面が変わる場合、先読み中のフレームを使わないようにする。"""
+    with _prefetch_lock:
+        _pending_prefetch.pop(device_port, None)
+
 def get_device_screenshot(
     device_port: str,
     cache_time: float = 5.0,  # Extended to keep up with 8-device workflows
@@ -165,39 +310,17 @@ def get_device_screenshot(
         return cached_frame
 
     try:
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                cmd = [NOX_ADB_PATH, '-s', device_port, 'exec-out', 'screencap', '-p']
-                screenshot_data = subprocess.check_output(cmd, stderr=subprocess.PIPE, timeout=30)
-
-                if not screenshot_data:
-                    if attempt < max_retries - 1:
-                        time.sleep(0.5)
-                        continue
-                    raise subprocess.SubprocessError('Empty screenshot data after retries')
-
-                img_array = np.frombuffer(screenshot_data, np.uint8)
-                img = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-
-                if img is None or img.size == 0:
-                    if attempt < max_retries - 1:
-                        time.sleep(0.5)
-                        continue
-                    raise subprocess.SubprocessError('Failed to decode screenshot after retries')
-
-                break
-
-            except subprocess.CalledProcessError as exc:
-                if attempt < max_retries - 1:
-                    time.sleep(0.5)
-                    continue
-                raise subprocess.SubprocessError(f"Screenshot command failed: {exc}")
-            except subprocess.TimeoutExpired:
-                if attempt < max_retries - 1:
-                    time.sleep(1)
-                    continue
-                raise subprocess.SubprocessError('Screenshot timeout after retries')
+        if force_refresh:
+            # 強制取得より前に開始した先読みは、以降の通常取得でも使わない
+            _discard_prefetch(device_port)
+            prefetched = None
+        else:
+            prefetched = _take_prefetched_frame(device_port, current_time)
+        if prefetched is not None:
+            img, current_time = prefetched
+        else:
+            img = _capture_frame(device_port)
+        _start_prefetch(device_port, time.time())
 
         frame_digest = hashlib.sha1(img.tobytes()).hexdigest()
         with _screenshot_lock:
@@ -229,6 +352,8 @@ def get_device_screenshot(
                     _last_screenshot.pop(device, None)
                     _last_screenshot_time.pop(device, None)
                     _last_screen_digest.pop(device, None)
+                    _gray_cache.pop(device, None)
+                    _half_gray_cache.pop(device, None)
 
             gc.collect()
 
@@ -307,11 +432,11 @@ def find_image_on_device_enhanced(
                 return None, None
 
         # グレースケール変換
-        gray_screenshot = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+        gray_screenshot = _to_gray(device_port, screenshot)
         
         # テンプレート画像読み込み
         target_image_path = get_image_path(image_name, *subfolders)
-        template = _get_template_gray(target_image_path)
+        template = get_template_gray(target_image_path)
         
         if template is None:
             logger.error(f"[ULTRATHINK] テンプレート画像が見つかりません: {target_image_path}")
@@ -320,25 +445,15 @@ def find_image_on_device_enhanced(
         # マルチ閾値検索
         thresholds_to_try = [0.9, 0.8, 0.75, 0.7, 0.65] if multi_threshold else [0.8]
         
-        max_confidence_found = 0.0
-        best_coords = None
+        # テンプレートマッチング実行（結果は閾値に依らないため1回だけ計算し、最も低い閾値と比較する）
+        max_confidence_found, max_loc = _match_template_memo(
+            device_port, gray_screenshot, template, image_name, subfolders, min(thresholds_to_try)
+        )
         
-        for threshold in thresholds_to_try:
-            # テンプレートマッチング実行
-            res = cv2.matchTemplate(gray_screenshot, template, cv2.TM_CCOEFF_NORMED)
-            _, max_val, _, max_loc = cv2.minMaxLoc(res)
-            
-            # 最高信頼度を記録
-            if max_val > max_confidence_found:
-                max_confidence_found = max_val
-                best_coords = (max_loc[0] + (template.shape[1] // 2), max_loc[1] + (template.shape[0] // 2))
-            
-            if max_val >= threshold:
-                # より精密な座標計算
-                center_x = max_loc[0] + (template.shape[1] // 2)
-                center_y = max_loc[1] + (template.shape[0] // 2)
-                
-                return center_x, center_y
+        if max_confidence_found >= min(thresholds_to_try):
+            center_x = max_loc[0] + (template.shape[1] // 2)
+            center_y = max_loc[1] + (template.shape[0] // 2)
+            return center_x, center_y
         
         logger.debug(f"[ULTRATHINK] {image_name}が見つかりませんでした (最高信頼度: {max_confidence_found:.3f})")
         return None, None
@@ -385,19 +500,20 @@ def find_image_on_device(
     # 画像認識処理
     try:
         # グレースケール変換
-        gray_screenshot = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+        gray_screenshot = _to_gray(device_port, screenshot)
         
         # テンプレート画像読み込み
         target_image_path = get_image_path(image_name, *subfolders)
-        template = _get_template_gray(target_image_path)
+        template = get_template_gray(target_image_path)
         
         if template is None:
             logger.error(f"テンプレート画像が見つかりません: {target_image_path}")
             return None, None
         
         # テンプレートマッチング実行
-        res = cv2.matchTemplate(gray_screenshot, template, cv2.TM_CCOEFF_NORMED)
-        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        max_val, max_loc = _match_template_memo(
+            device_port, gray_screenshot, template, image_name, subfolders, threshold
+        )
         
         # 閾値以上のマッチがあれば座標を返す
         if max_val >= threshold:
@@ -418,7 +534,6 @@ def find_image_on_device(
             logger.error(f"画像検索中にシステムエラーが発生しました: {e}")
             
         # NOXフリーズの可能性があるエラーを自動復旧システムに報告
-        from .device_management import mark_device_error
         mark_device_error(device_port, f"画像検索システムエラー: {e} (画像: {image_name})")
         
     except Exception as e:
@@ -426,7 +541,6 @@ def find_image_on_device(
         logger.error(f"画像検索中にエラーが発生しました: {e} (画像: {image_name})")
         
         # NOXフリーズの可能性があるエラーを自動復旧システムに報告
-        from .device_management import mark_device_error
         mark_device_error(device_port, error_msg)
     
     return None, None
@@ -447,23 +561,160 @@ def find_and_tap_image(
     except Exception:
         pass
 
-    screenshot = get_device_screenshot(device_port, eff_cache, force_refresh=force_refresh)
+    gray_screenshot = _gray_screenshot(device_port, eff_cache, force_refresh=force_refresh)
+    return _match_on_gray(device_port, gray_screenshot, image_name, subfolders, threshold)
+
+def _gray_screenshot(device_port: str, cache_time: float, *, force_refresh: bool = False) -> np.ndarray:
+    """スクリーンショットを取得してグレースケールに変換する（取得不可時は例外）。"""
+    screenshot = get_device_screenshot(device_port, cache_time, force_refresh=force_refresh)
     if screenshot is None:
         raise RuntimeError(f"screenshot unavailable ({device_port})")
 
     try:
-        gray_screenshot = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+        return _to_gray(device_port, screenshot)
     except cv2.error as exc:
         _raise_cv_error(device_port, "grayscale", exc)
 
-    target_image_path = get_image_path(image_name, *subfolders)
-    template = _get_template_gray(target_image_path)
-    if template is None:
-        raise RuntimeError(f"template not found: {target_image_path}")
+def _to_gray(device_port: str, screenshot: np.ndarray) -> np.ndarray:
+    """スクリーンショットをグレースケール化する（キャッシュ済みの同一フレームは変換を省略）。"""
+    cached = _gray_cache.get(device_port)
+    if cached is not None and cached[0]() is screenshot:
+        return cached[1]
+    with _screenshot_lock:
+        digest = _last_screen_digest.get(device_port) if _last_screenshot.get(device_port) is screenshot else None
+    gray_screenshot = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+    _gray_cache[device_port] = (weakref.ref(screenshot), gray_screenshot, digest)
+    return gray_screenshot
+
+def _match_template(gray_screenshot: np.ndarray, template: np.ndarray) -> np.ndarray:
+    """TM_CCOEFF_NORMED の照合結果を返す（結果配列は同じ大きさなら次回の照合で上書きされる）。"""
+    shape = (gray_screenshot.shape[0] - template.shape[0] + 1, gray_screenshot.shape[1] - template.shape[1] + 1)
+    if shape[0] <= 0 or shape[1] <= 0:
+        # テンプレートが画面より大きい場合はOpenCVに例外を出させる
+        return cv2.matchTemplate(gray_screenshot, template, cv2.TM_CCOEFF_NORMED)
+    buffers = getattr(_match_buffers, "by_shape", None)
+    if buffers is None:
+        buffers = _match_buffers.by_shape = {}
+    out = buffers.get(shape)
+    if out is None:
+        if len(buffers) >= _MATCH_BUFFER_LIMIT:
+            buffers.clear()
+        out = buffers[shape] = np.empty(shape, np.float32)
+    return cv2.matchTemplate(gray_screenshot, template, cv2.TM_CCOEFF_NORMED, result=out)
+
+def _match_in_window(
+    gray_screenshot: np.ndarray,
+    template: np.ndarray,
+    loc: Tuple[int, int],
+    margin: int,
+) -> Optional[Tuple[float, Tuple[int, int]]]:
+    """左上座標 loc の周囲 margin 画素だけを照合する（窓がテンプレートより小さい場合はNone）。"""
+    th, tw = template.shape[:2]
+    x1, y1 = max(loc[0] - margin, 0), max(loc[1] - margin, 0)
+    x2 = min(loc[0] + tw + margin, gray_screenshot.shape[1])
+    y2 = min(loc[1] + th + margin, gray_screenshot.shape[0])
+    if x2 - x1 < tw or y2 - y1 < th:
+        return None
+    res = _match_template(gray_screenshot[y1:y2, x1:x2], template)
+    _, max_val, _, max_loc = cv2.minMaxLoc(res)
+    return max_val, (max_loc[0] + x1, max_loc[1] + y1)
+
+def _half_gray(device_port: str, gray_screenshot: np.ndarray) -> np.ndarray:
+    """グレースケール画面の1/2縮小版（同じフレームなら縮小を再利用）。"""
+    cached = _half_gray_cache.get(device_port)
+    if cached is not None and cached[0]() is gray_screenshot:
+        return cached[1]
+    half = cv2.pyrDown(gray_screenshot)
+    _half_gray_cache[device_port] = (weakref.ref(gray_screenshot), half)
+    return half
+
+def _match_template_roi(
+    device_port: str,
+    gray_screenshot: np.ndarray,
+    template: np.ndarray,
+    loc_key: Tuple[str, Tuple[str, ...]],
+    threshold: float,
+) -> Tuple[float, Tuple[int, int], float, float]:
+    """前回の検出位置周辺 → 1/2縮小画面での粗探索 → 全画面照合の順に照合する。
+    
+    Returns:
+        (最大一致度, 左上座標, この結果が正しい閾値の下限, 上限)
+    """
+    loc = _last_match_loc.get(loc_key)
+    if loc is not None:
+        found = _match_in_window(gray_screenshot, template, loc, _ROI_MARGIN)
+        if found is not None and found[0] >= threshold:
+            _last_match_loc[loc_key] = found[1]
+            # 窓内の最大値のため、それより厳しい閾値では全画面の最大値を保証しない
+            return found[0], found[1], float("-inf"), found[0]
+
+    if min(template.shape[:2]) >= _COARSE_MIN_TEMPLATE_SIZE:
+        # 画面と同じフィルタ（pyrDown）で縮小し、縮小方法の違いで一致度が下がらないようにする
+        template_half = _half_templates.get(loc_key)
+        if template_half is None or template_half.shape[0] != (template.shape[0] + 1) // 2:
+            template_half = _half_templates[loc_key] = cv2.pyrDown(template)
+        res = _match_template(_half_gray(device_port, gray_screenshot), template_half)
+        _, coarse_val, _, coarse_loc = cv2.minMaxLoc(res)
+        if coarse_val < min(_COARSE_REJECT_SCORE, threshold):
+            # 縮小画面で候補すらなければ未検出（これより厳しい閾値でも未検出のまま）
+            return coarse_val, (coarse_loc[0] * 2, coarse_loc[1] * 2), threshold, float("inf")
+        # 候補があれば原寸で周辺を確認し、確認できなければ全画面照合で判定する
+        found = _match_in_window(gray_screenshot, template, (coarse_loc[0] * 2, coarse_loc[1] * 2), _COARSE_CONFIRM_MARGIN)
+        if found is not None and found[0] >= threshold:
+            _last_match_loc[loc_key] = found[1]
+            return found[0], found[1], float("-inf"), found[0]
+
+    res = _match_template(gray_screenshot, template)
+    _, max_val, _, max_loc = cv2.minMaxLoc(res)
+    if max_val >= threshold:
+        _last_match_loc[loc_key] = max_loc
+    return max_val, max_loc, float("-inf"), float("inf")
+
+def _match_template_memo(
+    device_port: str,
+    gray_screenshot: np.ndarray,
+    template: np.ndarray,
+    image_name: str,
+    subfolders: Sequence[str],
+    threshold: float,
+) -> Tuple[float, Tuple[int, int]]:
+    """テンプレート照合の (最大一致度, 位置) を返す（同じ内容のフレームでは前回の結果を再利用）。"""
+    loc_key = (image_name, tuple(subfolders))
+    cached = _gray_cache.get(device_port)
+    key = None
+    if cached is not None and cached[1] is gray_screenshot and cached[2] is not None:
+        key = (cached[2],) + loc_key
+        with _match_memo_lock:
+            hit = _match_memo.get(key)
+            # 周辺照合・粗探索の結果は、記録した閾値の範囲でのみ再利用する
+            if hit is not None and hit[2] <= threshold <= hit[3]:
+                _match_memo.move_to_end(key)
+                return hit[0], hit[1]
+
+    max_val, max_loc, valid_from, valid_to = _match_template_roi(
+        device_port, gray_screenshot, template, loc_key, threshold
+    )
+    if key is not None:
+        with _match_memo_lock:
+            _match_memo[key] = (max_val, max_loc, valid_from, valid_to)
+            if len(_match_memo) > _MATCH_MEMO_SIZE:
+                _match_memo.popitem(last=False)
+    return max_val, max_loc
+
+def _match_on_gray(
+    device_port: str,
+    gray_screenshot: np.ndarray,
+    image_name: str,
+    subfolders: Sequence[str],
+    threshold: float,
+) -> Tuple[Optional[int], Optional[int]]:
+    """グレースケール画面上でテンプレートを探し、中心座標を返す（未検出は(None, None)）。"""
+    template = get_template(image_name, subfolders)
 
     try:
-        res = cv2.matchTemplate(gray_screenshot, template, cv2.TM_CCOEFF_NORMED)
-        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        max_val, max_loc = _match_template_memo(
+            device_port, gray_screenshot, template, image_name, subfolders, threshold
+        )
     except cv2.error as exc:
         _raise_cv_error(device_port, f"template match ({image_name})", exc)
 
@@ -474,6 +725,49 @@ def find_and_tap_image(
 
     return None, None
 
+def find_all_on_device(
+    device_port: str,
+    image_name: str,
+    *subfolders: str,
+    cache_time: float = 2.0,
+    threshold: float = 0.8,
+    radius: int = 10,
+) -> List[Tuple[int, int]]:
+    """画面上に表示されている画像の出現位置を全て返します。
+    
+    マッチング結果のうち、周囲 radius 画素内で最大かつ閾値以上の点を1件として数えるため、
+    同じアイコンの近傍画素が重複して検出されることはありません。
+    
+    Args:
+        device_port: デバイスポート
+        image_name: 検索する画像ファイル名
+        subfolders: 画像のサブフォルダ（可変長）
+        cache_time: キャッシュ有効期間（秒）
+        threshold: マッチング閾値
+        radius: 同一とみなす近傍の半径（画素）
+        
+    Returns:
+        検出した中心座標 (x, y) のリスト（上から順）
+        
+    Example:
+        >>> locations = find_all_on_device("127.0.0.1:62001", "kuribo.png", "ui")
+        >>> print(f"{len(locations)}体")
+    """
+    gray_screenshot = _gray_screenshot(device_port, cache_time, force_refresh=is_device_in_error_state(device_port))
+    template = get_template(image_name, subfolders)
+
+    try:
+        res = _match_template(gray_screenshot, template)
+        # 近傍の最大値と一致する点 = 局所最大
+        kernel = np.ones((2 * radius + 1, 2 * radius + 1), np.uint8)
+        peaks = (res >= threshold) & (res == cv2.dilate(res, kernel))
+    except cv2.error as exc:
+        _raise_cv_error(device_port, f"template match ({image_name})", exc)
+
+    ys, xs = np.nonzero(peaks)
+    half_w, half_h = template.shape[1] // 2, template.shape[0] // 2
+    return [(int(x) + half_w, int(y) + half_h) for y, x in zip(ys, xs)]
+
 def find_image_count(
     device_port: str, 
     image_name: str, 
@@ -505,18 +799,18 @@ def find_image_count(
         if screenshot is None:
             return False
             
-        gray_screenshot = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+        gray_screenshot = _to_gray(device_port, screenshot)
         
         # テンプレート画像読み込み
         target_image_path = get_image_path(image_name, folder)
-        template = _get_template_gray(target_image_path)
+        template = get_template_gray(target_image_path)
         
         if template is None:
             logger.error(f"テンプレート画像が見つかりません: {target_image_path}")
             return False
         
         # テンプレートマッチング実行
-        res = cv2.matchTemplate(gray_screenshot, template, cv2.TM_CCOEFF_NORMED)
+        res = _match_template(gray_screenshot, template)
         
         # 閾値以上のマッチング位置を特定
         locations = np.where(res >= threshold)
@@ -572,29 +866,10 @@ def tap_if_found(
         >>> if success:
         ...     print("タップしました")
     """
-    from monst.adb import perform_action
-    from .device_management import recover_device
-    
     time.sleep(0.1)
     
-    # エラー状態のデバイスで特別処理
-    if is_device_in_error_state(device_port):
-        # 回復試行回数の上限チェック
-        from .device_management import _recovery_attempts, MAX_RECOVERY_ATTEMPTS
-        
-        # 回復試行回数が上限に達している場合は処理をスキップ
-        if _recovery_attempts.get(device_port, 0) >= MAX_RECOVERY_ATTEMPTS:
-            return False
-        
-        # エラー状態が長く続いている場合は自動回復を試みる
-        try:
-            reset_success = recover_device(device_port)
-            # recover_device内で既に2行ログを出力するので、ここでは追加ログ不要
-            if not reset_success:
-                return False
-        except Exception as e:
-            logger.error(f"自動回復中にエラー: {e}")
-            return False
+    if not _ready_for_action(device_port):
+        return False
     
     # 画像検索 - 安全なタプルアンパック
     result = find_and_tap_image(device_port, image_name, *subfolders, cache_time=cache_time, threshold=threshold)
@@ -615,34 +890,207 @@ def tap_if_found(
         # Y座標制限チェック（キャラアイコンクリック防止）
         if max_y is not None and y > max_y:
             return False  # 指定Y座標より下の場合はスキップ
+        return _perform_found_action(action, device_port, x, y)
+
+    return False
+
+def tap_first_of(
+    device_port: str,
+    candidates: Sequence[Tuple[str, ...]],
+    *,
+    action: str = 'tap',
+    cache_time: float = 2.0,
+    threshold: float = 0.8,
+) -> Optional[str]:
+    """複数の候補画像を1枚のスクリーンショットで探し、最初に見つかったものをタップします。
+    
+    候補ごとにスクリーンショット取得・グレースケール変換を行う tap_if_found の連続呼び出しと異なり、
+    画面は1回だけ取得して全候補で共有します（未検出時のみキャッシュなしで1回再取得）。
+    
+    Args:
+        device_port: デバイスポート
+        candidates: (画像ファイル名, サブフォルダ[, アクション]) の並び。先頭ほど優先
+        action: アクションを省略した候補に実行するアクション（tap_if_found と同じ）
+        cache_time: キャッシュの有効期間（秒）
+        threshold: マッチングの閾値
+        
+    Returns:
+        アクションを実行した画像名。いずれも見つからない・実行失敗時はNone
+        
+    Example:
+        >>> tap_first_of("127.0.0.1:62001", [("ok.png", "key"), ("close.png", "key")])
+        'ok.png'
+    """
+    time.sleep(0.1)
+    
+    if not _ready_for_action(device_port):
+        return None
+    
+    force_refresh = is_device_in_error_state(device_port)
+    for attempt_cache in ((cache_time, 0) if cache_time > 0 else (0,)):
+        gray_screenshot = _gray_screenshot(device_port, attempt_cache, force_refresh=force_refresh)
+        for image_name, subfolder, *candidate_action in candidates:
+            x, y = _match_on_gray(device_port, gray_screenshot, image_name, (subfolder,), threshold)
+            if x is not None and y is not None:
+                found_action = candidate_action[0] if candidate_action else action
+                return image_name if _perform_found_action(found_action, device_port, x, y) else None
+    return None
+
+def find_best_of(
+    device_port: str,
+    candidates: Sequence[Tuple[str, str]],
+    *,
+    cache_time: float = 2.0,
+    threshold: float = 0.8,
+) -> Optional[Tuple[str, int, int]]:
+    """互いに排他な候補画像を1枚のスクリーンショットで照合し、最も一致度の高いものを返します。
+    
+    tap_first_of と異なり候補の並び順ではなく一致度で選び、タップは行いません。
+    
+    Args:
+        device_port: デバイスポート
+        candidates: (画像ファイル名, サブフォルダ) の並び
+        cache_time: キャッシュの有効期間（秒）
+        threshold: マッチングの閾値
         
+    Returns:
+        (画像名, 中心x, 中心y)。いずれも閾値未満の場合はNone
+        
+    Example:
+        >>> find_best_of("127.0.0.1:62001", [("el.png", "event"), ("geki.png", "event")])
+        ('geki.png', 180, 420)
+    """
+    force_refresh = is_device_in_error_state(device_port)
+    for attempt_cache in ((cache_time, 0) if cache_time > 0 else (0,)):
+        gray_screenshot = _gray_screenshot(device_port, attempt_cache, force_refresh=force_refresh)
+        best: Optional[Tuple[float, str, int, int]] = None
+        for image_name, subfolder in candidates:
+            template = get_template(image_name, (subfolder,))
+            try:
+                max_val, max_loc = _match_template_memo(
+                    device_port, gray_screenshot, template, image_name, (subfolder,), threshold
+                )
+            except cv2.error as exc:
+                _raise_cv_error(device_port, f"template match ({image_name})", exc)
+            if max_val >= threshold and (best is None or max_val > best[0]):
+                center_x = max_loc[0] + (template.shape[1] // 2)
+                center_y = max_loc[1] + (template.shape[0] // 2)
+                best = (max_val, image_name, center_x, center_y)
+        if best is not None:
+            return best[1], best[2], best[3]
+    return None
+
+def check_presence_batch(
+    device_port: str,
+    image_names: Sequence[str],
+    *subfolders: str,
+    cache_time: float = 2.0,
+    threshold: float = 0.8,
+) -> Dict[str, bool]:
+    """複数の画像が画面上にあるかを1枚のスクリーンショットでまとめて判定します。
+    
+    tap_if_found('stay', ...) を画像ごとに呼ぶ代わりに使う存在確認専用の関数です。
+    見つからない画像があった場合のみ、キャッシュなしで1回だけ再取得して未検出分を再判定します。
+    
+    Args:
+        device_port: デバイスポート
+        image_names: 判定する画像ファイル名の並び
+        subfolders: 画像のサブフォルダ（全画像共通）
+        cache_time: キャッシュの有効期間（秒）
+        threshold: マッチングの閾値
+        
+    Returns:
+        画像名 → 検出有無 の辞書（デバイスがエラー状態で判定できない場合は全てFalse）
+        
+    Example:
+        >>> present = check_presence_batch("127.0.0.1:62001", ["shugo1.png", "shugo2.png"], "icon")
+        >>> missing = [name for name, found in present.items() if not found]
+    """
+    present = dict.fromkeys(image_names, False)
+    time.sleep(0.1)
+    
+    if not present or not _ready_for_action(device_port):
+        return present
+    
+    force_refresh = is_device_in_error_state(device_port)
+    for attempt_cache in ((cache_time, 0) if cache_time > 0 else (0,)):
+        gray_screenshot = _gray_screenshot(device_port, attempt_cache, force_refresh=force_refresh)
+        for image_name, found in present.items():
+            if not found:
+                x, _ = _match_on_gray(device_port, gray_screenshot, image_name, subfolders, threshold)
+                present[image_name] = x is not None
+        if all(present.values()):
+            break
+    
+    if any(present.values()):
+        record_device_progress(device_port)
+    return present
+
+def is_present(
+    device_port: str,
+    image_name: str,
+    *subfolders: str,
+    cache_time: float = 2.0,
+    threshold: float = 0.8,
+) -> bool:
+    """画像が画面上にあるかだけを判定します（タップや 'stay' の待機は行いません）。
+    
+    Example:
+        >>> if is_present("127.0.0.1:62001", "sort.png", "ui"):
+        ...     print("ソート画面です")
+    """
+    return check_presence_batch(
+        device_port, (image_name,), *subfolders, cache_time=cache_time, threshold=threshold
+    )[image_name]
+
+def _ready_for_action(device_port: str) -> bool:
+    """エラー状態のデバイスは自動回復を試み、処理を続行できるかを返す。"""
+    # エラー状態のデバイスで特別処理
+    if is_device_in_error_state(device_port):
+        # 回復試行回数の上限チェック
+        # 回復試行回数が上限に達している場合は処理をスキップ
+        if _recovery_attempts.get(device_port, 0) >= MAX_RECOVERY_ATTEMPTS:
+            return False
+        
+        # エラー状態が長く続いている場合は自動回復を試みる
         try:
-            # タップアクションごとの処理
-            if action == 'tap':
-                result = perform_action(device_port, action, x, y, duration=150)
-            elif action == 'swipe_down':
-                result = perform_action(device_port, 'swipe', x, y, x, y+100, duration=300)
-            elif action == 'swipe_up':
-                result = perform_action(device_port, 'swipe', x, y, x, y-100, duration=1500)
-            elif action == 'stay':
-                time.sleep(0.5)
-                result = True
-            else:
-                logger.error(f"無効なアクション: {action}")
-                return False
-            
-            # アクション成功時はキャッシュを削除
-            if result:
-                if device_port in _last_screenshot:
-                    del _last_screenshot[device_port]
-                record_device_progress(device_port)
-                return True
-            else:
-                logger.warning(f"アクション '{action}' の実行に失敗: デバイス {device_port}")
+            reset_success = recover_device(device_port)
+            # recover_device内で既に2行ログを出力するので、ここでは追加ログ不要
+            if not reset_success:
                 return False
-                
         except Exception as e:
-            logger.error(f"アクション実行中にエラー: {e}")
-            raise
+            logger.error(f"自動回復中にエラー: {e}")
+            return False
+    return True
 
-    return False
+def _perform_found_action(action: str, device_port: str, x: int, y: int) -> bool:
+    """検出座標に対してアクションを実行する。"""
+    try:
+        # タップアクションごとの処理
+        if action == 'tap':
+            result = perform_action(device_port, action, x, y, duration=150)
+        elif action == 'swipe_down':
+            result = perform_action(device_port, 'swipe', x, y, x, y+100, duration=300)
+        elif action == 'swipe_up':
+            result = perform_action(device_port, 'swipe', x, y, x, y-100, duration=1500)
+        elif action == 'stay':
+            time.sleep(0.5)
+            result = True
+        else:
+            logger.error(f"無効なアクション: {action}")
+            return False
+        
+        # アクション成功時はキャッシュを削除
+        if result:
+            if device_port in _last_screenshot:
+                del _last_screenshot[device_port]
+            _discard_prefetch(device_port)
+            record_device_progress(device_port)
+            return True
+        else:
+            logger.warning(f"アクション '{action}' の実行に失敗: デバイス {device_port}")
+            return False
+            
+    except Exception as e:
+        logger.error(f"アクション実行中にエラー: {e}")
+        raise
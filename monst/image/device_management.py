@@ -381,13 +381,14 @@ def clear_device_cache(device_port: str) -> None:
     Args:
         device_port: デバイスポート
     """
-    from .core import _last_screenshot, _last_screenshot_time, _last_screen_digest, _screenshot_lock
+    from .core import _discard_prefetch, _last_screenshot, _last_screenshot_time, _last_screen_digest, _screenshot_lock
     
     with _screenshot_lock:
         if device_port in _last_screenshot:
             del _last_screenshot[device_port]
             _last_screenshot_time[device_port] = 0
             _last_screen_digest.pop(device_port, None)
+    _discard_prefetch(device_port)
 
 def _queue_device_restart(device_port: str, restart_type: str = "normal") -> None:
     """デバイス再起動をキューに追加します（安全な間隔で実行）。
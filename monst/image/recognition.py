@@ -6,7 +6,9 @@ OCRとテキスト認識機能を提供します。
 
 from __future__ import annotations
 
-from typing import Optional
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple, TypeVar
+import threading
 import time
 import re
 import os
@@ -58,6 +60,28 @@ def is_ocr_available() -> bool:
     """現在の環境でTesseract OCRが使用可能かを返す。"""
     return _TESSERACT_AVAILABLE
 
+_T = TypeVar("_T")
+
+# (読み取り関数名, 領域の画素, 形状) → OCR結果（読み取れた結果のみ保持し、古いものから破棄）
+_OCR_CACHE_SIZE = 128
+_ocr_cache: "OrderedDict[Tuple[str, bytes, Tuple[int, ...]], object]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+def _cached_ocr(reader: Callable[[np.ndarray], Optional[_T]], roi: np.ndarray) -> Optional[_T]:
+    """同じ画素の領域は前回の読み取り結果を再利用する（失敗・未検出のNoneはキャッシュしない）。"""
+    key = (reader.__name__, roi.tobytes(), roi.shape)
+    with _ocr_cache_lock:
+        if key in _ocr_cache:
+            _ocr_cache.move_to_end(key)
+            return _ocr_cache[key]
+    result = reader(roi)
+    if result is not None:
+        with _ocr_cache_lock:
+            _ocr_cache[key] = result
+            if len(_ocr_cache) > _OCR_CACHE_SIZE:
+                _ocr_cache.popitem(last=False)
+    return result
+
 def _is_valid_account_name(text: str) -> bool:
     """3～4桁の数字パターンかチェックします。"""
     if not text or len(text) < 3 or len(text) > 4:
@@ -137,15 +161,19 @@ def _enhanced_ocr(image: np.ndarray, whitelist: str, target_type: str = "text")
         logger.error(f"OCR処理中にエラー: {e}")
         return ""
 
-def read_account_name(device_port: str) -> Optional[str]:
-    """アカウント名（数字部分）を読み取ります。"""
-    screenshot = get_device_screenshot(device_port, cache_time=0, force_refresh=True)
+def read_account_name(device_port: str, *, screenshot: Optional[np.ndarray] = None) -> Optional[str]:
+    """アカウント名（数字部分）を読み取ります（screenshot 指定時はその画面から読み取る）。"""
+    if screenshot is None:
+        screenshot = get_device_screenshot(device_port, cache_time=0, force_refresh=True)
     if screenshot is None:
         return None
 
     # 絶対座標でROI設定：x:1,y:80からx:60,y:100
     roi = screenshot[80:100, 1:60]
-    
+    return _cached_ocr(_ocr_account_name, roi)
+
+def _ocr_account_name(roi: np.ndarray) -> Optional[str]:
+    """アカウント名領域のOCR"""
     try:
         # 数字のみを対象とする
         for attempt in range(5):
@@ -176,9 +204,10 @@ def read_account_name(device_port: str) -> Optional[str]:
         logger.error(f"アカウント名読み取り中にエラー: {e}")
         return None
 
-def save_account_name_image(device_port: str, folder: str) -> Optional[str]:
-    """アカウント名部分の画像を保存します。"""
-    screenshot = get_device_screenshot(device_port, cache_time=0, force_refresh=True)
+def save_account_name_image(device_port: str, folder: str, *, screenshot: Optional[np.ndarray] = None) -> Optional[str]:
+    """アカウント名部分の画像を保存します（screenshot 指定時はその画面から切り出す）。"""
+    if screenshot is None:
+        screenshot = get_device_screenshot(device_port, cache_time=0, force_refresh=True)
     if screenshot is None:
         return None
 
@@ -203,18 +232,27 @@ def save_account_name_image(device_port: str, folder: str) -> Optional[str]:
         logger.error(f"アカウント名画像保存中にエラー: {e}")
         return None
 
-def read_orb_count(device_port: str, folder_name: str) -> Optional[int]:
-    """オーブ数を読み取ります。"""
-    screenshot = get_device_screenshot(device_port, cache_time=0, force_refresh=True)
+def read_orb_count(
+    device_port: str,
+    folder_name: str,
+    *,
+    screenshot: Optional[np.ndarray] = None,
+) -> Optional[int]:
+    """オーブ数を読み取ります（screenshot 指定時はその画面から読み取る）。"""
+    if screenshot is None:
+        screenshot = get_device_screenshot(device_port, cache_time=0, force_refresh=True)
     if screenshot is None:
         return None
 
-    # 絶対座標でROI設定：x:285,y:32からx:330,y:50
-    roi = screenshot[32:50, 285:330]
-
     if not _TESSERACT_AVAILABLE:
         return None
 
+    # 絶対座標でROI設定：x:285,y:32からx:330,y:50
+    roi = screenshot[32:50, 285:330]
+    return _cached_ocr(_ocr_orb_count, roi)
+
+def _ocr_orb_count(roi: np.ndarray) -> Optional[int]:
+    """オーブ数領域のOCR"""
     try:
         result = _enhanced_ocr(roi, "0123456789", "numbers")
         if result and result.isdigit():
@@ -245,9 +283,10 @@ def read_orb_count(device_port: str, folder_name: str) -> Optional[int]:
     
     return None
 
-def save_orb_count_image(device_port: str, folder: str) -> Optional[str]:
-    """オーブ数部分の画像を保存します。"""
-    screenshot = get_device_screenshot(device_port, cache_time=0, force_refresh=True)
+def save_orb_count_image(device_port: str, folder: str, *, screenshot: Optional[np.ndarray] = None) -> Optional[str]:
+    """オーブ数部分の画像を保存します（screenshot 指定時はその画面から切り出す）。"""
+    if screenshot is None:
+        screenshot = get_device_screenshot(device_port, cache_time=0, force_refresh=True)
     if screenshot is None:
         return None
 
@@ -0,0 +1,74 @@
+"""
+monst.image.template_cache - Grayscale template cache.
+
+テンプレート画像をグレースケールで一度だけ読み込み、プロセス内で使い回します。
+デバイス画面（monst.image.core）とWindows画面（monst.image.windows_ui）の両方の画像検索が利用します。
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+from logging_util import logger
+from .utils import get_image_path
+
+# テンプレート画像の簡易キャッシュ（プロセス内）
+_template_cache: Dict[str, np.ndarray] = {}
+
+def get_template_gray(path: str) -> Optional[np.ndarray]:
+    """グレースケールテンプレートを読み込み、プロセス内にキャッシュする。"""
+    try:
+        if not path:
+            return None
+        cached = _template_cache.get(path)
+        if cached is not None:
+            return cached
+        tmpl = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if tmpl is not None:
+            _template_cache[path] = tmpl
+        else:
+            logger.error(f"[ULTRATHINK] テンプレート読込失敗: {path}")
+        return tmpl
+    except Exception as e:
+        logger.error(f"[ULTRATHINK] テンプレート読込エラー: {e}")
+        return None
+
+# (画像名, サブフォルダ) → テンプレート。get_image_path のパス解決（存在確認）も省略する
+_named_template_cache: Dict[Tuple[str, Tuple[str, ...]], np.ndarray] = {}
+
+def get_template(image_name: str, subfolders: Sequence[str]) -> np.ndarray:
+    """画像名からグレースケールテンプレートを取得する（読込不可時は例外）。"""
+    key = (image_name, tuple(subfolders))
+    template = _named_template_cache.get(key)
+    if template is None:
+        target_image_path = get_image_path(image_name, *subfolders)
+        template = get_template_gray(target_image_path)
+        if template is None:
+            raise FileNotFoundError(f"template not found: {target_image_path}")
+        _named_template_cache[key] = template
+    return template
+
+def preload_templates(templates: Iterable[Tuple[str, str]]) -> int:
+    """テンプレート画像を事前に読み込み、以降の画像検索をキャッシュ参照だけにします。
+    
+    Args:
+        templates: (画像ファイル名, サブフォルダ) の並び
+        
+    Returns:
+        読み込めたテンプレート数（読込失敗はログのみで例外にしない）
+        
+    Example:
+        >>> preload_templates([("ok.png", "key"), ("close.png", "key")])
+        2
+    """
+    loaded = 0
+    for image_name, subfolder in templates:
+        try:
+            get_template(image_name, (subfolder,))
+            loaded += 1
+        except Exception as e:
+            logger.warning(f"テンプレートの事前読込に失敗: {image_name} ({e})")
+    return loaded
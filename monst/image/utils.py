@@ -8,11 +8,16 @@ from __future__ import annotations
 
 import os
 import sys
+from typing import Dict, Tuple
 
 from logging_util import logger
 
 LOG_IMAGE_DISCOVERY = False
 
+# (画像名, サブフォルダ) → 存在を確認済みのパス。見つからなかった画像は記録せず毎回探し直す
+_resolved_image_paths: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+_resolved_windows_image_paths: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+
 def get_image_path(image_name: str, *subfolders: str) -> str:
     """画像ファイルのパスを取得します。
     
@@ -27,6 +32,10 @@ def get_image_path(image_name: str, *subfolders: str) -> str:
         >>> path = get_image_path("ok.png", "ui")
         >>> print(path)  # /path/to/gazo/ui/ok.png (新構造)
     """
+    cached = _resolved_image_paths.get((image_name, subfolders))
+    if cached is not None:
+        return cached
+
     # パスマッピングを適用
     from gazo_path_mapping import get_mapped_path, get_legacy_folder_mapping
     
@@ -55,7 +64,9 @@ def get_image_path(image_name: str, *subfolders: str) -> str:
         image_path = os.path.join(base_path, "gazo", image_name)
 
     # ファイルの存在確認と代替パス検索
-    if not os.path.exists(image_path):
+    if os.path.exists(image_path):
+        _resolved_image_paths[(image_name, subfolders)] = image_path
+    else:
         # 新構造での検索を試行（売却フォルダを優先）
         alternative_folders = [
             "sell",
@@ -75,6 +86,7 @@ def get_image_path(image_name: str, *subfolders: str) -> str:
             if os.path.exists(alt_path):
                 if LOG_IMAGE_DISCOVERY:
                     logger.debug(f"画像ファイルを新しい場所で発見: {alt_path}")
+                _resolved_image_paths[(image_name, subfolders)] = alt_path
                 return alt_path
         
         if image_name.lower() != "koshin.png":
@@ -96,6 +108,10 @@ def get_image_path_for_windows(image_name: str, *subfolders: str) -> str:
         >>> path = get_image_path_for_windows("button.png", "ui", "main")
         >>> print(path)  # /path/to/gazo/ui/main/button.png
     """
+    cached = _resolved_windows_image_paths.get((image_name, subfolders))
+    if cached is not None:
+        return cached
+
     # パスマッピングを適用
     from gazo_path_mapping import get_mapped_path, get_legacy_folder_mapping
     
@@ -122,7 +138,9 @@ def get_image_path_for_windows(image_name: str, *subfolders: str) -> str:
         image_path = os.path.join(base_path, "gazo", image_name)
 
     # ファイルの存在確認と代替パス検索
-    if not os.path.exists(image_path):
+    if os.path.exists(image_path):
+        _resolved_windows_image_paths[(image_name, subfolders)] = image_path
+    else:
         # 新構造での検索を試行（売却フォルダを優先）
         alternative_folders = [
             "sell",
@@ -142,6 +160,7 @@ def get_image_path_for_windows(image_name: str, *subfolders: str) -> str:
             if os.path.exists(alt_path):
                 if LOG_IMAGE_DISCOVERY:
                     logger.debug(f"Windows画像ファイルを新しい場所で発見: {alt_path}")
+                _resolved_windows_image_paths[(image_name, subfolders)] = alt_path
                 return alt_path
         
         if image_name.lower() != "koshin.png":
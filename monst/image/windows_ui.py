@@ -15,6 +15,7 @@ import numpy as np
 import pyautogui
 
 from logging_util import logger
+from .template_cache import get_template_gray
 from .utils import get_image_path_for_windows
 
 
@@ -54,7 +55,7 @@ def find_image_on_windows(
         screen = cv2.cvtColor(screen, cv2.COLOR_RGB2GRAY)  # グレースケール化
 
         # テンプレート画像読み込み
-        template = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        template = get_template_gray(image_path)
         if template is None:
             logger.error(f"[ERROR] 画像の読み込みに失敗しました: {image_path}")
             return None
@@ -119,7 +120,7 @@ def find_and_tap_image_on_windows(
         screen = cv2.cvtColor(screen, cv2.COLOR_RGB2GRAY)  # グレースケール化
 
         # テンプレート画像読み込み
-        template = cv2.imread(image_path, cv2.IMREAD_GRAYSCALE)
+        template = get_template_gray(image_path)
         if template is None:
             logger.error(f"[ERROR] 画像の読み込みに失敗しました: {image_path}")
             return None
@@ -13,7 +13,7 @@ from monst.device.checks import icon_check
 from monst.device.events import bakuage_roulette_do, event_do, event4_menu_do
 from monst.device.exceptions import GachaOperationError, LoginError, SellOperationError
 from monst.device.friends import friend_status_check
-from monst.device.gacha import mon_gacha_shinshun
+from monst.device.gacha import mon_gacha_shinshun, wait_gacha_completion_data
 from monst.device.operations import medal_change, mission_get, mon_initial, mon_sell, name_change, orb_count
 from monst.image.device_management import monitor_device_health
 from utils.device_utils import get_terminal_number
@@ -114,6 +114,8 @@ class SelectExecutor:
         operations_completed: list[str] = []
 
         try:
+            # 前のフォルダのガチャ結果保存（バックグラウンド）を完了させてから始める
+            wait_gacha_completion_data(device_port)
             monitor_device_health([device_port])
 
             login_success = self.login_workflow.execute(
@@ -308,6 +310,8 @@ class SelectExecutor:
             return SelectResult("on_gacha", False, "GACHA_FAIL")
 
     def _handle_count(self, state: _SelectState, flags: Dict[str, int]) -> SelectResult:
+        # ガチャ結果の行を先にorb_data.xlsxへ書き込ませる
+        wait_gacha_completion_data(state.device_port)
         max_retries = 10
         for attempt in range(max_retries):
             try:
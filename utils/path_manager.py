@@ -11,9 +11,11 @@ This module handles all path-related operations including:
 import os
 import sys
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional
 from logging_util import logger
 
+@lru_cache(maxsize=1)
 def get_base_path() -> str:
     """
     実行ファイルがあるベースパスを取得